@@ -1,12 +1,22 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse
 from pathlib import Path
 import traceback
 import logging
 
-from app.routers import video, annotations
+from app.routers import video, annotations, media, query, debug
+from app.utils.io_executor import run_io, shutdown_io_executor
+from app.utils.video_probe import shutdown_process_pool
+from app.utils.sprite_sheet import sprite_jobs
+from app.utils.upload_handler import cleanup_stale_uploads
+from app.utils.frame_cache import get_frame_decoder
+from app.utils.annotation_cache import get_annotation_cache
+from app.utils.annotation_index import get_annotation_index
+from app.utils.metrics import REGISTRY, MetricsMiddleware, stats_collector
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.logging_setup import configure_logging, stop_logging
 from config import (
     STATIC_DIR, 
     TEMPLATE_DIR, 
@@ -14,14 +24,13 @@ from config import (
     CORS_ALLOW_CREDENTIALS, 
     CORS_ALLOW_METHODS, 
     CORS_ALLOW_HEADERS,
-    API_PREFIX
+    API_PREFIX,
+    METRICS_ENABLED,
+    PROFILING_ENABLED
 )
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 로깅 설정 (큐 + 백그라운드 기록, logs/server.log에 JSON Lines)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # FastAPI 앱 초기화
@@ -40,6 +49,22 @@ app.add_middleware(
     allow_headers=CORS_ALLOW_HEADERS,
 )
 
+# 요청 지연 시간/응답 바이트 메트릭 (/metrics)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register_collector(stats_collector(
+        "annotation_cache", "Annotation cache statistics", lambda: get_annotation_cache().get_stats(),
+        ("hits", "misses", "hit_rate", "invalidations", "evictions", "entries", "cached_bytes")
+    ))
+    REGISTRY.register_collector(stats_collector(
+        "frame_cache", "Frame decode cache statistics", lambda: get_frame_decoder().get_stats(),
+        ("frame_hits", "frame_misses", "hit_rate", "seeks", "decoded_frames", "cached_bytes")
+    ))
+
+# 요청별 프로파일링 (X-Profile 헤더 또는 PROFILE_SAMPLE_RATE)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # static 및 template 디렉토리 존재 확인
 if not STATIC_DIR.exists():
     logger.warning(f"Static directory not found: {STATIC_DIR}")
@@ -55,6 +80,26 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 # 라우터 등록
 app.include_router(video.router)
 app.include_router(annotations.router)
+app.include_router(media.router)
+app.include_router(query.router)
+if PROFILING_ENABLED:
+    app.include_router(debug.router)
+
+@app.on_event("startup")
+async def on_startup():
+    """이전 실행에서 중단된 이어받기 업로드의 임시 파일 정리"""
+    await run_io(cleanup_stale_uploads)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """I/O 스레드 풀, 디코딩/스프라이트 프로세스 풀, 파일 감시 및 로그 기록 스레드 정리"""
+    shutdown_io_executor()
+    shutdown_process_pool()
+    sprite_jobs.shutdown()
+    get_frame_decoder().close()
+    get_annotation_cache().close()
+    get_annotation_index().close()
+    stop_logging()
 
 @app.get("/")
 async def read_root():
@@ -104,6 +149,11 @@ async def healthcheck():
         "template_dir_exists": TEMPLATE_DIR.exists()
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: Exception):
     """404 에러 처리"""
@@ -0,0 +1,201 @@
+"""키오스크 데이터 통계 (NIA_data_analysis.ipynb의 iterrows 루프 대체)
+
+user_{i}_* 넓은 컬럼을 한 번만 벡터화하여 긴 형식(사용자당 한 행)으로 펼친 뒤,
+환경 x 속성(성별/연령대/장애 유무) 교차표와 비율, 동작별 시간 집계를 한 번에 계산합니다.
+
+입력은 export_table의 CSV/Parquet 또는 dataset_store 저장소입니다. (pandas 필요)
+
+사용 예:
+    python -m app.pipelines.analysis merged_kiosk_analysis.csv --output report.txt
+    python -m app.pipelines.analysis store/ --output report.json --fps 15
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import re
+import time
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # 선택 의존성: 이 모듈을 사용할 때만 필요
+    pd = None
+
+ATTRIBUTES = ('gender', 'age', 'disability')
+ACTION_COLUMNS = [f'action_type_{i}_duration' for i in range(4)]
+DEFAULT_FPS = 15
+
+ATTRIBUTE_TITLES = {'gender': '성별', 'age': '연령대', 'disability': '장애 유무'}
+
+_USER_COLUMN = re.compile(r'^user_(\d+)_(age|gender|disability)$')
+
+def _require_pandas():
+    if pd is None:
+        raise SystemExit("analysis requires pandas (pip install pandas)")
+
+def melt_users(data: "pd.DataFrame") -> "pd.DataFrame":
+    """넓은 user_{i}_* 컬럼을 (row, environment, user_index, gender, age, disability)로 펼칩니다.
+
+    row는 data의 위치 인덱스이며, 세 속성이 모두 비어 있는 슬롯은 제외합니다.
+    """
+    _require_pandas()
+    slots = sorted({int(m.group(1)) for m in map(_USER_COLUMN.match, data.columns) if m})
+    n = len(data)
+    rows = np.tile(np.arange(n), len(slots))
+    users = {
+        'row': rows,
+        'environment': data['environment'].to_numpy()[rows],
+        'user_index': np.repeat(np.array(slots, dtype=np.int64), n),
+    }
+    empty = np.full(n, np.nan)
+    for field in ATTRIBUTES:
+        users[field] = np.concatenate([
+            data[f'user_{slot}_{field}'].to_numpy(dtype=float) if f'user_{slot}_{field}' in data else empty
+            for slot in slots
+        ]) if slots else np.array([], dtype=float)
+
+    users = pd.DataFrame(users)
+    present = users[list(ATTRIBUTES)].notna().any(axis=1)
+    return _as_codes(users[present].reset_index(drop=True))
+
+def _as_codes(users: "pd.DataFrame") -> "pd.DataFrame":
+    # 속성 코드는 정수 (CSV에서 NaN 때문에 float으로 읽힌 값 복원)
+    return users.astype({field: 'Int64' for field in ATTRIBUTES})
+
+def load_dataset(source: Path) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+    """(영상 데이터, 사용자 긴 테이블)을 읽습니다.
+
+    dataset_store 저장소(videos/ 하위 폴더가 있는 디렉토리)는 긴 테이블을 그대로 사용하고,
+    CSV/Parquet는 melt_users로 펼칩니다.
+    """
+    _require_pandas()
+    source = Path(source)
+    if source.is_dir() and (source / "videos").is_dir():
+        from .dataset_store import load_tables
+        videos, users = load_tables(source)
+        data = videos.to_pandas()
+        users = users.to_pandas()
+        positions = pd.Series(np.arange(len(data)), index=data['video_id'])
+        users['row'] = positions.reindex(users['video_id']).to_numpy()
+        users = users.dropna(subset=['row'])
+        users['row'] = users['row'].astype(np.int64)
+        users['environment'] = data['environment'].to_numpy()[users['row'].to_numpy()]
+        return data, _as_codes(users[['row', 'environment', 'user_index', *ATTRIBUTES]].reset_index(drop=True))
+
+    if source.suffix.lower() == '.parquet':
+        data = pd.read_parquet(source)
+    else:
+        data = pd.read_csv(source)
+    return data, melt_users(data)
+
+def _counts(frame: "pd.DataFrame", index: str, column: str) -> "pd.DataFrame":
+    """pd.crosstab과 같은 결과 (NaN 제외)를 groupby로 계산합니다."""
+    valid = frame[[index, column]].dropna()
+    return valid.groupby([index, column]).size().unstack(fill_value=0)
+
+def _row_ratio(table: "pd.DataFrame") -> "pd.DataFrame":
+    return table.div(table.sum(axis=1), axis=0) * 100
+
+def summarize(data: "pd.DataFrame", users: "pd.DataFrame", fps: float = DEFAULT_FPS) -> Dict[str, object]:
+    """노트북의 모든 집계를 계산하여 {이름: DataFrame/Series}로 반환합니다."""
+    _require_pandas()
+    result: Dict[str, object] = {}
+
+    # 환경 x 속성 분포 (노트북의 성별/연령대/장애 유무 셀)
+    for attr in ATTRIBUTES:
+        counts = _counts(users, 'environment', attr)
+        result[f'{attr}_by_environment'] = counts
+        result[f'{attr}_ratio_by_environment'] = _row_ratio(counts)
+        result[f'{attr}_overall_ratio'] = users[attr].value_counts(normalize=True).sort_index() * 100
+
+    # 동작별 시간 (초 단위)
+    seconds = data[ACTION_COLUMNS].to_numpy(dtype=float) / fps
+    seconds = pd.DataFrame(seconds, columns=[f'action_{i}' for i in range(len(ACTION_COLUMNS))])
+    seconds['environment'] = data['environment'].to_numpy()
+    action_columns = [c for c in seconds.columns if c != 'environment']
+
+    by_env = seconds.groupby('environment')[action_columns]
+    means = by_env.mean()
+    totals = by_env.sum()
+    result['action_mean_seconds_by_environment'] = means
+    result['action_ratio_by_environment'] = _row_ratio(totals)
+    overall = seconds[action_columns].sum()
+    result['action_overall_ratio'] = overall / overall.sum() * 100
+    result['action_describe'] = seconds[action_columns].describe()
+    result['action_correlation'] = seconds[action_columns].corr()
+
+    # 속성별 동작 시간 (사용자마다 해당 영상의 시간을 한 번의 take로 연결)
+    per_user = seconds[action_columns].take(users['row'].to_numpy()).reset_index(drop=True)
+    for attr in ATTRIBUTES:
+        grouped = per_user.groupby(users[attr])
+        attr_means = grouped.mean()
+        attr_means.index.name = attr
+        result[f'action_mean_seconds_by_{attr}'] = attr_means
+        result[f'action_ratio_by_{attr}'] = _row_ratio(attr_means)
+        result[f'action_max_seconds_by_{attr}'] = grouped.max().rename_axis(attr)
+        result[f'action_std_seconds_by_{attr}'] = grouped.std().rename_axis(attr)
+
+    # 환경별 사용자 수 분포
+    user_counts = _counts(data, 'environment', 'user_num')
+    result['user_num_by_environment'] = user_counts
+    result['user_num_ratio_by_environment'] = _row_ratio(user_counts)
+    result['user_num_overall_ratio'] = data['user_num'].value_counts(normalize=True).sort_index() * 100
+    result['user_num_stats_by_environment'] = data.groupby('environment')['user_num'].agg(['mean', 'median', 'std'])
+    return result
+
+SECTION_TITLES = {
+    'action_mean_seconds_by_environment': '환경 유형별 Action Type 평균 사용 시간 (초)',
+    'action_ratio_by_environment': '환경 유형별 Action Type 비율 (%)',
+    'action_overall_ratio': '전체 Action Type 사용 비율 (%)',
+    'action_describe': 'Action Type 기초 통계량 (초)',
+    'action_correlation': 'Action Type 간 상관관계',
+    'user_num_by_environment': '환경 유형별 사용자 수 분포 (영상 개수)',
+    'user_num_ratio_by_environment': '환경 유형별 사용자 수 비율 (%)',
+    'user_num_overall_ratio': '전체 사용자 수 분포 비율 (%)',
+    'user_num_stats_by_environment': '환경 유형별 사용자 수 평균/중앙값/표준편차',
+}
+for _attr, _title in ATTRIBUTE_TITLES.items():
+    SECTION_TITLES.update({
+        f'{_attr}_by_environment': f'환경 유형별 전체 사용자 {_title} 분포 (수치)',
+        f'{_attr}_ratio_by_environment': f'환경 유형별 {_title} 비율 (%)',
+        f'{_attr}_overall_ratio': f'전체 {_title} 비율 (%)',
+        f'action_mean_seconds_by_{_attr}': f'{_title}별 Action Type 평균 시간 (초)',
+        f'action_ratio_by_{_attr}': f'{_title}별 Action Type 비율 (%)',
+        f'action_max_seconds_by_{_attr}': f'{_title}별 Action Type 최대 시간 (초)',
+        f'action_std_seconds_by_{_attr}': f'{_title}별 Action Type 표준편차 (초)',
+    })
+
+def write_report(result: Dict[str, object], output: Path, meta: Dict):
+    """요약을 텍스트(.txt) 또는 JSON(.json) 리포트로 저장합니다."""
+    if output.suffix.lower() == '.json':
+        payload = {"meta": meta}
+        for name, value in result.items():
+            payload[name] = json.loads(value.to_json(orient='split', force_ascii=False))
+        output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding='utf-8')
+        return
+
+    lines = [f"{key}: {value}" for key, value in meta.items()]
+    for name, value in result.items():
+        lines += ["", f"## {SECTION_TITLES.get(name, name)}", value.round(3).to_string()]
+    output.write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="키오스크 데이터 통계 리포트")
+    parser.add_argument("source", type=Path, help="CSV/Parquet 파일 또는 dataset_store 저장소")
+    parser.add_argument("--output", type=Path, default=Path("kiosk_summary.txt"), help="리포트 파일 (.txt 또는 .json)")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="프레임 -> 초 변환 기준 (기본: 15)")
+    args = parser.parse_args(argv)
+    _require_pandas()
+
+    started = time.perf_counter()
+    data, users = load_dataset(args.source)
+    result = summarize(data, users, args.fps)
+    meta = {"source": str(args.source), "videos": len(data), "users": len(users), "fps": args.fps}
+    write_report(result, args.output, meta)
+    meta["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    meta["output"] = str(args.output)
+    print(json.dumps(meta, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""캡션 문장에서 사용자 수(user_num) 추정 (NIA_json_changer.ipynb에서 이식)
+
+규칙은 노트북과 같습니다.
+1. 10 미만의 숫자가 있으면 그 중 최댓값
+2. 띄어쓰기를 제거한 캡션에 1명/2명/3명/4명/다수(5) 표현이 있으면 그 값 (앞 순서 우선)
+3. 기본값 1
+
+표현 목록은 우선순위 순 alternation 하나의 정규식으로 미리 컴파일합니다.
+매칭된 위치 바로 다음부터 다시 검색하므로 겹치는 표현(예: '셋이인'의 '이인')도 놓치지 않습니다.
+
+평가:
+    python -m app.pipelines.caption_user_num evaluate labelled.csv   (caption,user_num 컬럼)
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import csv
+import json
+import re
+import sys
+
+SINGLE_PATTERNS = ['혼자', '개인', '단독', '일인', '1인']
+DOUBLE_PATTERNS = ['둘이', '두명', '두인', '이인', '커플', '부부', '모자', '부자', '남매', '자매', '형제']
+TRIPLE_PATTERNS = ['셋이', '세명', '삼인', '3인']
+FOUR_PATTERNS = ['넷이', '네명', '사인', '4인']
+MULTI_PATTERNS = ['가족', '단체', '그룹', '다수', '여러명', '여럿이', '많은', '복수']
+
+# (user_num, 표현 목록) - 앞 항목일수록 우선
+PATTERN_GROUPS: List[Tuple[int, List[str]]] = [
+    (1, SINGLE_PATTERNS), (2, DOUBLE_PATTERNS), (3, TRIPLE_PATTERNS),
+    (4, FOUR_PATTERNS), (5, MULTI_PATTERNS),
+]
+DEFAULT_USER_NUM = 1
+
+_DIGITS = re.compile(r'\d+')
+
+def _compile_patterns(groups: List[Tuple[int, List[str]]]):
+    """우선순위 순으로 이은 정규식과 {표현: (우선순위, user_num)}을 만듭니다.
+
+    캡처 그룹을 쓰지 않아야 re가 빠르게 매칭하므로 어떤 표현이 매칭됐는지는 사전으로 찾습니다.
+    """
+    lookup = {}
+    for priority, (user_num, patterns) in enumerate(groups):
+        for pattern in patterns:
+            lookup.setdefault(pattern, (priority, user_num))
+    return re.compile("|".join(map(re.escape, lookup))), lookup
+
+_PATTERNS, _PATTERN_LOOKUP = _compile_patterns(PATTERN_GROUPS)
+_BEST_PRIORITY = 0
+
+def extract_user_num_from_caption(caption: str) -> int:
+    """caption에서 user_num 추출"""
+    if not isinstance(caption, str):
+        return DEFAULT_USER_NUM
+
+    best = -1
+    for digits in _DIGITS.findall(caption):
+        value = int(digits)
+        if best < value < 10:
+            best = value
+    if best >= 0:
+        return best
+
+    normalized = caption.replace(" ", "").lower()
+    found = None
+    search = _PATTERNS.search
+    match = search(normalized)
+    while match is not None:
+        priority, user_num = _PATTERN_LOOKUP[match.group()]
+        if found is None or priority < found[0]:
+            found = (priority, user_num)
+            if priority == _BEST_PRIORITY:
+                break
+        match = search(normalized, match.start() + 1)
+    return found[1] if found else DEFAULT_USER_NUM
+
+def classify_captions(captions: Iterable[str]) -> List[int]:
+    """여러 캡션의 user_num을 한 번에 계산합니다."""
+    extract = extract_user_num_from_caption
+    return [extract(caption) for caption in captions]
+
+def user_num_from_segments(segments: Iterable[Dict]) -> int:
+    """세그먼트 캡션 전체에서 추정한 최대 사용자 수 (최소 1)"""
+    captions = [segment["caption"] for segment in segments if "caption" in segment]
+    return max([1] + classify_captions(captions))
+
+# --- 평가 ---
+
+def load_labelled(path: Path) -> List[Tuple[str, int]]:
+    """caption,user_num 컬럼의 CSV 또는 {"caption", "user_num"} JSONL"""
+    samples = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == '.jsonl':
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    samples.append((record["caption"], int(record["user_num"])))
+        else:
+            for record in csv.DictReader(f):
+                samples.append((record["caption"], int(record["user_num"])))
+    return samples
+
+def evaluate(samples: List[Tuple[str, int]]) -> Dict:
+    """혼동 행렬(confusion[정답][예측])과 정확도, 클래스별 precision/recall을 계산합니다."""
+    predictions = classify_captions(caption for caption, _ in samples)
+    labels = sorted({label for _, label in samples} | set(predictions))
+    confusion = {actual: {predicted: 0 for predicted in labels} for actual in labels}
+    mistakes = []
+    for (caption, actual), predicted in zip(samples, predictions):
+        confusion[actual][predicted] += 1
+        if actual != predicted:
+            mistakes.append({"caption": caption, "actual": actual, "predicted": predicted})
+
+    per_class = {}
+    for label in labels:
+        tp = confusion[label][label]
+        predicted_total = sum(confusion[actual][label] for actual in labels)
+        actual_total = sum(confusion[label].values())
+        per_class[label] = {
+            "support": actual_total,
+            "precision": round(tp / predicted_total, 4) if predicted_total else None,
+            "recall": round(tp / actual_total, 4) if actual_total else None,
+        }
+
+    correct = sum(confusion[label][label] for label in labels)
+    return {
+        "samples": len(samples),
+        "accuracy": round(correct / len(samples), 4) if samples else None,
+        "labels": labels,
+        "confusion": confusion,
+        "per_class": per_class,
+        "mistakes": mistakes,
+    }
+
+def format_confusion(result: Dict) -> str:
+    labels = result["labels"]
+    width = max(6, *(len(str(v)) for row in result["confusion"].values() for v in row.values()))
+    lines = ["actual\\pred " + " ".join(f"{label:>{width}}" for label in labels)]
+    for actual in labels:
+        row = result["confusion"][actual]
+        lines.append(f"{actual:>11} " + " ".join(f"{row[p]:>{width}}" for p in labels))
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="캡션 기반 user_num 추정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ev = sub.add_parser("evaluate", help="수작업 라벨과 비교하여 혼동 행렬 출력")
+    ev.add_argument("labelled", type=Path, help="caption,user_num CSV 또는 JSONL")
+    ev.add_argument("--mistakes", type=int, default=20, help="출력할 오분류 예시 수")
+    ev.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+
+    sub.add_parser("classify", help="표준 입력의 캡션(한 줄에 하나)을 분류")
+
+    args = parser.parse_args(argv)
+    if args.command == "classify":
+        captions = [line.rstrip("\n") for line in sys.stdin]
+        for caption, user_num in zip(captions, classify_captions(captions)):
+            print(f"{user_num}\t{caption}")
+        return
+
+    result = evaluate(load_labelled(args.labelled))
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    print(f"samples: {result['samples']}  accuracy: {result['accuracy']}")
+    print(format_confusion(result))
+    for label, stats in result["per_class"].items():
+        print(f"  {label}: precision={stats['precision']} recall={stats['recall']} support={stats['support']}")
+    for mistake in result["mistakes"][:args.mistakes]:
+        print(f"  [{mistake['actual']} -> {mistake['predicted']}] {mistake['caption']}")
+
+if __name__ == "__main__":
+    main()
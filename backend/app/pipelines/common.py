@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypeVar
+import json
+import os
+
+from ..utils.annotation_store import JOURNAL_SUFFIX, journal_path, load_annotation
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json 사용
+    orjson = None
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 어노테이션이 아닌 JSON (저널/백업/임시 파일, 캐시 인덱스 및 인원 검출 결과)
+_SKIP_SUFFIXES = ('.json.bak', '.json.journal', '.tmp', '.people.json')
+
+def is_annotation_json(name: str) -> bool:
+    return name.endswith('.json') and not name.startswith('.') and name != 'index.json'
+
+def iter_annotation_files(root: Path) -> Iterator[Path]:
+    """데이터셋 루트 아래의 어노테이션 JSON 파일을 순회합니다. (숨김 디렉토리 제외)
+
+    저널(.json.journal)만 있고 아직 압축되지 않은 문서도 JSON 경로로 포함합니다.
+    """
+    root = Path(root)
+    if root.is_file():
+        yield root
+        return
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(d for d in dir_names if not d.startswith('.'))
+        names = set(file_names)
+        names.update(
+            name[:-len(JOURNAL_SUFFIX)] for name in file_names
+            if name.endswith('.json' + JOURNAL_SUFFIX)
+        )
+        for name in sorted(names):
+            if is_annotation_json(name) and not name.endswith(_SKIP_SUFFIXES):
+                yield Path(dir_path) / name
+
+def annotation_signature(path: Path) -> str:
+    """증분 처리/체크포인트용 버전 문자열 (JSON과 저널의 mtime:size)
+
+    저널에만 기록된 편집도 버전 변경으로 인식하도록 저널의 stat을 포함합니다.
+    """
+    parts = []
+    for file_path in (Path(path), journal_path(Path(path))):
+        try:
+            st = os.stat(file_path)
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except FileNotFoundError:
+            parts.append("-")
+    return "/".join(parts)
+
+def load_json(path: Path):
+    """JSON 파일을 읽습니다. orjson이 설치되어 있으면 사용합니다."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+def load_annotation_json(path: Path):
+    """어노테이션을 서버와 같은 최신 상태로 읽습니다.
+
+    압축되지 않은 저널이 있으면 annotation_store.load_annotation으로 재적용하고,
+    없으면 load_json으로 빠르게 읽습니다.
+    """
+    path = Path(path)
+    if not journal_path(path).exists():
+        return load_json(path)
+    data = load_annotation(path)
+    if data is None:
+        raise FileNotFoundError(f"Annotation not found: {path}")
+    return data
+
+def parallel_map(func: Callable[[T], R], items: Iterable[T], workers: Optional[int] = None,
+                 chunksize: int = 64) -> Iterator[R]:
+    """프로세스 풀에서 func를 실행하고 완료 순서와 무관하게 입력 순서대로 결과를 반환합니다.
+
+    workers가 1이면 현재 프로세스에서 순차 실행합니다.
+    """
+    if workers == 1:
+        for item in items:
+            yield func(item)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(func, items, chunksize=chunksize)
+
+class Checkpoint:
+    """완료한 파일을 (경로, annotation_signature) JSONL로 기록하여 재실행 시 건너뜁니다.
+
+    path가 None이면 기록하지 않습니다. 잘린 마지막 줄은 무시합니다.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.done: Dict[str, str] = {}
+        self._file = None
+        if path is None:
+            return
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    # 이전 형식(mtime_ns)의 항목은 저널을 반영하지 않으므로 다시 처리
+                    if "signature" in entry:
+                        self.done[entry["path"]] = entry["signature"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def is_done(self, path: str, signature: str) -> bool:
+        return self.done.get(path) == signature
+
+    def record(self, result: Dict):
+        if self._file is not None:
+            self._file.write(json.dumps({"path": result["path"], "signature": result["signature"],
+                                         "status": result["status"]}, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
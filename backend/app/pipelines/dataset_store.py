@@ -0,0 +1,366 @@
+"""분할 저장 컬럼형 데이터셋 (merge_csv_files.ipynb 대체)
+
+배치별 CSV를 하나의 거대한 CSV로 다시 쓰는 대신, 내보낸 결과를 환경/배치별로 분할된
+Arrow IPC(기본) 또는 Parquet 파일로 추가하고 전체 데이터는 지연 스캔(pyarrow.dataset)으로 읽습니다.
+
+    <store>/videos/environment=<env>/batch=<batch>/part-*.arrow   영상당 한 행
+    <store>/users/environment=<env>/batch=<batch>/part-*.arrow    사용자당 한 행 (video_id로 연결)
+
+사용자 속성은 user_{i}_* 넓은 컬럼 대신 (video_id, user_index, age, gender, disability)
+긴 테이블로 저장합니다. Arrow IPC는 비압축으로 기록하므로 메모리 매핑으로 읽을 수 있습니다.
+
+사용 예:
+    python -m app.pipelines.dataset_store append store/ --json-root /data/batch01 --batch batch01
+    python -m app.pipelines.dataset_store append store/ --csv old/kiosk_analysis_01.csv --batch batch01
+    python -m app.pipelines.dataset_store merge store/ --output merged_kiosk_analysis.csv
+"""
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import uuid
+
+from .common import iter_annotation_files, parallel_map
+from .export_table import (
+    BASE_COLUMNS, FLOAT_COLUMNS, STRING_COLUMNS, USER_FIELDS, CHUNK_ROWS,
+    extract_file, integer_value, user_columns
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:  # 선택 의존성: 이 모듈을 사용할 때만 필요
+    pa = None
+
+VIDEOS = "videos"
+USERS = "users"
+FORMATS = {"arrow": "ipc", "parquet": "parquet"}
+
+_USER_COLUMN = re.compile(r'^user_(\d+)_(age|gender|disability)$')
+
+def _require_pyarrow():
+    if pa is None:
+        raise SystemExit("dataset_store requires pyarrow (pip install pyarrow)")
+
+def _field_type(column: str):
+    if column in STRING_COLUMNS:
+        return pa.string()
+    if column in FLOAT_COLUMNS:
+        return pa.float64()
+    return pa.int64()
+
+def video_schema():
+    _require_pyarrow()
+    return pa.schema(
+        [("video_id", pa.string()), ("source", pa.string())]
+        + [(column, _field_type(column)) for column in BASE_COLUMNS if column != 'environment']
+    )
+
+def user_schema():
+    _require_pyarrow()
+    return pa.schema(
+        [("video_id", pa.string()), ("user_index", pa.int64())]
+        + [(field, pa.int64()) for field in USER_FIELDS]
+    )
+
+def partitioning():
+    return ds.partitioning(pa.schema([("environment", pa.int64()), ("batch", pa.string())]), flavor="hive")
+
+def _partition_dir(store: Path, table: str, environment, batch: str) -> Path:
+    return Path(store) / table / f"environment={environment}" / f"batch={batch}"
+
+def _detect_format(store: Path) -> Optional[str]:
+    for path in (Path(store) / VIDEOS).rglob("part-*"):
+        return "parquet" if path.suffix == ".parquet" else "arrow"
+    return None
+
+def _coerce(column: str, value):
+    """CSV에서 읽은 값이나 JSON 값을 컬럼 타입에 맞춥니다.
+
+    정수 컬럼(프레임 수, duration 등)에 소수 값이 있으면 잘라내지 않고 ValueError를 냅니다.
+    (pandas가 쓴 "3.0" 같은 정수 값은 허용)
+    """
+    if value is None or value == '':
+        return None
+    if column in STRING_COLUMNS:
+        return str(value)
+    if column in FLOAT_COLUMNS:
+        return float(value)
+    return integer_value(column, value)
+
+class StoreWriter:
+    """행을 (환경, 배치) 분할별로 모아 CHUNK_ROWS 단위로 파일을 추가합니다."""
+
+    def __init__(self, store: Path, batch: str, fmt: str = "arrow"):
+        _require_pyarrow()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown store format: {fmt}")
+        existing = _detect_format(store)
+        if existing is not None and existing != fmt:
+            raise ValueError(f"Store {store} already uses {existing} files")
+        self.store = Path(store)
+        self.batch = batch
+        self.fmt = fmt
+        self._videos: Dict[int, List[Dict]] = {}
+        self._users: Dict[int, List[Dict]] = {}
+        self.rows = 0
+        self.users = 0
+
+    def add(self, video_id: str, source: str, row: Dict):
+        """export_table.extract_row 형식의 행 (users는 [age, gender, disability] 목록)
+
+        값을 컬럼 타입으로 바꿀 수 없으면 ValueError를 내며, 이 경우 행은 추가되지 않습니다.
+        """
+        environment = _coerce('environment', row['environment'])
+        video = {"video_id": video_id, "source": source}
+        for column in BASE_COLUMNS:
+            if column != 'environment':
+                video[column] = _coerce(column, row.get(column))
+        users = []
+        for index, values in enumerate(row['users']):
+            user = {"video_id": video_id, "user_index": index}
+            user.update({field: _coerce(field, value) for field, value in zip(USER_FIELDS, values)})
+            users.append(user)
+
+        self._videos.setdefault(environment, []).append(video)
+        self._users.setdefault(environment, []).extend(users)
+        self.users += len(users)
+        self.rows += 1
+        if len(self._videos[environment]) >= CHUNK_ROWS:
+            self._flush(environment)
+
+    def _write(self, table_name: str, environment: int, rows: List[Dict], schema):
+        if not rows:
+            return
+        directory = _partition_dir(self.store, table_name, environment, self.batch)
+        directory.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pylist(rows, schema=schema)
+        name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        final = directory / f"{name}.{'parquet' if self.fmt == 'parquet' else 'arrow'}"
+        # 점으로 시작하는 임시 파일은 데이터셋 스캔에서 제외됩니다.
+        tmp = directory / f".{final.name}.tmp"
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, str(tmp))
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, str(tmp), compression="uncompressed")
+        os.replace(tmp, final)
+
+    def _flush(self, environment: int):
+        # 사용자 파일을 먼저 기록: 영상 행만 있고 사용자 행이 없는 상태가 보이지 않도록
+        self._write(USERS, environment, self._users.pop(environment, []), user_schema())
+        self._write(VIDEOS, environment, self._videos.pop(environment, []), video_schema())
+
+    def close(self):
+        for environment in list(self._videos):
+            self._flush(environment)
+
+def drop_batch(store: Path, batch: str) -> int:
+    """배치의 모든 분할을 삭제하고 삭제한 디렉토리 수를 반환합니다."""
+    removed = 0
+    for table_name in (VIDEOS, USERS):
+        for directory in (Path(store) / table_name).glob(f"environment=*/batch={batch}"):
+            shutil.rmtree(directory)
+            removed += 1
+    return removed
+
+def append_json(store: Path, root: Path, batch: str, fmt: str = "arrow",
+                workers: Optional[int] = None) -> Dict:
+    """JSON 어노테이션을 읽어 저장소에 추가합니다."""
+    root = Path(root)
+    writer = StoreWriter(store, batch, fmt)
+    errors = 0
+    items = ((str(path), "") for path in iter_annotation_files(root))
+    for path, _, row, error in parallel_map(extract_file, items, workers=workers):
+        if error is not None:
+            errors += 1
+            print(f"오류: '{path}' 처리 실패: {error}", file=sys.stderr)
+            continue
+        relative = Path(path).relative_to(root) if root.is_dir() else Path(path).name
+        try:
+            writer.add(f"{batch}/{Path(relative).as_posix()}", path, row)
+        except ValueError as e:
+            errors += 1
+            print(f"오류: '{path}' 처리 실패: {e}", file=sys.stderr)
+    writer.close()
+    return {"rows": writer.rows, "users": writer.users, "errors": errors}
+
+def append_csv(store: Path, csv_paths: Iterable[Path], batch: str, fmt: str = "arrow") -> Dict:
+    """json_to_csv로 만든 (넓은 user_{i}_* 컬럼) CSV를 스트리밍으로 읽어 추가합니다."""
+    writer = StoreWriter(store, batch, fmt)
+    errors = 0
+    for csv_path in csv_paths:
+        csv_path = Path(csv_path)
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            slots = {}
+            for column in reader.fieldnames or []:
+                match = _USER_COLUMN.match(column)
+                if match:
+                    slots.setdefault(int(match.group(1)), {})[match.group(2)] = column
+            for line_no, record in enumerate(reader, start=2):
+                users = []
+                for index in sorted(slots):
+                    values = [record.get(slots[index].get(field, '')) for field in USER_FIELDS]
+                    if all(value in (None, '') for value in values):
+                        continue
+                    users.append(values)
+                row = {column: record.get(column) for column in BASE_COLUMNS}
+                row['users'] = users
+                try:
+                    writer.add(f"{batch}/{csv_path.name}:{line_no}", str(csv_path), row)
+                except ValueError as e:
+                    errors += 1
+                    print(f"오류: '{csv_path}' {line_no}행 처리 실패: {e}", file=sys.stderr)
+    writer.close()
+    return {"rows": writer.rows, "users": writer.users, "errors": errors}
+
+def open_table(store: Path, table_name: str = VIDEOS):
+    """분할 전체를 하나의 데이터셋으로 지연 스캔합니다. (데이터는 읽는 시점에 로드)
+
+    Arrow IPC 저장소는 메모리 매핑으로 읽습니다.
+    """
+    _require_pyarrow()
+    fmt = _detect_format(store) or "arrow"
+    schema = video_schema() if table_name == VIDEOS else user_schema()
+    schema = schema.append(pa.field("environment", pa.int64())).append(pa.field("batch", pa.string()))
+    return ds.dataset(
+        str(Path(store) / table_name), schema=schema, format=FORMATS[fmt],
+        partitioning=partitioning(), filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+def load_tables(store: Path, columns: Optional[List[str]] = None, filter=None):
+    """(영상 테이블, 사용자 테이블)을 pyarrow.Table로 읽습니다.
+
+    filter는 영상 테이블에만 적용되며 사용자 테이블은 해당 영상의 행만 남깁니다.
+    pandas가 필요하면 .to_pandas()를 호출하세요.
+    """
+    videos = open_table(store, VIDEOS).to_table(columns=columns, filter=filter)
+    users = open_table(store, USERS)
+    if filter is None:
+        return videos, users.to_table()
+    if 'video_id' not in videos.column_names:
+        videos_ids = open_table(store, VIDEOS).to_table(columns=['video_id'], filter=filter)['video_id']
+    else:
+        videos_ids = videos['video_id']
+    return videos, users.to_table(filter=ds.field('video_id').isin(videos_ids))
+
+def partitions(store: Path) -> List[Dict]:
+    """저장소의 (environment, batch) 분할 목록"""
+    keys = []
+    for fragment in open_table(store, VIDEOS).get_fragments():
+        key = ds.get_partition_keys(fragment.partition_expression)
+        if key not in keys:
+            keys.append(key)
+    return sorted(keys, key=lambda k: (k['environment'], k['batch']))
+
+def iter_wide_rows(store: Path) -> Iterator[Dict]:
+    """기존 병합 CSV 형식(넓은 user_{i}_* 컬럼)의 행을 분할 단위로 생성합니다.
+
+    한 번에 한 분할만 메모리에 올립니다.
+    """
+    videos = open_table(store, VIDEOS)
+    users = open_table(store, USERS)
+    for key in partitions(store):
+        condition = (ds.field('environment') == key['environment']) & (ds.field('batch') == key['batch'])
+        by_video: Dict[str, List] = {}
+        user_table = users.to_table(filter=condition).sort_by([('video_id', 'ascending'), ('user_index', 'ascending')])
+        for user in user_table.to_pylist():
+            by_video.setdefault(user['video_id'], []).append([user[field] for field in USER_FIELDS])
+        for record in videos.to_table(filter=condition).to_pylist():
+            record['users'] = by_video.get(record['video_id'], [])
+            yield record
+
+def max_users(store: Path) -> int:
+    table = open_table(store, USERS).to_table(columns=['user_index'])
+    if table.num_rows == 0:
+        return 0
+    import pyarrow.compute as pc
+    return pc.max(table['user_index']).as_py() + 1
+
+def export_merged_csv(store: Path, output: Path) -> Dict:
+    """저장소 전체를 기존 병합 CSV 형식으로 스트리밍 출력합니다. (source_file 포함)"""
+    users = max_users(store)
+    columns = BASE_COLUMNS + user_columns(users) + ['source_file']
+    count = 0
+    tmp = output.with_name(f".{output.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for record in iter_wide_rows(store):
+            row = {column: record.get(column) for column in BASE_COLUMNS}
+            for i, values in enumerate(record['users']):
+                for field, value in zip(USER_FIELDS, values):
+                    row[f'user_{i}_{field}'] = value
+            row['source_file'] = Path(record['source']).name
+            writer.writerow(row)
+            count += 1
+    os.replace(tmp, output)
+    return {"rows": count, "max_users": users, "output": str(output)}
+
+def store_info(store: Path) -> Dict:
+    videos = open_table(store, VIDEOS)
+    counts = {}
+    for fragment in videos.get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        key = f"environment={keys.get('environment')}/batch={keys.get('batch')}"
+        counts[key] = counts.get(key, 0) + fragment.count_rows()
+    return {
+        "format": _detect_format(store),
+        "videos": sum(counts.values()),
+        "users": open_table(store, USERS).count_rows(),
+        "partitions": counts,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="환경/배치별 분할 컬럼형 데이터셋 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    append = sub.add_parser("append", help="JSON 또는 CSV를 저장소에 추가")
+    append.add_argument("store", type=Path)
+    source = append.add_mutually_exclusive_group(required=True)
+    source.add_argument("--json-root", type=Path, help="어노테이션 JSON 폴더")
+    source.add_argument("--csv", type=Path, nargs="+", help="json_to_csv로 만든 CSV 파일")
+    append.add_argument("--batch", required=True, help="배치 이름 (분할 키)")
+    append.add_argument("--format", choices=sorted(FORMATS), default="arrow", help="파일 형식 (기본: arrow)")
+    append.add_argument("--replace", action="store_true", help="같은 배치의 기존 데이터를 먼저 삭제")
+    append.add_argument("--workers", type=int, default=None, help="프로세스 수 (1이면 순차 실행)")
+
+    merge = sub.add_parser("merge", help="기존 병합 CSV 형식으로 내보내기")
+    merge.add_argument("store", type=Path)
+    merge.add_argument("--output", type=Path, required=True)
+
+    info = sub.add_parser("info", help="분할별 행 수 출력")
+    info.add_argument("store", type=Path)
+
+    args = parser.parse_args(argv)
+    _require_pyarrow()
+    started = time.perf_counter()
+
+    if args.command == "append":
+        if "=" in args.batch or "/" in args.batch or "\\" in args.batch:
+            parser.error("--batch must not contain '=', '/' or '\\'")
+        if args.replace:
+            drop_batch(args.store, args.batch)
+        if args.json_root:
+            summary = append_json(args.store, args.json_root, args.batch, args.format, args.workers)
+        else:
+            summary = append_csv(args.store, args.csv, args.batch, args.format)
+    elif args.command == "merge":
+        summary = export_merged_csv(args.store, args.output)
+    else:
+        summary = store_info(args.store)
+
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
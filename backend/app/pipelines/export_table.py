@@ -0,0 +1,296 @@
+"""어노테이션 JSON -> CSV/Parquet 변환 (json_to_csv.ipynb 대체)
+
+JSON을 한 번만 읽어(프로세스 풀) 행을 상태 DB(SQLite)에 청크 단위로 기록하고,
+최종 출력 시 발견된 최대 사용자 수에 맞춰 user_{i}_* 컬럼을 확장합니다.
+--incremental을 지정하면 상태 DB를 출력 파일 옆에 유지하여 JSON 또는 저널의 mtime/크기가 바뀐 파일만 다시 읽습니다.
+
+사용 예:
+    python -m app.pipelines.export_table /data/batch01 --output kiosk_analysis.csv
+    python -m app.pipelines.export_table /data --output kiosk.parquet --incremental --workers 8
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from .common import annotation_signature, iter_annotation_files, load_annotation_json, parallel_map
+
+BASE_COLUMNS = [
+    'file_name', 'format', 'size', 'width_height', 'environment',
+    'frame_rate', 'total_frames', 'camera_height', 'camera_angle',
+    'InteractionType', 'space_context',
+    'action_type_0_duration', 'action_type_1_duration',
+    'action_type_2_duration', 'action_type_3_duration', 'user_num'
+]
+USER_FIELDS = ('age', 'gender', 'disability')
+STRING_COLUMNS = {'file_name', 'format', 'width_height', 'InteractionType', 'space_context'}
+FLOAT_COLUMNS = {'frame_rate', 'camera_height', 'camera_angle'}
+
+ACTION_TYPES = range(5)  # 0-3, 4는 0(기타)으로 합산
+
+CHUNK_ROWS = 5000
+
+def user_columns(max_users: int) -> List[str]:
+    return [f'user_{i}_{field}' for i in range(max_users) for field in USER_FIELDS]
+
+def integer_value(column: str, value):
+    """정수 컬럼 값을 int로 바꿉니다. 소수 값은 잘라내지 않고 ValueError를 냅니다. (None은 그대로)
+
+    CSV에서 읽은 "3"이나 pandas가 쓴 "3.0" 같은 정수 값은 허용합니다.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{column} must be an integer, got {value!r}")
+    return int(number)
+
+def _column_value(column: str, value):
+    """출력 스키마(string/float64/int64)에 맞는 값인지 확인합니다."""
+    if value is None or column in STRING_COLUMNS:
+        return value
+    if column in FLOAT_COLUMNS:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{column} must be a number, got {value!r}")
+        return value
+    return integer_value(column, value)
+
+def extract_row(data: Dict) -> Dict:
+    """어노테이션 문서에서 한 행을 추출합니다. (사용자 속성은 users 목록으로)"""
+    meta = data['meta_data']
+    annotations = data['annotations']
+    row = {
+        'file_name': meta['file_name'],
+        'format': meta['format'],
+        'size': meta['size'],
+        'width_height': str(meta['width_height']),
+        'environment': meta['environment'],
+        'frame_rate': meta['frame_rate'],
+        'total_frames': meta['total_frames'],
+        'camera_height': meta['camera_height'],
+        'camera_angle': meta['camera_angle'],
+        'InteractionType': data['additional_info']['InteractionType'],
+        'space_context': annotations['space_context'],
+    }
+
+    # 동작별 duration 합계 (action_type 4는 0으로 처리)
+    durations = [0, 0, 0, 0]
+    for segment in annotations.get('segmentation', []):
+        action_type = segment['action_type']
+        if isinstance(action_type, bool) or not isinstance(action_type, int) or action_type not in ACTION_TYPES:
+            raise ValueError(f"Invalid action_type {action_type!r} in segment {segment.get('segment_id')!r}")
+        if action_type == 4:
+            action_type = 0
+        durations[action_type] += integer_value('duration', segment['duration'])
+    for action_type, total in enumerate(durations):
+        row[f'action_type_{action_type}_duration'] = total
+
+    row['user_num'] = annotations['user_num']
+    # Parquet의 int64/float64 컬럼에 맞지 않는 값은 내보내기 전체가 아닌 이 파일의 오류로 처리
+    for column in BASE_COLUMNS:
+        row[column] = _column_value(column, row[column])
+    row['users'] = [
+        [integer_value(field, user[field]) for field in USER_FIELDS]
+        for user in annotations.get('target_objects', [])
+    ]
+    return row
+
+def extract_file(item: Tuple[str, str]) -> Tuple[str, str, Optional[Dict], Optional[str]]:
+    """(경로, 버전, 행, 오류) (프로세스 풀에서 실행, 저널 재적용)"""
+    path, signature = item
+    try:
+        return path, signature, extract_row(load_annotation_json(Path(path))), None
+    except KeyError as e:
+        return path, signature, None, f"missing key '{e.args[0]}'"
+    except (OSError, ValueError, TypeError, IndexError) as e:
+        return path, signature, None, str(e)
+
+class ExportState:
+    """파일별 추출 결과를 저장하는 SQLite 상태 DB"""
+
+    def __init__(self, db_path: Path):
+        self.conn = sqlite3.connect(str(db_path))
+        columns = {info[1] for info in self.conn.execute("PRAGMA table_info(rows)")}
+        if columns and "signature" not in columns:
+            # 이전 형식(mtime_ns, size)은 저널 변경을 반영하지 않으므로 다시 추출
+            self.conn.execute("DROP TABLE rows")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                path TEXT PRIMARY KEY,
+                signature TEXT NOT NULL,
+                user_count INTEGER NOT NULL,
+                row TEXT NOT NULL
+            );
+        """)
+
+    def known(self) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT path, signature FROM rows"))
+
+    def upsert(self, rows: List[Tuple[str, str, Dict]]):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO rows (path, signature, user_count, row) VALUES (?, ?, ?, ?)",
+            [(path, signature, len(row['users']), json.dumps(row, ensure_ascii=False))
+             for path, signature, row in rows]
+        )
+        self.conn.commit()
+
+    def delete(self, paths: List[str]):
+        self.conn.executemany("DELETE FROM rows WHERE path = ?", [(p,) for p in paths])
+        self.conn.commit()
+
+    def max_users(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(user_count), 0) FROM rows").fetchone()[0]
+
+    def iter_chunks(self, chunk_rows: int = CHUNK_ROWS) -> Iterator[List[Dict]]:
+        cursor = self.conn.execute("SELECT row FROM rows ORDER BY path")
+        while True:
+            batch = cursor.fetchmany(chunk_rows)
+            if not batch:
+                break
+            yield [json.loads(row) for (row,) in batch]
+
+    def close(self):
+        self.conn.close()
+
+def flatten(row: Dict, max_users: int) -> Dict:
+    """users 목록을 user_{i}_* 컬럼으로 펼칩니다. (없는 사용자는 None)"""
+    flat = {column: row[column] for column in BASE_COLUMNS}
+    users = row['users']
+    for i in range(max_users):
+        values = users[i] if i < len(users) else (None, None, None)
+        for field, value in zip(USER_FIELDS, values):
+            flat[f'user_{i}_{field}'] = value
+    return flat
+
+def write_csv(state: ExportState, output: Path, max_users: int) -> int:
+    columns = BASE_COLUMNS + user_columns(max_users)
+    count = 0
+    tmp = output.with_name(f".{output.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for chunk in state.iter_chunks():
+            writer.writerows(flatten(row, max_users) for row in chunk)
+            count += len(chunk)
+    os.replace(tmp, output)
+    return count
+
+def write_parquet(state: ExportState, output: Path, max_users: int) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+
+    columns = BASE_COLUMNS + user_columns(max_users)
+    schema = pa.schema([
+        (column, pa.string() if column in STRING_COLUMNS
+         else pa.float64() if column in FLOAT_COLUMNS else pa.int64())
+        for column in columns
+    ])
+    count = 0
+    tmp = output.with_name(f".{output.name}.tmp")
+    with pq.ParquetWriter(str(tmp), schema) as writer:
+        for chunk in state.iter_chunks():
+            flat = [flatten(row, max_users) for row in chunk]
+            table = pa.Table.from_pydict({
+                c: [None if r[c] is None else str(r[c]) for r in flat] if c in STRING_COLUMNS
+                else [r[c] for r in flat]
+                for c in columns
+            }, schema=schema)
+            writer.write_table(table)
+            count += len(chunk)
+    os.replace(tmp, output)
+    return count
+
+def export_table(root: Path, output: Path, fmt: str = "csv", workers: Optional[int] = None,
+                 incremental: bool = False, state_path: Optional[Path] = None) -> Dict:
+    """JSON을 읽어 CSV/Parquet로 내보내고 요약을 반환합니다."""
+    started = time.perf_counter()
+    tmp_dir = None
+    if incremental:
+        state_path = state_path or output.with_name(output.name + ".state.sqlite")
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        state_path = Path(tmp_dir.name) / "state.sqlite"
+
+    state = ExportState(state_path)
+    summary = {"files": 0, "parsed": 0, "unchanged": 0, "removed": 0, "errors": 0}
+    try:
+        known = state.known()
+        pending = []
+        seen = set()
+        for path in iter_annotation_files(root):
+            key = str(path)
+            seen.add(key)
+            signature = annotation_signature(path)
+            summary["files"] += 1
+            if known.get(key) == signature:
+                summary["unchanged"] += 1
+                continue
+            pending.append((key, signature))
+
+        removed = [path for path in known if path not in seen]
+        state.delete(removed)
+        summary["removed"] = len(removed)
+
+        batch = []
+        failed = []
+        for path, signature, row, error in parallel_map(extract_file, pending, workers=workers):
+            if error is not None:
+                summary["errors"] += 1
+                failed.append(path)
+                print(f"오류: '{path}' 처리 실패: {error}", file=sys.stderr)
+                continue
+            batch.append((path, signature, row))
+            summary["parsed"] += 1
+            if len(batch) >= CHUNK_ROWS:
+                state.upsert(batch)
+                batch = []
+        if batch:
+            state.upsert(batch)
+        # 변경 후 읽을 수 없게 된 파일의 이전 행은 출력에서 제외
+        state.delete(failed)
+
+        max_users = state.max_users()
+        writer = write_parquet if fmt == "parquet" else write_csv
+        summary["rows"] = writer(state, output, max_users)
+        summary["max_users"] = max_users
+    finally:
+        state.close()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    summary["output"] = str(output)
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="어노테이션 JSON을 CSV/Parquet로 변환")
+    parser.add_argument("root", type=Path, help="JSON 파일이 있는 폴더")
+    parser.add_argument("--output", type=Path, help="출력 파일 (기본: <root>/kiosk_analysis.csv)")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="출력 형식 (기본: 확장자로 결정)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--incremental", action="store_true", help="변경된 JSON만 다시 읽기")
+    args = parser.parse_args(argv)
+
+    output = args.output or (args.root / "kiosk_analysis.csv")
+    fmt = args.format or ("parquet" if output.suffix.lower() == ".parquet" else "csv")
+    summary = export_table(args.root, output, fmt, args.workers, args.incremental)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""이전 버전(info/segments) JSON을 최신 스키마(meta_data/annotations)로 일괄 변환
+(NIA_json_changer.ipynb 대체)
+
+- 프로세스 풀에서 병렬로 변환하고, 완료한 파일을 체크포인트(JSONL)에 기록하여 중단 후 이어서 실행합니다.
+- 같은 이름의 비디오가 비디오 메타데이터 캐시에 있으면 실제 fps와 프레임 수를 사용하고,
+  15fps 기준으로 기록된 구간 프레임도 실제 fps 기준으로 환산합니다.
+  (없으면 이전과 같이 15fps, playtime * 15) --probe를 지정하면 캐시에 없는 비디오를 직접 프로브합니다.
+- 결과는 임시 파일 + rename으로 원자적으로 기록합니다.
+- --dry-run은 파일을 쓰지 않고 변환 결과 요약(및 --diff 시 unified diff)만 출력합니다.
+
+사용 예:
+    python -m app.pipelines.migrate_legacy /data/legacy --output /data/legacy_new_ver --workers 8
+    python -m app.pipelines.migrate_legacy /data/legacy --in-place
+    python -m app.pipelines.migrate_legacy /data/legacy --dry-run --diff | less
+"""
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import argparse
+import difflib
+import json
+import sys
+import time
+
+from config import ALLOWED_VIDEO_EXTENSIONS
+from ..utils.annotation_store import atomic_write_json, save_annotation_document
+from .caption_user_num import user_num_from_segments
+from .common import Checkpoint, annotation_signature, iter_annotation_files, load_annotation_json, parallel_map
+
+DEFAULT_FRAME_RATE = 15
+
+def classify_json_version(json_data) -> str:
+    """JSON 버전 판별 ("new", "old", "unknown")"""
+    if not isinstance(json_data, dict):
+        return "unknown"
+    if "meta_data" in json_data and "annotations" in json_data:
+        return "new"
+    if "info" in json_data and "segments" in json_data:
+        return "old"
+    return "unknown"
+
+def convert_json_to_latest_version(old_json: Dict, video_meta: Optional[Dict] = None) -> Dict:
+    """이전 버전 JSON을 최신 버전으로 변환합니다.
+
+    video_meta(fps, frame_count)가 있으면 실제 값을, 없으면 15fps 기준 값을 사용합니다.
+    이전 버전의 구간 프레임은 15fps 기준이므로 실제 fps를 쓰는 경우 fps/15 비율로 환산합니다.
+    """
+    info = old_json["info"]
+
+    # user_num 결정 (모든 caption 검사)
+    max_user_num = user_num_from_segments(old_json["segments"])
+
+    if video_meta and video_meta.get("fps") and video_meta.get("frame_count"):
+        frame_rate = video_meta["fps"]
+        frame_rate = int(frame_rate) if float(frame_rate).is_integer() else round(frame_rate, 3)
+        total_frames = int(video_meta["frame_count"])
+    else:
+        frame_rate = DEFAULT_FRAME_RATE
+        total_frames = int(info["playtime"] * DEFAULT_FRAME_RATE) if info["playtime"] else 0
+    scale = frame_rate / DEFAULT_FRAME_RATE
+    segments = [_rescale_segment(seg, scale, total_frames) for seg in old_json["segments"]]
+
+    return {
+        "meta_data": {
+            "file_name": info["filename"],
+            "format": info["format"],
+            "size": info["size"],
+            "width_height": info["width_height"],
+            "environment": 0,
+            "frame_rate": frame_rate,
+            "total_frames": total_frames,
+            "camera_height": 170,
+            "camera_angle": 15
+        },
+        "additional_info": old_json["additional_info"],
+        "annotations": {
+            "space_context": "",
+            "user_num": max_user_num,
+            "target_objects": [
+                {"object_id": i, "age": 1, "gender": 1, "disability": 2}
+                for i in range(max_user_num)
+            ],
+            "segmentation": [
+                {
+                    "segment_id": seg["segment_id"],
+                    "action_type": seg["action"],
+                    "start_frame": start,
+                    "end_frame": end,
+                    "duration": end - start,
+                    "keyframe": (start + end) // 2,
+                    "keypoints": [{"object_id": i, "keypoints": []} for i in range(max_user_num)]
+                }
+                for seg, (start, end) in zip(old_json["segments"], segments)
+            ]
+        }
+    }
+
+def _rescale_segment(seg: Dict, scale: float, total_frames: int) -> Tuple[int, int]:
+    """15fps 기준 (start_frame, end_frame)을 실제 fps 기준으로 환산합니다. (구간이 없어지지 않도록 최소 1프레임)"""
+    start, end = seg["start_frame"], seg["end_frame"]
+    if scale == 1:
+        return start, end
+    start, end = int(round(start * scale)), int(round(end * scale))
+    if total_frames:
+        end = min(end, total_frames)
+    return start, max(end, start + 1)
+
+def find_video(json_path: Path, old_json: Dict) -> Optional[Path]:
+    """JSON과 같은 이름의 비디오(또는 info.filename)를 찾습니다."""
+    candidates = [json_path.with_suffix(ext) for ext in sorted(ALLOWED_VIDEO_EXTENSIONS)]
+    filename = old_json.get("info", {}).get("filename")
+    if isinstance(filename, str) and filename:
+        candidates.insert(0, json_path.parent / Path(filename).name)
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    return None
+
+def lookup_video_meta(json_path: Path, old_json: Dict, probe: bool = False) -> Tuple[Optional[Dict], str]:
+    """(비디오 메타데이터, 출처)를 반환합니다. 출처는 "cache", "probe" 또는 "default"."""
+    video = find_video(json_path, old_json)
+    if video is None:
+        return None, "default"
+    try:
+        from ..utils.video_probe import get_cached_video_meta, probe_video, VideoProbeError
+    except ImportError:  # OpenCV가 없는 환경에서는 기본값으로 변환
+        return None, "default"
+
+    meta = get_cached_video_meta(video)
+    if meta is not None:
+        return meta, "cache"
+    if probe:
+        try:
+            return probe_video(str(video)), "probe"
+        except VideoProbeError:
+            pass
+    return None, "default"
+
+def _dump(data) -> List[str]:
+    return json.dumps(data, ensure_ascii=False, indent=2).splitlines(keepends=True)
+
+class MigrationTask:
+    """프로세스 풀 작업자에 전달하는 변환 설정"""
+
+    def __init__(self, root: Path, output: Optional[Path], dry_run: bool, diff: bool, probe: bool):
+        self.root = root
+        self.output = output
+        self.dry_run = dry_run
+        self.diff = diff
+        self.probe = probe
+
+    def target_for(self, path: Path) -> Path:
+        if self.output is None:
+            return path
+        relative = path.relative_to(self.root) if self.root.is_dir() else Path(path.name)
+        return self.output / relative
+
+    def __call__(self, item: Tuple[str, str]) -> Dict:
+        path = Path(item[0])
+        result = {"path": str(path), "signature": item[1], "status": "error"}
+        try:
+            data = load_annotation_json(path)
+        except (OSError, ValueError) as e:
+            result["error"] = str(e)
+            return result
+
+        version = classify_json_version(data)
+        if version != "old":
+            result["status"] = "skipped" if version == "new" else "unknown"
+            return result
+
+        try:
+            meta, source = lookup_video_meta(path, data, self.probe)
+            converted = convert_json_to_latest_version(data, meta)
+        except (KeyError, TypeError, ValueError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            return result
+
+        target = self.target_for(path)
+        annotations = converted["annotations"]
+        result.update({
+            "status": "converted", "target": str(target), "fps_source": source,
+            "frame_rate": converted["meta_data"]["frame_rate"],
+            "total_frames": converted["meta_data"]["total_frames"],
+            "user_num": annotations["user_num"], "segments": len(annotations["segmentation"]),
+        })
+
+        if self.dry_run:
+            if self.diff:
+                before = load_annotation_json(target) if target != path and target.exists() else data
+                result["diff"] = "".join(difflib.unified_diff(
+                    _dump(before), _dump(converted), fromfile=str(target if before is not data else path),
+                    tofile=str(target)
+                ))
+            return result
+
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target == path:
+                # 제자리 변환: 원본을 .json.bak으로 보관한 뒤 교체
+                # (변환 결과에 저널이 이미 반영되어 있으므로 저장하면서 저널을 제거)
+                atomic_write_json(path.with_suffix('.json.bak'), data)
+                save_annotation_document(target, converted)
+            else:
+                atomic_write_json(target, converted)
+        except OSError as e:
+            # 쓸 수 없는 대상은 이 파일만 오류로 기록하고 나머지 변환은 계속
+            result.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        return result
+
+def _pending(root: Path, checkpoint: Checkpoint, summary: Dict) -> Iterator[Tuple[str, str]]:
+    for path in iter_annotation_files(root):
+        signature = annotation_signature(path)
+        if checkpoint.is_done(str(path), signature):
+            summary["resumed"] += 1
+            continue
+        yield str(path), signature
+
+def migrate(root: Path, output: Optional[Path] = None, workers: Optional[int] = None,
+            checkpoint_path: Optional[Path] = None, dry_run: bool = False, diff: bool = False,
+            probe: bool = False, on_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """데이터셋의 이전 버전 JSON을 변환하고 요약을 반환합니다.
+
+    output이 None이면 제자리 변환(원본은 .json.bak)입니다. dry-run은 체크포인트를 쓰지 않습니다.
+    on_result는 최신 버전이 아닌 파일마다 결과와 함께 호출됩니다.
+    """
+    started = time.perf_counter()
+    root = Path(root)
+    task = MigrationTask(root, output, dry_run, diff, probe)
+    checkpoint = Checkpoint(None if dry_run else checkpoint_path)
+    summary = {"files": 0, "converted": 0, "skipped": 0, "unknown": 0, "error": 0, "resumed": 0,
+               "fps_source": {}}
+    try:
+        for i, result in enumerate(parallel_map(task, _pending(root, checkpoint, summary), workers=workers)):
+            summary["files"] += 1
+            summary[result["status"]] += 1
+            if "fps_source" in result:
+                sources = summary["fps_source"]
+                sources[result["fps_source"]] = sources.get(result["fps_source"], 0) + 1
+            if result["status"] == "error":
+                print(f"오류: '{result['path']}' 변환 실패: {result['error']}", file=sys.stderr)
+            elif result["status"] != "unknown":
+                checkpoint.record(result)
+            if on_result is not None and result["status"] != "skipped":
+                on_result(result)
+            if i % 500 == 499:
+                checkpoint.flush()
+    finally:
+        checkpoint.close()
+    summary["files"] += summary["resumed"]
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="이전 버전 JSON을 최신 스키마로 변환")
+    parser.add_argument("root", type=Path, help="변환할 JSON 폴더 (하위 폴더 포함)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--output", type=Path, help="결과 폴더 (기본: <root>_new_ver, 하위 경로 유지)")
+    target.add_argument("--in-place", action="store_true", help="원본을 교체 (원본은 .json.bak으로 보관)")
+    parser.add_argument("--checkpoint", type=Path, help="체크포인트 파일 (기본: <결과 폴더>/.migrate_checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--probe", action="store_true", help="캐시에 없는 비디오를 직접 프로브")
+    parser.add_argument("--dry-run", action="store_true", help="파일을 쓰지 않고 결과만 출력")
+    parser.add_argument("--diff", action="store_true", help="--dry-run 시 unified diff 포함")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    output = None if args.in_place else (args.output or root.parent / f"{root.name}_new_ver").resolve()
+    checkpoint = args.checkpoint or (output or root) / ".migrate_checkpoint.jsonl"
+
+    def print_result(result: Dict):
+        # --diff는 사람이 읽는 unified diff, 그 외 dry-run은 파일당 JSON 한 줄
+        if args.diff:
+            sys.stdout.write(result.get("diff") or "")
+        else:
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    summary = migrate(root, output, args.workers, checkpoint, args.dry_run, args.diff, args.probe,
+                      print_result if args.dry_run else None)
+    print(json.dumps(summary, ensure_ascii=False, indent=2), file=sys.stderr)
+    sys.exit(1 if summary["error"] else 0)
+
+if __name__ == "__main__":
+    main()
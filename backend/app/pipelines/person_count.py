@@ -0,0 +1,343 @@
+"""영상의 주 사용자 수 검출로 user_num 검증 (NIA_json_userNumCheck.ipynb 대체)
+
+- 검출기는 작업 프로세스마다 한 번만 로드합니다. (노트북은 영상마다 YOLO 모델을 다시 로드)
+- sample_interval 프레임마다 한 프레임만 디코딩합니다. 건너뛰는 프레임은 grab()만 하고
+  (--seek이면 CAP_PROP_POS_FRAMES로 이동) 샘플 프레임은 묶어서 한 번에 추론합니다.
+- 검출 결과는 IoU 기반 추적기로 인물별 등장 횟수를 세고, 충분히 크게/오래 등장한 인물만 셉니다.
+- 결과는 JSON 옆의 <이름>.people.json에 기록하고 체크포인트로 중단 후 이어서 실행합니다.
+
+검출기는 "yolo"(ultralytics, 기본), "stub:<인원 수>"(테스트용) 또는 "모듈:클래스" 경로로 지정합니다.
+클래스는 detect(frames) -> 프레임마다 [(x, y, w, h), ...] 목록을 반환해야 합니다.
+
+사용 예:
+    python -m app.pipelines.person_count /data/batch01 --workers 4
+    python -m app.pipelines.person_count /data/batch01 --all --detector stub:2 --workers 1
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import time
+
+from config import ALLOWED_VIDEO_EXTENSIONS
+from ..utils.annotation_store import atomic_write_json
+from .common import Checkpoint, annotation_signature, iter_annotation_files, load_annotation_json, parallel_map
+
+Box = Tuple[float, float, float, float]  # 중심 x, 중심 y, 너비, 높이 (픽셀)
+
+RESULT_SUFFIX = ".people.json"
+DEFAULT_MODEL = "yolov8s.pt"
+# 이 간격 이상이면 grab()으로 건너뛰는 대신 탐색(seek)합니다.
+SEEK_THRESHOLD = 30
+
+class YoloDetector:
+    """ultralytics YOLO 사람(class 0) 검출기"""
+
+    def __init__(self, model: str = DEFAULT_MODEL, device: Optional[str] = None, threads: Optional[int] = None):
+        import torch
+        from ultralytics import YOLO
+
+        if threads:
+            # 여러 작업 프로세스가 CPU 코어를 나눠 쓰도록 프로세스당 스레드 수를 제한
+            torch.set_num_threads(threads)
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = YOLO(model).to(self.device)
+
+    def detect(self, frames: Sequence) -> List[List[Box]]:
+        results = self.model.predict(list(frames), classes=[0], device=self.device, verbose=False)
+        return [[tuple(float(v) for v in box) for box in result.boxes.xywh.tolist()] for result in results]
+
+class StubDetector:
+    """모든 프레임에서 고정된 위치의 인물 count명을 반환하는 테스트용 검출기"""
+
+    def __init__(self, count: int = 1):
+        self.count = count
+
+    def detect(self, frames: Sequence) -> List[List[Box]]:
+        boxes = []
+        for frame in frames:
+            height, width = frame.shape[:2]
+            step = width / (self.count + 1)
+            boxes.append([(step * (i + 1), height / 2, step * 0.8, height * 0.8) for i in range(self.count)])
+        return boxes
+
+def create_detector(spec: str, threads: Optional[int] = None):
+    if spec == "yolo" or spec.startswith("yolo:"):
+        model = spec.split(":", 1)[1] if ":" in spec else DEFAULT_MODEL
+        return YoloDetector(model, threads=threads)
+    if spec.startswith("stub"):
+        return StubDetector(int(spec.split(":", 1)[1]) if ":" in spec else 1)
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+# 작업 프로세스마다 한 번만 생성 (spec별)
+_detectors: Dict[str, object] = {}
+
+def get_detector(spec: str, threads: Optional[int] = None):
+    detector = _detectors.get(spec)
+    if detector is None:
+        detector = _detectors[spec] = create_detector(spec, threads)
+    return detector
+
+def iter_sampled_frames(video_path: Path, sample_interval: int, seek: Optional[bool] = None) -> Iterator:
+    """sample_interval번째 프레임마다 디코딩한 프레임을 생성합니다. (노트북과 같이 1부터 세어 interval의 배수)"""
+    import cv2
+
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            return
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if seek is None:
+            seek = sample_interval >= SEEK_THRESHOLD and total_frames > 0
+
+        if seek:
+            for index in range(sample_interval - 1, total_frames, sample_interval):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield frame
+            return
+
+        while True:
+            # 건너뛰는 프레임은 디코딩하지 않음
+            for _ in range(sample_interval - 1):
+                if not cap.grab():
+                    return
+            if not cap.grab():
+                return
+            ok, frame = cap.retrieve()
+            if ok:
+                yield frame
+    finally:
+        cap.release()
+
+def _iou(a: Box, b: Box) -> float:
+    ax1, ay1, ax2, ay2 = a[0] - a[2] / 2, a[1] - a[3] / 2, a[0] + a[2] / 2, a[1] + a[3] / 2
+    bx1, by1, bx2, by2 = b[0] - b[2] / 2, b[1] - b[3] / 2, b[0] + b[2] / 2, b[1] + b[3] / 2
+    iw = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+    ih = max(0.0, min(ay2, by2) - max(ay1, by1))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+class IoUTracker:
+    """샘플 프레임 간 박스를 IoU로 연결하여 인물별 등장 횟수를 셉니다."""
+
+    def __init__(self, min_area: float, iou_threshold: float = 0.3, max_missed: int = 5):
+        self.min_area = min_area
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks: Dict[int, Dict] = {}
+        self.hits: Dict[int, int] = {}
+        self._next_id = 0
+
+    def update(self, boxes: List[Box]):
+        pairs = sorted(
+            ((_iou(track["box"], box), track_id, i)
+             for track_id, track in self.tracks.items() for i, box in enumerate(boxes)),
+            reverse=True
+        )
+        matched_tracks, matched_boxes = set(), set()
+        for iou, track_id, i in pairs:
+            if iou < self.iou_threshold:
+                break
+            if track_id in matched_tracks or i in matched_boxes:
+                continue
+            matched_tracks.add(track_id)
+            matched_boxes.add(i)
+            self._hit(track_id, boxes[i])
+
+        for track_id in list(self.tracks):
+            if track_id not in matched_tracks:
+                self.tracks[track_id]["missed"] += 1
+                if self.tracks[track_id]["missed"] > self.max_missed:
+                    del self.tracks[track_id]
+
+        for i, box in enumerate(boxes):
+            if i not in matched_boxes:
+                track_id = self._next_id
+                self._next_id += 1
+                self._hit(track_id, box)
+
+    def _hit(self, track_id: int, box: Box):
+        self.tracks[track_id] = {"box": box, "missed": 0}
+        # 충분히 큰 크기의 사람만 카운트
+        if box[2] * box[3] >= self.min_area:
+            self.hits[track_id] = self.hits.get(track_id, 0) + 1
+
+def count_people(video_path: Path, detector, sample_interval: int = 7, min_presence_ratio: float = 0.3,
+                 min_size_ratio: float = 0.1, batch_size: int = 16, seek: Optional[bool] = None) -> Dict:
+    """비디오의 주 사용자 수를 검출합니다."""
+    import cv2
+
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            raise OSError(f"Cannot open video: {video_path}")
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+    finally:
+        cap.release()
+
+    tracker = IoUTracker(min_area=width * height * min_size_ratio)
+    sampled = 0
+    batch = []
+    for frame in iter_sampled_frames(video_path, sample_interval, seek):
+        batch.append(frame)
+        if len(batch) >= batch_size:
+            for boxes in detector.detect(batch):
+                tracker.update(boxes)
+            sampled += len(batch)
+            batch = []
+    if batch:
+        for boxes in detector.detect(batch):
+            tracker.update(boxes)
+        sampled += len(batch)
+
+    # 충분한 시간 등장한 사람만 카운트
+    min_hits = (total_frames / sample_interval) * min_presence_ratio
+    main_people = sum(1 for hits in tracker.hits.values() if hits >= min_hits)
+    return {"people": main_people, "tracks": len(tracker.hits), "sampled_frames": sampled,
+            "total_frames": total_frames}
+
+def find_video(json_path: Path) -> Optional[Path]:
+    for ext in sorted(ALLOWED_VIDEO_EXTENSIONS):
+        video = json_path.with_suffix(ext)
+        if video.exists():
+            return video
+    return None
+
+def result_path(json_path: Path) -> Path:
+    return json_path.with_name(json_path.stem + RESULT_SUFFIX)
+
+class CountTask:
+    """프로세스 풀 작업자에 전달하는 검출 설정"""
+
+    def __init__(self, detector: str, threads: Optional[int], check_all: bool, options: Dict):
+        self.detector = detector
+        self.threads = threads
+        self.check_all = check_all
+        self.options = options
+
+    def __call__(self, item: Tuple[str, str]) -> Dict:
+        json_path = Path(item[0])
+        result = {"path": str(json_path), "signature": item[1], "status": "error"}
+        try:
+            user_num = load_annotation_json(json_path).get('annotations', {}).get('user_num', 0)
+        except (OSError, ValueError, AttributeError) as e:
+            result["error"] = str(e)
+            return result
+
+        # 기본은 노트북과 같이 user_num이 1인 파일만 검사
+        if not self.check_all and user_num != 1:
+            result["status"] = "skipped"
+            return result
+
+        video = find_video(json_path)
+        if video is None:
+            result.update(status="no_video", error="Video file not found")
+            return result
+
+        started = time.perf_counter()
+        try:
+            detected = count_people(video, get_detector(self.detector, self.threads), **self.options)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            return result
+
+        result.update(detected)
+        result.update({
+            "status": "need_fix" if detected["people"] > user_num else "ok",
+            "video": str(video), "user_num": user_num,
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+        })
+        record = {key: result[key] for key in ("video", "user_num", "people", "tracks", "sampled_frames",
+                                               "total_frames", "status")}
+        try:
+            atomic_write_json(result_path(json_path), {**record, "options": self.options, "detector": self.detector})
+        except OSError as e:
+            # 결과 파일을 쓸 수 없으면 이 파일만 오류로 기록 (체크포인트에 남기지 않아 다음 실행에서 다시 검사)
+            result.update(status="error", error=f"{type(e).__name__}: {e}")
+        return result
+
+def check_dataset(root: Path, detector: str = "yolo", workers: Optional[int] = None,
+                  checkpoint_path: Optional[Path] = None, check_all: bool = False,
+                  copy_to: Optional[Path] = None, **options) -> Dict:
+    """데이터셋의 user_num을 영상 검출 결과와 비교하고 요약을 반환합니다."""
+    started = time.perf_counter()
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    task = CountTask(detector, threads, check_all, options)
+    checkpoint = Checkpoint(checkpoint_path)
+    summary = {"files": 0, "ok": 0, "need_fix": 0, "skipped": 0, "no_video": 0, "error": 0, "resumed": 0}
+    need_fix = []
+
+    def pending():
+        for path in iter_annotation_files(root):
+            signature = annotation_signature(path)
+            if checkpoint.is_done(str(path), signature):
+                summary["resumed"] += 1
+                continue
+            yield str(path), signature
+
+    try:
+        # 영상 하나가 무거운 작업이므로 chunksize 1로 고르게 분배
+        for result in parallel_map(task, pending(), workers=workers, chunksize=1):
+            summary["files"] += 1
+            summary[result["status"]] += 1
+            if result["status"] == "error":
+                print(f"오류: '{result['path']}' 검출 실패: {result['error']}", file=sys.stderr)
+                continue
+            checkpoint.record(result)
+            checkpoint.flush()
+            if result["status"] == "need_fix":
+                need_fix.append(result)
+                print(f"- {Path(result['path']).name}: user_num={result['user_num']}, "
+                      f"검출된 주 사용자 수 = {result['people']}명", file=sys.stderr)
+                if copy_to is not None:
+                    copy_to.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(result["path"], copy_to)
+                    shutil.copy2(result["video"], copy_to)
+    finally:
+        checkpoint.close()
+
+    summary["files"] += summary["resumed"]
+    summary["need_fix_files"] = [{"path": r["path"], "user_num": r["user_num"], "people": r["people"]}
+                                 for r in need_fix]
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="영상 인원 검출로 user_num 검증")
+    parser.add_argument("root", type=Path, help="JSON과 비디오가 있는 폴더 (하위 폴더 포함)")
+    parser.add_argument("--detector", default="yolo", help="yolo[:모델], stub[:인원 수] 또는 모듈:클래스")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어의 절반)")
+    parser.add_argument("--all", action="store_true", help="user_num과 관계없이 모든 파일 검사")
+    parser.add_argument("--sample-interval", type=int, default=7, help="몇 프레임마다 검사할지")
+    parser.add_argument("--min-presence-ratio", type=float, default=0.3, help="최소 등장 비율 (0~1)")
+    parser.add_argument("--min-size-ratio", type=float, default=0.1, help="화면 대비 최소 크기 비율 (0~1)")
+    parser.add_argument("--batch-size", type=int, default=16, help="한 번에 추론할 프레임 수")
+    parser.add_argument("--seek", action="store_true", default=None,
+                        help=f"grab() 대신 탐색으로 건너뛰기 (기본: 간격 {SEEK_THRESHOLD} 이상이면 자동)")
+    parser.add_argument("--checkpoint", type=Path, help="체크포인트 파일 (기본: <root>/.person_count_checkpoint.jsonl)")
+    parser.add_argument("--copy-to", type=Path, help="수정이 필요한 JSON과 비디오를 복사할 폴더")
+    args = parser.parse_args(argv)
+
+    summary = check_dataset(
+        args.root, args.detector, args.workers,
+        args.checkpoint or args.root / ".person_count_checkpoint.jsonl", args.all, args.copy_to,
+        sample_interval=args.sample_interval, min_presence_ratio=args.min_presence_ratio,
+        min_size_ratio=args.min_size_ratio, batch_size=args.batch_size, seek=args.seek,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    sys.exit(1 if summary["error"] else 0)
+
+if __name__ == "__main__":
+    main()
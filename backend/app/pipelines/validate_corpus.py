@@ -0,0 +1,174 @@
+"""어노테이션 데이터셋 일괄 검증
+
+서버의 검증 규칙(app.utils.annotation_schema)을 그대로 사용하여 데이터셋 루트 아래의
+모든 JSON을 프로세스 풀에서 검증하고, 결과를 JSONL 또는 CSV 리포트로 스트리밍합니다.
+파일 단위 교차 검증도 수행합니다.
+
+- segment_overlap: 구간이 겹치는 세그먼트
+- end_frame_exceeds_total: end_frame이 meta_data.total_frames를 넘는 세그먼트
+- user_num_mismatch: user_num과 len(target_objects) 불일치
+- duplicate_segment_id: 같은 segment_id가 두 번 이상 사용됨
+- invalid_segment_id: segment_id가 스칼라 값(숫자/문자열)이 아님
+
+사용 예:
+    python -m app.pipelines.validate_corpus /data/milestone3 --report report.jsonl
+    python -m app.pipelines.validate_corpus /data/milestone3 --report report.csv --workers 8
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import csv
+import json
+import sys
+import time
+
+from ..utils.annotation_schema import validate_document
+from .common import iter_annotation_files, load_annotation_json, parallel_map
+
+def _error(code: str, pointer: str, message: str) -> Dict:
+    return {"code": code, "pointer": pointer, "message": message}
+
+def cross_check(data: Dict) -> List[Dict]:
+    """스키마 검증을 통과한 문서의 필드 간 정합성을 검사합니다."""
+    errors = []
+    meta_data = data['meta_data']
+    annotations = data['annotations']
+    segments = annotations['segmentation']
+
+    target_objects = annotations.get('target_objects')
+    if isinstance(target_objects, list) and annotations['user_num'] != len(target_objects):
+        errors.append(_error(
+            "user_num_mismatch", "/annotations/user_num",
+            f"user_num ({annotations['user_num']}) does not match len(target_objects) ({len(target_objects)})"
+        ))
+
+    total_frames = meta_data.get('total_frames')
+    seen_ids = set()
+    for i, segment in enumerate(segments):
+        seg_id = segment['segment_id']
+        if not isinstance(seg_id, (int, float, str)):
+            errors.append(_error(
+                "invalid_segment_id", f"/annotations/segmentation/{i}/segment_id",
+                f"segment_id must be a number or string, got {type(seg_id).__name__}"
+            ))
+        elif seg_id in seen_ids:
+            errors.append(_error(
+                "duplicate_segment_id", f"/annotations/segmentation/{i}/segment_id",
+                f"Duplicate segment_id {seg_id}"
+            ))
+        else:
+            seen_ids.add(seg_id)
+
+        if isinstance(total_frames, (int, float)) and total_frames > 0 and segment['end_frame'] > total_frames:
+            errors.append(_error(
+                "end_frame_exceeds_total", f"/annotations/segmentation/{i}/end_frame",
+                f"end_frame {segment['end_frame']} exceeds total_frames {total_frames}"
+            ))
+
+    # 시작 프레임 순으로 정렬하고, 지금까지 가장 늦게 끝나는 구간과 비교
+    # (바로 앞 구간만 비교하면 앞쪽의 긴 구간과 겹치는 경우를 놓침)
+    ordered = sorted(range(len(segments)), key=lambda k: (segments[k]['start_frame'], segments[k]['end_frame']))
+    latest = None
+    for cur in ordered:
+        if latest is not None and segments[cur]['start_frame'] < segments[latest]['end_frame']:
+            errors.append(_error(
+                "segment_overlap", f"/annotations/segmentation/{cur}",
+                f"Segment {segments[cur]['segment_id']} overlaps segment {segments[latest]['segment_id']}"
+            ))
+        if latest is None or segments[cur]['end_frame'] > segments[latest]['end_frame']:
+            latest = cur
+    return errors
+
+def validate_file(path: Path) -> Dict:
+    """JSON 파일 하나를 검증합니다. (프로세스 풀에서 실행)"""
+    result = {"path": str(path), "valid": False, "segments": 0, "errors": []}
+    try:
+        data = load_annotation_json(path)
+    except (OSError, ValueError) as e:
+        code = "read_error" if isinstance(e, OSError) else "json_decode"
+        result["errors"].append(_error(code, "", str(e)))
+        return result
+
+    if isinstance(data, dict) and "info" in data and "segments" in data:
+        result["errors"].append(_error("legacy_schema", "", "Legacy info/segments schema; migrate first"))
+        return result
+
+    schema_errors = validate_document(data)
+    if schema_errors:
+        result["errors"] = [_error("schema", e["pointer"], e["message"]) for e in schema_errors]
+        return result
+
+    result["segments"] = len(data['annotations']['segmentation'])
+    try:
+        result["errors"] = cross_check(data)
+    except Exception as e:
+        # 예상하지 못한 값 때문에 풀 전체가 중단되지 않도록 파일 단위 오류로 기록
+        result["errors"] = [_error("cross_check_error", "", f"{type(e).__name__}: {e}")]
+    result["valid"] = not result["errors"]
+    return result
+
+class ReportWriter:
+    """검증 결과를 JSONL(파일당 한 줄) 또는 CSV(오류당 한 줄)로 기록합니다."""
+
+    CSV_FIELDS = ["path", "valid", "segments", "code", "pointer", "message"]
+
+    def __init__(self, path: Optional[Path], fmt: str, include_valid: bool):
+        self.fmt = fmt
+        self.include_valid = include_valid
+        self._file = open(path, 'w', encoding='utf-8', newline='') if path else sys.stdout
+        self._csv = csv.DictWriter(self._file, fieldnames=self.CSV_FIELDS) if fmt == "csv" else None
+        if self._csv:
+            self._csv.writeheader()
+
+    def write(self, result: Dict):
+        if result["valid"] and not self.include_valid:
+            return
+        if self._csv is None:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+            return
+        base = {"path": result["path"], "valid": result["valid"], "segments": result["segments"]}
+        if not result["errors"]:
+            self._csv.writerow(base)
+        for error in result["errors"]:
+            self._csv.writerow({**base, **error})
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+def validate_corpus(root: Path, report: Optional[Path] = None, fmt: str = "jsonl",
+                    workers: Optional[int] = None, include_valid: bool = False) -> Dict:
+    """데이터셋을 검증하고 요약을 반환합니다."""
+    started = time.perf_counter()
+    writer = ReportWriter(report, fmt, include_valid)
+    summary = {"files": 0, "valid": 0, "invalid": 0, "segments": 0, "errors_by_code": Counter()}
+    try:
+        for result in parallel_map(validate_file, iter_annotation_files(root), workers=workers):
+            summary["files"] += 1
+            summary["segments"] += result["segments"]
+            summary["valid" if result["valid"] else "invalid"] += 1
+            summary["errors_by_code"].update(e["code"] for e in result["errors"])
+            writer.write(result)
+    finally:
+        writer.close()
+    summary["errors_by_code"] = dict(summary["errors_by_code"])
+    summary["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="어노테이션 JSON 일괄 검증")
+    parser.add_argument("root", type=Path, help="데이터셋 루트 디렉토리 (또는 JSON 파일)")
+    parser.add_argument("--report", type=Path, help="리포트 파일 (생략 시 표준 출력)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="리포트 형식 (기본: 확장자로 결정)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--include-valid", action="store_true", help="유효한 파일도 리포트에 기록")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.report and args.report.suffix.lower() == ".csv" else "jsonl")
+    summary = validate_corpus(args.root, args.report, fmt, args.workers, args.include_valid)
+    print(json.dumps(summary, ensure_ascii=False, indent=2), file=sys.stderr)
+    sys.exit(1 if summary["invalid"] else 0)
+
+if __name__ == "__main__":
+    main()
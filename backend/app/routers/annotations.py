@@ -1,48 +1,102 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
-from typing import Dict
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, Response
+from typing import Any, Dict, List, Optional
 import json
 from pathlib import Path
 from urllib.parse import unquote
-import shutil
-import cv2
 import os
 from datetime import datetime
 import logging
+from ..utils.io_executor import run_io
+from ..utils.annotation_store import (
+    save_annotation_document, compact_annotation, delete_annotation_files,
+    patch_annotation, PreconditionFailed
+)
+from ..utils.annotation_cache import get_annotation_cache
+from ..utils.annotation_index import get_annotation_index
+from ..utils.annotation_status import (
+    STATUS_FIELDS, DEFAULT_FIELDS, collect_annotation_status, collect_directory_status
+)
+from ..utils.metrics import VALIDATION_SECONDS, ANNOTATION_SAVE_BYTES
+from ..utils.annotation_schema import (
+    AnnotationValidationError, validate_document, validate_segment_into, validate_field_into
+)
 
-# 로깅 설정
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 router = APIRouter(prefix="/api", tags=["annotations"])
 
 @router.get("/check-annotation")
 async def check_annotation(path: str):
-    """어노테이션 파일 존재 여부 확인"""
+    """어노테이션 파일 존재 여부 확인 (감시 중인 루트는 캐시에서 바로 응답)"""
     try:
-        logger.info(f"Checking annotation for path: {path}")
         video_path = unquote(path)
         json_path = Path(video_path).with_suffix('.json') 
 
-        exists = json_path.exists()
-        logger.info(f"Annotation exists: {exists} at path: {json_path}")
-        
-        return JSONResponse(
-            content={"exists": json_path.exists()},
-            status_code=200
-        )
+        cache = get_annotation_cache()
+        body = cache.peek_exists(json_path)
+        if body is None:
+            body, _ = await run_io(cache.get_exists, json_path)
+        logger.debug("Annotation check for %s: %s", json_path, body)
+
+        return Response(content=body, media_type="application/json", status_code=200)
     except Exception as e:
-        logger.error(f"Error checking annotation: {str(e)}")
+        logger.error("Error checking annotation: %s", e)
         return JSONResponse(
             content={"exists": False},
             status_code=200
         )
 
+@router.post("/annotation-status")
+async def annotation_status(request: Dict[str, Any]):
+    """여러 비디오의 어노테이션 상태(존재, 수정 시각, 세그먼트 수, 유효성)를 한 번에 조회합니다.
+
+    paths(비디오 경로 목록) 또는 directory(+recursive)를 받습니다.
+    fields의 기본값은 ["exists", "mtime"]이며, segments/valid/error_count는 어노테이션을 읽고
+    검증해야 하므로 fields에 포함한 경우에만 계산합니다.
+    """
+    paths = request.get("paths")
+    directory = request.get("directory")
+    fields = request.get("fields", list(DEFAULT_FIELDS))
+    if not isinstance(fields, list) or not all(f in STATUS_FIELDS for f in fields):
+        raise HTTPException(status_code=400, detail=f"fields must be a list of {', '.join(STATUS_FIELDS)}")
+    try:
+        if directory:
+            results = await run_io(
+                collect_directory_status, Path(unquote(directory)), bool(request.get("recursive", False)), fields
+            )
+        elif isinstance(paths, list) and paths and all(isinstance(p, str) for p in paths):
+            results = await run_io(collect_annotation_status, [unquote(p) for p in paths], fields)
+        else:
+            raise HTTPException(status_code=400, detail="paths (non-empty list) or directory is required")
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="The specified directory does not exist")
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Permission denied: Cannot access the specified directory")
+    except Exception as e:
+        logger.error("Error collecting annotation status: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    logger.info("Annotation status for %s videos", len(results))
+    return {
+        "results": results,
+        "total": len(results),
+        "annotated": sum(1 for r in results if r["exists"])
+    }
+
+@router.get("/annotation-cache/stats")
+async def annotation_cache_stats():
+    """어노테이션 캐시 적중/실패 통계"""
+    return get_annotation_cache().get_stats()
+
 @router.post("/save-annotation")
-async def save_annotation(file: UploadFile = File(...), path: str = Form(...)):
-    """어노테이션 저장"""
+async def save_annotation(request: Request, file: UploadFile = File(...), path: str = Form(...),
+                          annotator: Optional[str] = Form(None)):
+    """어노테이션 저장 (If-Match: 마지막으로 불러온 버전, If-None-Match: * 새 문서)"""
     try:
-        logger.info(f"Saving annotation for original path: {path}")
+        logger.debug("Saving annotation for original path: %s", path)
 
         if path.startswith('blob:'):
             logger.error("Invalid file path: blob URL detected")
@@ -51,21 +105,21 @@ async def save_annotation(file: UploadFile = File(...), path: str = Form(...)):
         try:
             # url 디코딩
             video_path = unquote(path)
-            logger.info(f"Decoded video path: {video_path}")
+            logger.debug("Decoded video path: %s", video_path)
             
             # get_annotations와 동일한 방식으로 경로 처리
             video_file = Path(video_path)
             json_path = video_file.with_suffix('.json')
-            logger.info(f"Target JSON path: {json_path}")
+            logger.debug("Target JSON path: %s", json_path)
 
             # 비디오 파일의 디렉토리 존재 확인
-            if not video_file.parent.exists():
+            if not await run_io(video_file.parent.exists):
                 error_msg = f"Directory not found: {video_file.parent}"
                 logger.error(error_msg)
                 raise HTTPException(status_code=404, detail=error_msg)
 
             # 디렉토리 쓰기 권한 확인
-            if not os.access(str(video_file.parent), os.W_OK):
+            if not await run_io(os.access, str(video_file.parent), os.W_OK):
                 error_msg = f"No write permission: {video_file.parent}"
                 logger.error(error_msg)
                 raise HTTPException(status_code=403, detail=error_msg)
@@ -73,234 +127,253 @@ async def save_annotation(file: UploadFile = File(...), path: str = Form(...)):
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Path validation error: {str(e)}")
+            logger.error("Path validation error: %s", e)
             raise HTTPException(status_code=500, detail=f"Path validation error: {str(e)}")
 
         # 파일 내용 처리
         try:
             content = await file.read()
-            new_data = json.loads(content.decode('utf-8'))
-            logger.info(f"Parsed JSON data with keys: {list(new_data.keys())}")
+            ANNOTATION_SAVE_BYTES.observe(len(content))
+            new_data = await run_io(json.loads, content.decode('utf-8'))
+            logger.debug("Parsed JSON data with keys: %s", new_data.keys())
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
         except Exception as e:
-            logger.error(f"Content processing error: {str(e)}")
+            logger.error("Content processing error: %s", e)
             raise HTTPException(status_code=500, detail=f"Content processing error: {str(e)}")
 
         # 데이터 구조 검증
         try:
             validate_data_structure(new_data)
-            logger.info("Data structure validation passed")
+            logger.debug("Data structure validation passed")
+        except AnnotationValidationError as e:
+            logger.error("Data validation error: %s", e)
+            raise HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
         except ValueError as e:
-            logger.error(f"Data validation error: {str(e)}")
+            logger.error("Data validation error: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
 
-        # 파일 저장
+        # 파일 저장 (If-Match/If-None-Match가 있으면 버전 확인)
         try:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(new_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Successfully saved to: {json_path}")
+            etag = await run_io(
+                save_annotation_document, json_path, new_data,
+                request.headers.get('if-match'), request.headers.get('if-none-match')
+            )
+            await run_io(on_annotation_changed, json_path, new_data, annotator_name(request, annotator))
+            logger.info("Successfully saved to: %s", json_path, extra={"bytes": len(content)})
+        except PreconditionFailed as e:
+            logger.warning("Version conflict on %s", json_path)
+            return precondition_failed_response(e)
         except Exception as e:
-            logger.error(f"File save error: {str(e)}")
+            logger.error("File save error: %s", e)
             raise HTTPException(status_code=500, detail=f"File save error: {str(e)}")
 
         return JSONResponse(
             content={
                 "status": "success",
                 "message": "Annotations saved successfully",
-                "path": str(json_path)
+                "path": str(json_path),
+                "etag": etag
             },
-            status_code=200
+            status_code=200,
+            headers={"ETag": etag}
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+def precondition_failed_response(e: PreconditionFailed) -> JSONResponse:
+    """버전 충돌(412) 응답 (현재 버전을 ETag로 전달, 문서가 없으면 ETag 없음)"""
+    return JSONResponse(
+        content={"detail": str(e), "etag": e.current_etag},
+        status_code=412,
+        headers={"ETag": e.current_etag} if e.current_etag else None
+    )
+
+def annotator_name(request: Request, annotator: Optional[str] = None) -> str:
+    """작업자 이름 (폼 필드 또는 X-Annotator 헤더, 없으면 클라이언트 주소)"""
+    name = annotator or request.headers.get('x-annotator')
+    if name:
+        return unquote(name.strip())[:64]
+    return request.client.host if request.client else "unknown"
+
+def on_annotation_changed(json_path: Path, data: Optional[Dict] = None, annotator: Optional[str] = None):
+    """저장/패치/삭제 후 캐시를 무효화하고 질의 인덱스와 진행 현황 카운터를 갱신합니다.
+
+    data가 없으면 파일에서 다시 읽고, 파일이 없으면 인덱스에서 제거합니다.
+    annotator가 있으면 저장 횟수를 기록합니다. (인덱스 실패는 저장 실패로 보지 않음)
+    """
+    get_annotation_cache().invalidate(json_path)
+    try:
+        index = get_annotation_index()
+        index.update_file(json_path, data)
+        if annotator:
+            index.record_save(json_path, annotator)
+    except Exception as e:
+        logger.warning("Failed to update annotation index for %s: %s", json_path, e)
+
 def validate_data_structure(data):
-    """데이터 구조 검증"""
-    logger.info("Starting data structure validation")
-
-    if not isinstance(data, dict):
-        logger.error("Data is not a dictionary")
-        raise ValueError("Data must be a dictionary")
-
-    # 최상위 필수 섹션 검증    
-    required_sections = ['meta_data', 'additional_info', 'annotations']
-    for section in required_sections:
-        if section not in data:
-            logger.error(f"Missing required section: {section}")
-            raise ValueError(f"Missing required section: {section}")
-            
-        # meta_data 섹션 검증
-        required_meta_fields = [
-            'file_name', 'format', 'size', 'width_height', 'environment',
-            'frame_rate', 'total_frames', 'camera_height', 'camera_angle'
-        ]
-        for field in required_meta_fields:
-            if field not in data['meta_data']:
-                logger.error(f"Missing required field in meta_data: {field}")
-                raise ValueError(f"Missing required field in meta_data: {field}")
-            
-        # annotations 섹션 검증
-        required_annotation_fields = ['space_context', 'user_num', 'target_objects', 'segmentation']
-        for field in required_annotation_fields:
-            if field not in data['annotations']:
-                logger.error(f"Missing required field in annotations: {field}")
-                raise ValueError(f"Missing required field in annotations: {field}")
-
-        # user_num 값 범위 검증
-        user_num = data['annotations'].get('user_num')
-        if not isinstance(user_num, int) or user_num < 1 or user_num > 10:
-            logger.error(f"Invalid user_num value: {user_num}")
-            raise ValueError("user_num must be an integer between 1 and 10")
-
-        # segmentation 배열 검증
-        if not isinstance(data['annotations']['segmentation'], list):
-            logger.error("Segmentation is not a list")
-            raise ValueError("Segmentation must be a list")
-            
-        for i, segment in enumerate(data['annotations']['segmentation']):
-            logger.debug(f"Validating segment {i}")
-            if not isinstance(segment, dict):
-                logger.error(f"Segment {i} is not a dictionary")
-                raise ValueError("Each segment must be a dictionary")
-                
-            required_segment_fields = [
-                'segment_id', 'action_type', 'start_frame', 
-                'end_frame', 'duration', 'keyframe', 'keypoints'
-            ]
-            
-            for field in required_segment_fields:
-                if field not in segment:
-                    logger.error(f"Missing required field '{field}' in segment {i}")
-                    raise ValueError(f"Missing required field in segment: {field}")
-
-            # action_type 값 범위 검증 (0-3)
-            if not (0 <= segment['action_type'] <= 3):
-                logger.error(f"Invalid action_type value in segment {i}: {segment['action_type']}")
-                raise ValueError(f"Invalid action_type value in segment {i} (must be 0-3)")
-
-            # 프레임 값 검증
-            if not (segment['start_frame'] >= 0 and segment['start_frame'] < segment['end_frame']):
-                logger.error(f"Invalid frame values in segment {i}")
-                raise ValueError(f"Invalid frame values in segment {i}")
-
-            # keyframe 값 검증
-            if not (segment['start_frame'] <= segment['keyframe'] <= segment['end_frame']):
-                logger.error(f"Invalid keyframe value in segment {i}")
-                raise ValueError(f"Invalid keyframe value in segment {i}")
-                
-        logger.info("Data structure validation completed successfully")
-                
+    """데이터 구조 검증 (한 번 순회하며 모든 오류를 수집)"""
+    with VALIDATION_SECONDS.time():
+        errors = validate_document(data)
+    if errors:
+        logger.error("Data structure validation failed with %s errors", len(errors))
+        raise AnnotationValidationError(errors)
+
+PATCHABLE_SECTIONS = {'meta_data', 'additional_info', 'annotations'}
+
+def validate_patch_ops(data: Dict, ops: List[Dict]):
+    """변경된 세그먼트/필드만 검증합니다."""
+    if not isinstance(ops, list) or not ops:
+        raise ValueError("ops must be a non-empty list")
+
+    errors = []
+    for i, op in enumerate(ops):
+        pointer = f"/ops/{i}"
+        if not isinstance(op, dict):
+            errors.append({"pointer": pointer, "message": f"Operation {i} must be a dictionary"})
+            continue
+        kind = op.get('op')
+        if kind == 'upsert':
+            validate_segment_into(op.get('segment'), f"{pointer}/segment", i, errors)
+        elif kind == 'delete':
+            if 'segment_id' not in op:
+                errors.append({"pointer": f"{pointer}/segment_id", "message": f"Missing segment_id in delete operation {i}"})
+        elif kind == 'set':
+            section, field = op.get('section'), op.get('field')
+            if section not in PATCHABLE_SECTIONS or not isinstance(field, str) or 'value' not in op:
+                errors.append({"pointer": pointer, "message": f"Invalid set operation {i}"})
+            elif section == 'annotations' and field == 'segmentation':
+                errors.append({"pointer": pointer, "message": "Use upsert/delete operations to change segmentation"})
+            else:
+                # 전체 저장과 같은 필드 규칙으로 값을 검증
+                validate_field_into(section, field, op['value'], f"{pointer}/value", errors)
+        else:
+            errors.append({"pointer": f"{pointer}/op", "message": f"Unknown operation in {i}: {kind}"})
+
+    if errors:
+        raise AnnotationValidationError(errors)
+
+@router.patch("/annotations/{video_path:path}")
+async def patch_annotations(video_path: str, request: Request):
+    """세그먼트 단위 변경(upsert/delete/set)을 저장합니다. (If-Match로 버전 확인)"""
+    try:
+        json_path = Path(unquote(video_path)).with_suffix('.json')
+        try:
+            body = await request.json()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+
+        ops = body.get('ops') if isinstance(body, dict) else None
+        if_match = request.headers.get('if-match') or (body.get('version') if isinstance(body, dict) else None)
+        logger.info("Patching annotations at %s with %s operations", json_path, len(ops or []))
+
+        try:
+            etag, data = await run_io(patch_annotation, json_path, ops, if_match, validate_patch_ops)
+            await run_io(on_annotation_changed, json_path, data, annotator_name(request))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Annotation not found; save the full document first")
+        except PreconditionFailed as e:
+            logger.warning("Version conflict on %s", json_path)
+            return precondition_failed_response(e)
+        except AnnotationValidationError as e:
+            logger.error("Patch validation error: %s", e)
+            raise HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
+        except ValueError as e:
+            logger.error("Patch validation error: %s", e)
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return JSONResponse(
+            content={
+                "status": "success",
+                "etag": etag,
+                "segments": len(data['annotations'].get('segmentation', []))
+            },
+            status_code=200,
+            headers={"ETag": etag}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error patching annotations: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/annotations/{video_path:path}")
 async def get_annotations(video_path: str):
     """어노테이션 조회"""
     # url 디코딩
     try:
-        logger.info(f"Getting annotations for video: {video_path}")
+        logger.debug("Getting annotations for video: %s", video_path)
         decoded_path = unquote(video_path)
         json_path = Path(decoded_path).with_suffix('.json')
         
-        if not json_path.exists():
-            logger.info(f"No annotations found at {json_path}")
-            return JSONResponse(
-                content={"segments": []},
-                status_code=200
-            )
-        # json 파일 가져오기   
+        # json 파일 가져오기 (저널이 있으면 재적용, 직렬화된 본문을 캐시)
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"Successfully loaded annotations from {json_path}")
-                logger.debug(f"Loaded data contains {len(data.get('segments', []))} segments")
-                return JSONResponse(content=data, status_code=200)
+            cache = get_annotation_cache()
+            cached = cache.peek_document(json_path)
+            if cached is not None:
+                body, etag = cached
+                hit = True
+            else:
+                body, etag, hit = await run_io(cache.get_document, json_path)
+            if etag is None:
+                logger.debug("No annotations found at %s", json_path)
+                return Response(content=body, media_type="application/json", status_code=200)
+            logger.debug("Loaded annotations from %s (%s)", json_path, 'cache' if hit else 'disk')
+            return Response(
+                content=body,
+                media_type="application/json",
+                status_code=200,
+                headers={"ETag": etag, "X-Cache": "HIT" if hit else "MISS"}
+            )
         except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
+            logger.error("JSON decode error: %s", e)
             raise HTTPException(status_code=500, detail=f"Invalid JSON format: {str(e)}")
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting annotations: {str(e)}")
+        logger.error("Error getting annotations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/delete-annotation/{video_path:path}")
 async def delete_annotation(video_path: str):
    """어노테이션 삭제"""
    try:
-       logger.info(f"Deleting annotation for video: {video_path}")
+       logger.info("Deleting annotation for video: %s", video_path)
        decoded_path = unquote(video_path)
        json_path = Path(decoded_path).with_suffix('.json')
        
-       if json_path.exists():
-           # 삭제 전 백업
-           backup_path = json_path.with_suffix('.json.bak')
-           shutil.copy2(json_path, backup_path)
-           logger.info(f"Backup created at {backup_path}")
-           
-           # 파일 삭제
-           json_path.unlink()
-           logger.info(f"Annotation file deleted: {json_path}")
+       # 삭제 전 .json.bak 백업 후 JSON과 저널 삭제
+       deleted = await run_io(delete_annotation_files, json_path)
+       await run_io(on_annotation_changed, json_path)
+       if deleted:
+           logger.info("Annotation file deleted: %s (backup: %s)", json_path, json_path.with_suffix('.json.bak'))
 
        return JSONResponse(
            content={"status": "success"},
            status_code=200
        )
    except Exception as e:
-       logger.error(f"Error deleting annotation: {str(e)}")
+       logger.error("Error deleting annotation: %s", e)
        raise HTTPException(status_code=500, detail=str(e))
 
-def validate_segment(segment: Dict):
-   """세그먼트 데이터 검증"""
-   logger.info("Validating segment data")
-   logger.debug(f"Segment data: {segment}")
-
-   required_fields = [
-       'segment_id', 'start_frame', 'end_frame', 'duration',
-       'action', 'caption', 'age', 'gender', 'disability'
-   ]
-
-   for field in required_fields:
-       if field not in segment:
-           logger.error(f"Missing required field: {field}")
-           raise ValueError(f"Missing required field in segment: {field}")
-
-   # 값 범위 검증
-   if not (0 <= segment['action'] <= 3):
-       logger.error(f"Invalid action value: {segment['action']}")
-       raise ValueError("Invalid action value (must be 1-4)")
-       
-   if not (1 <= segment['age'] <= 3):
-       logger.error(f"Invalid age value: {segment['age']}")
-       raise ValueError("Invalid age value (must be 1-3)")
-       
-   if not (1 <= segment['gender'] <= 2):
-       logger.error(f"Invalid gender value: {segment['gender']}")
-       raise ValueError("Invalid gender value (must be 1-2)")
-       
-   if not (1 <= segment['disability'] <= 2):
-       logger.error(f"Invalid disability value: {segment['disability']}")
-       raise ValueError("Invalid disability value (must be 1-2)")
-
-   # 프레임 검증
-   try:
-       start_frame = int(segment['start_frame'])
-       end_frame = int(segment['end_frame'])
-       if start_frame >= end_frame:
-           raise ValueError("start_frame must be less than end_time")
-   except ValueError:
-       raise ValueError("Invalid frame format")
-
-   # duration 검증
-   try:
-        duration = int(segment['duration'])
-        if duration <= 0:
-            logger.error(f"Invalid duration: {duration}")
-            raise ValueError("Duration must be positive")
-   except ValueError as e:
-        logger.error(f"Invalid duration format: {str(e)}")
-        raise ValueError("Invalid duration format")
-
-   logger.info("Segment validation completed successfully")
\ No newline at end of file
+@router.post("/compact-annotation/{video_path:path}")
+async def compact_annotation_journal(video_path: str):
+    """어노테이션 저널을 JSON 파일에 반영합니다."""
+    try:
+        json_path = Path(unquote(video_path)).with_suffix('.json')
+        compacted = await run_io(compact_annotation, json_path)
+        await run_io(on_annotation_changed, json_path)
+        return JSONResponse(
+            content={"status": "success", "compacted": compacted},
+            status_code=200
+        )
+    except Exception as e:
+        logger.error("Error compacting annotation journal: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
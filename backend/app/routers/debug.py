@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+import logging
+
+from ..utils.io_executor import run_io
+from ..utils.profiling import list_profiles, find_profile
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/debug", tags=["debug"])
+
+@router.get("/profiles")
+async def get_profiles():
+    """저장된 요청별 프로파일 목록 (최신순)"""
+    return {"profiles": await run_io(list_profiles)}
+
+@router.get("/profiles/{name}")
+async def get_profile(name: str):
+    """프로파일 파일 (.folded는 flamegraph.pl/speedscope, .prof는 pstats/snakeviz로 확인)"""
+    path = await run_io(find_profile, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain" if path.suffix == ".folded" else "application/octet-stream"
+    return FileResponse(str(path), media_type=media_type, filename=path.name)
@@ -0,0 +1,133 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, Response
+from typing import Any, Dict, Optional
+from pathlib import Path
+from urllib.parse import quote, unquote
+import logging
+
+from ..utils.file_handler import validate_video_file
+from ..utils.video_probe import get_video_meta, get_video_meta_batch, VideoProbeError
+from ..utils.sprite_sheet import get_or_schedule_sprites, find_sprite_file
+from ..utils.range_stream import guess_media_type
+from ..utils.io_executor import run_io, run_decode
+from ..utils.frame_cache import get_frame_decoder, FrameOutOfRange
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["media"])
+
+@router.get("/video-meta")
+async def video_meta(path: str):
+    """비디오 메타데이터 조회 (fps, 프레임 수, 해상도, 코덱, 길이)"""
+    try:
+        video_path = Path(unquote(path))
+        logger.info(f"Getting video metadata: {video_path}")
+
+        if not await validate_video_file(video_path):
+            logger.error(f"Invalid video file: {video_path}")
+            raise HTTPException(status_code=400, detail="Invalid video file or file format not supported")
+
+        return await get_video_meta(video_path)
+
+    except HTTPException:
+        raise
+    except VideoProbeError as e:
+        logger.error(f"Video probe error: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting video metadata: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/video-meta/batch")
+async def video_meta_batch(request: Dict[str, Any]):
+    """여러 비디오의 메타데이터를 한 번에 조회합니다."""
+    paths = request.get("paths")
+    if not isinstance(paths, list) or not paths:
+        raise HTTPException(status_code=400, detail="paths must be a non-empty list")
+
+    logger.info(f"Getting video metadata for {len(paths)} files")
+    try:
+        return {"results": await get_video_meta_batch([Path(unquote(p)) for p in paths])}
+    except Exception as e:
+        logger.error(f"Error getting batch video metadata: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/sprites")
+async def get_sprites(path: str, stride: Optional[int] = None):
+    """타임라인 썸네일 스프라이트 인덱스 조회 (없으면 백그라운드 생성 후 202 반환)"""
+    try:
+        video_path = Path(unquote(path))
+        if stride is not None and stride <= 0:
+            raise HTTPException(status_code=400, detail="stride must be positive")
+
+        if not await validate_video_file(video_path):
+            logger.error(f"Invalid video file: {video_path}")
+            raise HTTPException(status_code=400, detail="Invalid video file or file format not supported")
+
+        status, key, index = await get_or_schedule_sprites(video_path, stride)
+        if status == "pending":
+            return JSONResponse(content={"status": "pending", "key": key}, status_code=202)
+        if status == "failed":
+            raise HTTPException(status_code=500, detail=index["error"])
+
+        sheets = [
+            {**sheet, "url": f"/api/sprites/{key}/{sheet['file']}?path={quote(str(video_path))}"}
+            for sheet in index["sheets"]
+        ]
+        return {"status": "ready", "key": key, **index, "sheets": sheets}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting sprites: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/sprites/{key}/{filename}")
+async def get_sprite_image(key: str, filename: str, path: Optional[str] = None):
+    """스프라이트 시트 이미지"""
+    video_path = Path(unquote(path)) if path else None
+    file_path = await run_io(find_sprite_file, key, filename, video_path)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail="Sprite sheet not found")
+    return FileResponse(
+        str(file_path),
+        media_type=guess_media_type(file_path),
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+@router.get("/frame/stats")
+async def frame_cache_stats():
+    """프레임 디코딩 캐시 적중/실패 통계"""
+    return get_frame_decoder().get_stats()
+
+@router.get("/frame/{video_path:path}")
+async def get_frame(video_path: str, n: int):
+    """n번째 프레임을 정확히 디코딩하여 JPEG로 반환합니다."""
+    try:
+        path = Path(unquote(video_path))
+        if not await validate_video_file(path):
+            logger.error(f"Invalid video file: {path}")
+            raise HTTPException(status_code=400, detail="Invalid video file or file format not supported")
+
+        jpeg, cache_hit = await run_decode(get_frame_decoder().get_frame_jpeg, path, n)
+        return Response(
+            content=jpeg,
+            media_type="image/jpeg",
+            headers={
+                "X-Frame-Index": str(n),
+                "X-Cache": "HIT" if cache_hit else "MISS",
+                "Cache-Control": "private, max-age=3600"
+            }
+        )
+
+    except HTTPException:
+        raise
+    except FrameOutOfRange as e:
+        raise HTTPException(status_code=416, detail=str(e))
+    except VideoProbeError as e:
+        logger.error(f"Frame decode error: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error extracting frame: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
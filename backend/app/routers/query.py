@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, Optional
+from pathlib import Path
+from urllib.parse import unquote
+import logging
+
+from ..utils.annotation_index import get_annotation_index, InvalidQuery
+from ..utils.io_executor import run_io
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["query"])
+
+@router.post("/query")
+async def query_annotations(request: Dict[str, Any]):
+    """세그먼트/대상 객체/클립 인덱스를 필터, 집계, 페이지 단위로 조회합니다.
+
+    예: {"target": "segments", "filters": {"action_type": 2, "environment": 1, "duration": {"min": 300}},
+         "group_by": ["user_num"], "aggregates": ["count", "avg:duration"]}
+    """
+    try:
+        return await run_io(
+            get_annotation_index().query,
+            target=request.get("target", "segments"),
+            filters=request.get("filters") or {},
+            group_by=request.get("group_by"),
+            aggregates=request.get("aggregates"),
+            columns=request.get("columns"),
+            sort=request.get("sort"),
+            order=request.get("order", "asc"),
+            limit=int(request.get("limit", 200)),
+            offset=int(request.get("offset", 0))
+        )
+    except InvalidQuery as e:
+        logger.error(f"Invalid query: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error querying annotation index: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats")
+async def progress_stats(root: Optional[str] = None, hours: int = 24):
+    """루트별 진행 현황(클립, action_type별 세그먼트, 라벨링된 프레임/전체 프레임)과 작업자별 시간당 저장 횟수
+
+    저장/삭제 시 갱신되는 카운터만 읽으므로 사이드카 파일 수와 무관하게 응답합니다.
+    """
+    try:
+        return await run_io(get_annotation_index().get_progress, unquote(root) if root else None, hours)
+    except Exception as e:
+        logger.error(f"Error getting progress stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/query/status")
+async def query_index_status():
+    """색인된 루트, 행 수, 진행 중인 스캔"""
+    return await run_io(get_annotation_index().get_status)
+
+@router.post("/query/reindex")
+async def reindex_root(request: Dict[str, Any]):
+    """루트를 등록하고 증분 재색인을 예약합니다."""
+    path = request.get("path")
+    if not path:
+        raise HTTPException(status_code=400, detail="Path is required")
+    root = Path(unquote(path))
+    if not await run_io(root.is_dir):
+        raise HTTPException(status_code=404, detail="The specified directory does not exist")
+    scheduled = await run_io(get_annotation_index().add_root, root, True)
+    return {"status": "scheduled" if scheduled else "pending", "root": str(root)}
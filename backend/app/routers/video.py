@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import Any, Dict
 from pathlib import Path
+import json
 import os
 import platform
 import logging
-from ..utils.file_handler import get_video_files, validate_video_file, normalize_path, check_file_access
+from ..utils.file_handler import (
+    get_video_files, get_indexed_video_files, get_directory_index,
+    validate_video_file, normalize_path, check_file_access
+)
+from ..utils.file_index import InvalidQuery, normalize_filters
+from ..utils.io_executor import run_io, run_stream, iterate_io
+from ..utils.range_stream import build_range_response
+from ..utils.upload_handler import (
+    UploadError, check_multipart_length, save_upload_file,
+    create_upload, get_upload, append_upload, abort_upload
+)
 from config import ALLOWED_VIDEO_EXTENSIONS
 import aiofiles
 
@@ -15,8 +26,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["video"])
 
 @router.post("/load-path")
-async def load_path(request: Dict[str, str]):
-    """비디오 파일 목록을 로드합니다."""
+async def load_path(request: Dict[str, Any]):
+    """비디오 파일 목록을 로드합니다. (디렉토리는 캐시된 인덱스에서 조회)"""
     try:
         path = request.get("path")
         if not path:
@@ -31,8 +42,14 @@ async def load_path(request: Dict[str, str]):
             else:
                 base_path = Path.cwd() / path
 
-            # 파일 목록 가져오기
-            files = await get_video_files(base_path)
+            refresh = bool(request.get("refresh", False))
+
+            # 페이지 단위 조회 (limit 지정 시 커서 기반 페이지네이션)
+            if request.get("limit") is not None:
+                return await _load_page(base_path, request, refresh)
+
+            # 파일 목록 가져오기 (refresh=true이면 인덱스 강제 재스캔)
+            files, index_info = await get_indexed_video_files(base_path, refresh=refresh)
             
             if not files:
                 logger.warning(f"No video files found in path: {path}")
@@ -42,7 +59,11 @@ async def load_path(request: Dict[str, str]):
                 )
             
             logger.info(f"Found {len(files)} video files")
-            return {"files": files}
+            return {"files": files, "index": index_info}
+
+        except InvalidQuery as e:
+            logger.error(f"Invalid load-path query: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
 
         except PermissionError:
             logger.error(f"Permission denied accessing path: {path}")
@@ -64,9 +85,79 @@ async def load_path(request: Dict[str, str]):
         logger.error(f"Unexpected error in load_path: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _load_page(base_path: Path, request: Dict[str, Any], refresh: bool) -> Dict:
+    """필터/정렬이 적용된 파일 목록 한 페이지를 반환합니다."""
+    try:
+        limit = int(request.get("limit"))
+    except (TypeError, ValueError):
+        raise InvalidQuery(f"Invalid limit: {request.get('limit')!r}")
+    filters = normalize_filters(request.get("filters") or {})
+
+    index = await get_directory_index(base_path)
+    if index is None:
+        files = await get_video_files(base_path)
+        return {
+            "files": files,
+            "total": len(files),
+            "next_cursor": None,
+            "index": {"age": None, "changed": 0, "scanned_dirs": 0, "rescanned": False}
+        }
+
+    index_info = await run_io(index.refresh, force=refresh)
+    page = await run_io(
+        index.query,
+        filters=filters,
+        sort=request.get("sort", "name"),
+        order=request.get("order", "asc"),
+        limit=limit,
+        cursor=request.get("cursor")
+    )
+    logger.info(f"Returning {len(page['files'])} of {page['total']} video files")
+    return {**page, "index": index_info}
+
+@router.post("/load-path/stream")
+async def load_path_stream(request: Dict[str, Any]):
+    """디렉토리 순회 중 찾은 비디오 파일을 NDJSON으로 즉시 스트리밍합니다."""
+    path = request.get("path")
+    if not path:
+        raise HTTPException(status_code=400, detail="Path is required")
+
+    logger.info(f"Streaming file list for path: {path}")
+    base_path = Path(path) if os.path.isabs(path) else Path.cwd() / path
+
+    # 응답을 시작한 뒤에는 상태 코드를 바꿀 수 없으므로 필터를 먼저 확인
+    try:
+        filters = normalize_filters(request.get("filters") or {})
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        index = await get_directory_index(base_path)
+    except ValueError as e:
+        logger.error(f"Cannot access path: {path}")
+        raise HTTPException(status_code=403, detail=str(e))
+
+    if index is None:
+        files = await get_video_files(base_path)
+        events = [{"event": "file", "file": f} for f in files]
+        events.append({"event": "done", "index": {"age": None, "changed": 0, "scanned_dirs": 0, "rescanned": False}})
+        events = iter(events)
+    else:
+        events = index.iter_scan(
+            force=bool(request.get("refresh", False)),
+            filters=filters
+        )
+
+    # 디렉토리 순회는 I/O 스레드 풀에서 진행
+    async def ndjson():
+        async for event in iterate_io(events):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 @router.get("/video/{path:path}")
-async def get_video(path: str):
-    """비디오 파일을 스트리밍합니다."""
+async def get_video(path: str, request: Request):
+    """비디오 파일을 스트리밍합니다. (HTTP Range / 206 Partial Content 지원)"""
     try:
         logger.info(f"Streaming video from path: {path}")
         
@@ -78,7 +169,8 @@ async def get_video(path: str):
                 video_path = Path.cwd() / path
 
             # 파일 접근성 검사
-            if not check_file_access(video_path):
+            # 스트리밍 요청은 전용 풀 사용 (디렉토리 순회/인덱스 대기에 막히지 않도록)
+            if not await run_stream(check_file_access, video_path):
                 logger.error(f"Cannot access video file: {video_path}")
                 raise HTTPException(
                     status_code=403,
@@ -86,19 +178,15 @@ async def get_video(path: str):
                 )
 
             # 비디오 파일 유효성 검사
-            if not await validate_video_file(video_path):
+            if not await validate_video_file(video_path, stream=True):
                 logger.error(f"Invalid video file: {video_path}")
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid video file or file format not supported"
                 )
                 
-            # 비디오 스트리밍
-            return FileResponse(
-                str(video_path),
-                media_type="video/mp4",
-                filename=video_path.name
-            )
+            # 비디오 스트리밍 (Range 요청 시 필요한 바이트만 전송)
+            return await run_stream(build_range_response, request, video_path)
             
         except FileNotFoundError:
             logger.error(f"Video file not found: {path}")
@@ -136,9 +224,7 @@ async def check_file(path: str):
             }
 
         # 파일 상태 확인
-        exists = file_path.exists()
-        is_file = file_path.is_file() if exists else False
-        is_accessible = check_file_access(file_path) if exists else False
+        exists, is_file, is_accessible = await run_io(_stat_file, file_path)
         is_video = await validate_video_file(file_path) if (exists and is_file and is_accessible) else False
         
         return {
@@ -160,47 +246,104 @@ async def check_file(path: str):
             "error": str(e)
         }
 
+def _stat_file(file_path: Path):
+    """(존재 여부, 파일 여부, 접근 가능 여부)"""
+    exists = file_path.exists()
+    is_file = file_path.is_file() if exists else False
+    is_accessible = check_file_access(file_path) if exists else False
+    return exists, is_file, is_accessible
+
 @router.post("/video/upload")
-async def upload_video(file: UploadFile = File(...)):
-    """비디오 파일을 업로드합니다."""
+async def upload_video(request: Request):
+    """비디오 파일을 업로드합니다. (multipart의 file 필드, UPLOAD_DIR에 청크 단위로 저장)
+
+    multipart 본문은 받는 도중 크기를 제한할 수 없으므로 본문을 읽기 전에 Content-Length를 확인합니다.
+    큰 파일은 이어받기 업로드(/video/uploads)를 사용하세요.
+    """
+    form = None
     try:
-        logger.info(f"Uploading video file: {file.filename}")
-        
-        # 파일 확장자 검사
-        ext = Path(file.filename).suffix.lower()
-        if ext not in ALLOWED_VIDEO_EXTENSIONS:
-            logger.error(f"Invalid file format: {ext}")
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid file format. Only video files are allowed."
-            )
-        
-        # 업로드 디렉토리 생성
-        save_path = Path("uploaded_videos") / file.filename
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # 파일 저장
-        try:
-            content = await file.read()
-            save_path.write_bytes(content)
-            
-            logger.info(f"File saved successfully: {save_path}")
-            return {
-                "filename": file.filename,
-                "path": str(save_path),
-                "size": len(content),
-                "type": "local"
-            }
-            
-        except Exception as e:
-            logger.error(f"Error saving file: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to save uploaded file"
-            )
-            
-    except HTTPException:
-        raise
+        check_multipart_length(request.headers.get("content-length"))
+        form = await request.form()
+        file = form.get("file")
+        if file is None or isinstance(file, str):
+            raise UploadError(400, "file field is required")
+        logger.info("Uploading video file: %s", file.filename)
+        return await save_upload_file(file)
+
+    except UploadError as e:
+        logger.error(f"Upload rejected: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         logger.error(f"Unexpected error in upload_video: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to save uploaded file")
+    finally:
+        if form is not None:
+            await form.close()
+
+@router.post("/video/uploads")
+async def create_resumable_upload(request: Dict[str, Any]):
+    """이어받기 업로드를 생성합니다. (filename, size)"""
+    try:
+        upload = await create_upload(request.get("filename", ""), int(request.get("size", 0)))
+        return JSONResponse(
+            content=upload,
+            status_code=201,
+            headers={"Upload-Offset": "0", "Location": f"/video/uploads/{upload['upload_id']}"}
+        )
+    except UploadError as e:
+        logger.error(f"Upload rejected: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size must be an integer")
+
+@router.head("/video/uploads/{upload_id}")
+async def head_resumable_upload(upload_id: str):
+    """현재 업로드 오프셋을 Upload-Offset 헤더로 반환합니다."""
+    try:
+        upload = await get_upload(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return Response(
+        status_code=200,
+        headers={
+            "Upload-Offset": str(upload["offset"]),
+            "Upload-Length": str(upload["size"]),
+            "Cache-Control": "no-store"
+        }
+    )
+
+@router.get("/video/uploads/{upload_id}")
+async def get_resumable_upload(upload_id: str):
+    """업로드 상태를 조회합니다."""
+    try:
+        return await get_upload(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@router.patch("/video/uploads/{upload_id}")
+async def patch_resumable_upload(upload_id: str, request: Request):
+    """Upload-Offset 헤더의 위치부터 요청 본문을 이어서 기록합니다."""
+    try:
+        offset = int(request.headers.get("upload-offset", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Upload-Offset header is required")
+
+    try:
+        result = await append_upload(upload_id, offset, request.stream())
+    except UploadError as e:
+        logger.error(f"Upload {upload_id} rejected: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logger.error(f"Unexpected error in patch_resumable_upload: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return JSONResponse(content=result, headers={"Upload-Offset": str(result["offset"])})
+
+@router.delete("/video/uploads/{upload_id}")
+async def delete_resumable_upload(upload_id: str):
+    """이어받기 업로드를 취소합니다."""
+    try:
+        await abort_upload(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return {"status": "success"}
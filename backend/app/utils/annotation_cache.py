@@ -0,0 +1,378 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+from config import (
+    ANNOTATION_CACHE_SIZE, ANNOTATION_CACHE_MAX_BYTES,
+    ANNOTATION_CACHE_REVALIDATE_SECONDS, ANNOTATION_WATCH_ROOTS
+)
+from .annotation_store import load_annotation, document_etag, journal_path, JOURNAL_SUFFIX
+from .annotation_schema import validate_document
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # 선택 의존성: 없으면 매 요청 stat으로 변경 여부를 확인
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# 어노테이션이 없을 때의 응답 (get_annotations / check_annotation과 같은 형식)
+EMPTY_DOCUMENT_BODY = b'{"segments":[]}'
+EXISTS_BODY = {True: b'{"exists":true}', False: b'{"exists":false}'}
+
+Signature = Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def summarize_annotation(data: Optional[Dict]) -> Dict:
+    """세그먼트 수와 검증 결과 요약 (/annotation-status)"""
+    if data is None:
+        return {"segments": None, "valid": None, "error_count": None}
+    annotations = data.get("annotations") if isinstance(data, dict) else None
+    segmentation = annotations.get("segmentation") if isinstance(annotations, dict) else None
+    errors = validate_document(data)
+    return {
+        "segments": len(segmentation) if isinstance(segmentation, list) else 0,
+        "valid": not errors,
+        "error_count": len(errors),
+    }
+
+def _cache_key(json_path: Path) -> str:
+    """stat 없이 계산하는 정규화된 절대 경로 (watchdog 이벤트 경로와 비교용)"""
+    return os.path.normpath(os.path.abspath(str(json_path)))
+
+class _Entry:
+    """JSON과 저널의 (mtime, size) 서명, 존재 여부, 직렬화된 응답 본문"""
+
+    __slots__ = ("signature", "checked_at", "body", "etag", "summary")
+
+    def __init__(self, signature: Signature, checked_at: float):
+        self.signature = signature
+        self.checked_at = checked_at
+        self.body: Optional[bytes] = None  # 문서를 아직 읽지 않았으면 None
+        self.etag: Optional[str] = None
+        self.summary: Optional[Dict] = None  # 세그먼트 수/유효성 (처음 요청될 때 계산)
+
+    @property
+    def exists(self) -> bool:
+        return self.signature[0] is not None
+
+    @property
+    def has_document(self) -> bool:
+        """응답 본문이 있거나 JSON/저널이 모두 없어 빈 응답으로 충분한 경우"""
+        return self.body is not None or self.signature == (None, None)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) if self.body is not None else 0
+
+class _InvalidateHandler:
+    """watchdog 이벤트를 받아 해당 어노테이션 항목을 무효화합니다."""
+
+    def __init__(self, cache: "AnnotationCache"):
+        self.cache = cache
+
+    def dispatch(self, event):
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if not path:
+                continue
+            if isinstance(path, bytes):
+                path = os.fsdecode(path)
+            if getattr(event, "is_directory", False):
+                self.cache.invalidate_tree(path)
+            elif path.endswith(".json" + JOURNAL_SUFFIX):
+                self.cache.invalidate_key(path[:-len(JOURNAL_SUFFIX)])
+            elif path.endswith(".json"):
+                self.cache.invalidate_key(path)
+
+class AnnotationCache:
+    """파싱된 어노테이션과 존재 여부의 LRU 캐시
+
+    - 항목은 JSON/저널 파일의 (mtime, size) 서명과 함께 저장되고, 응답 본문은 미리 직렬화되어
+      캐시 적중 시 JSON 인코딩 없이 그대로 전송합니다.
+    - watchdog으로 감시 중인 루트 아래의 항목은 변경 이벤트로 무효화되므로
+      ANNOTATION_CACHE_REVALIDATE_SECONDS 동안 stat 없이 응답합니다.
+      (네트워크 공유처럼 다른 컴퓨터의 변경 이벤트가 오지 않는 경우를 위해 주기적으로 재확인)
+    - 감시하지 않는 경로는 요청마다 stat 두 번으로 서명을 확인합니다.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, revalidate_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generation = 0  # 무효화마다 증가 (읽는 도중 변경된 결과를 저장하지 않기 위해)
+        self._observer = None
+        self._watched_roots: Dict[str, object] = {}
+        self._watch_lock = threading.Lock()  # watch_root 직렬화 (schedule은 트리를 순회하므로 _lock과 분리)
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "loads": 0,
+        }
+
+    # 조회
+
+    def peek_exists(self, json_path: Path) -> Optional[bytes]:
+        """파일시스템 접근 없이 응답할 수 있으면 check_annotation 응답 본문을, 아니면 None을 반환합니다."""
+        key = _cache_key(json_path)
+        with self._lock:
+            entry = self._trusted_entry(key)
+            if entry is None:
+                return None
+            self.stats["hits"] += 1
+            return EXISTS_BODY[entry.exists]
+
+    def get_exists(self, json_path: Path) -> Tuple[bytes, bool]:
+        """check_annotation 응답 본문과 캐시 적중 여부를 반환합니다. (최대 stat 두 번)"""
+        entry, hit = self._validated_entry(_cache_key(json_path), need_document=False)
+        return EXISTS_BODY[entry.exists], hit
+
+    def peek_document(self, json_path: Path) -> Optional[Tuple[bytes, Optional[str]]]:
+        """파일시스템 접근 없이 응답할 수 있으면 (본문, ETag)를, 아니면 None을 반환합니다."""
+        key = _cache_key(json_path)
+        with self._lock:
+            entry = self._trusted_entry(key)
+            if entry is None or not entry.has_document:
+                return None
+            self.stats["hits"] += 1
+            return self._document_response(entry)
+
+    def get_document(self, json_path: Path) -> Tuple[bytes, Optional[str], bool]:
+        """get_annotations 응답 본문, ETag, 캐시 적중 여부를 반환합니다.
+
+        서명이 바뀌었거나 문서를 아직 읽지 않았으면 저널을 재적용하여 다시 읽습니다.
+        """
+        key = _cache_key(json_path)
+        entry, hit = self._validated_entry(key, need_document=True)
+        if hit:
+            return self._document_response(entry) + (True,)
+
+        with self._lock:
+            generation = self._generation
+            self.stats["loads"] += 1
+
+        loaded = self._load_entry(key, entry.signature, entry.checked_at, generation)
+        return self._document_response(loaded) + (False,)
+
+    def get_summary(self, json_path: Path, signature: Signature) -> Dict:
+        """디렉토리 목록에서 얻은 서명으로 세그먼트 수/유효성 요약을 반환합니다. (stat 없음)"""
+        key = _cache_key(json_path)
+        cached = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                entry.checked_at = time.monotonic()
+                self._entries.move_to_end(key)
+                if entry.summary is not None:
+                    self.stats["hits"] += 1
+                    return entry.summary
+                if entry.body is not None:
+                    self.stats["hits"] += 1
+                    cached = entry
+            if cached is None:
+                self.stats["misses"] += 1
+                self.stats["loads"] += 1
+            generation = self._generation
+
+        if cached is None:
+            return self._load_entry(key, signature, time.monotonic(), generation).summary
+        # 문서가 캐시되어 있으면 디스크 대신 본문에서 계산
+        cached.summary = summarize_annotation(json.loads(cached.body) if cached.etag else None)
+        return cached.summary
+
+    def _load_entry(self, key: str, signature: Signature, checked_at: float, generation: int) -> _Entry:
+        """문서를 읽어 직렬화된 본문과 요약을 만들고, 그동안 무효화되지 않았으면 저장합니다."""
+        data = load_annotation(Path(key))
+        loaded = _Entry(signature, checked_at)
+        if data is not None:
+            loaded.body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            loaded.etag = document_etag(data)
+        else:
+            loaded.body = EMPTY_DOCUMENT_BODY
+        loaded.summary = summarize_annotation(data)
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, loaded)
+        return loaded
+
+    def _document_response(self, entry: _Entry) -> Tuple[bytes, Optional[str]]:
+        return (entry.body or EMPTY_DOCUMENT_BODY), entry.etag
+
+    def _trusted_entry(self, key: str) -> Optional[_Entry]:
+        """감시 중인 루트 아래에서 최근 확인된 항목 (잠금 상태에서 호출)"""
+        entry = self._entries.get(key)
+        if entry is None or not self._is_watched(key):
+            return None
+        if time.monotonic() - entry.checked_at > self.revalidate_seconds:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _validated_entry(self, key: str, need_document: bool) -> Tuple[_Entry, bool]:
+        """서명을 확인한 항목과 캐시 적중 여부를 반환합니다.
+
+        need_document이면 문서 본문이 캐시되어 있어야 적중으로 봅니다.
+        """
+        with self._lock:
+            entry = self._trusted_entry(key)
+            if entry is not None and (entry.has_document or not need_document):
+                self.stats["hits"] += 1
+                return entry, True
+            entry = self._entries.get(key)
+            generation = self._generation
+
+        signature = (_stat_key(key), _stat_key(str(journal_path(Path(key)))))
+        now = time.monotonic()
+        with self._lock:
+            self.stats["revalidations"] += 1
+            if entry is not None and entry.signature == signature:
+                entry.checked_at = now
+                self._entries.move_to_end(key)
+                if entry.has_document or not need_document:
+                    self.stats["hits"] += 1
+                    return entry, True
+                self.stats["misses"] += 1
+                return entry, False
+            self.stats["misses"] += 1
+            fresh = _Entry(signature, now)
+            if generation == self._generation:
+                self._store(key, fresh)
+            return fresh, False
+
+    def _store(self, key: str, entry: _Entry):
+        """잠금 상태에서 항목을 저장하고 크기 제한을 넘으면 오래된 항목부터 제거합니다."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.stats["evictions"] += 1
+
+    # 무효화
+
+    def invalidate(self, json_path: Path):
+        """저장/패치/삭제 후 해당 어노테이션 항목을 제거합니다."""
+        self.invalidate_key(_cache_key(json_path))
+
+    def invalidate_key(self, key: str):
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.pop(os.path.normpath(key), None)
+            if entry is not None:
+                self._bytes -= entry.size
+                self.stats["invalidations"] += 1
+
+    def invalidate_tree(self, directory: str):
+        """디렉토리가 이동/삭제된 경우 그 아래의 모든 항목을 제거합니다."""
+        prefix = os.path.join(os.path.normpath(directory), "")
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key).size
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    # 파일 감시
+
+    def watch_root(self, root: Path) -> bool:
+        """데이터셋 루트를 watchdog으로 감시합니다. watchdog이 없거나 실패하면 False."""
+        if Observer is None:
+            return False
+        key = _cache_key(root)
+        with self._watch_lock:
+            if key in self._watched_roots or self._is_watched(key):
+                return True
+            # schedule(recursive=True)은 트리 전체를 순회하므로 캐시 잠금(_lock) 밖에서 실행
+            try:
+                if self._observer is None:
+                    observer = Observer()
+                    observer.daemon = True
+                    observer.start()
+                    self._observer = observer
+                watch = self._observer.schedule(_InvalidateHandler(self), key, recursive=True)
+            except Exception as e:
+                logger.warning("Cannot watch annotation root %s: %s", key, e)
+                return False
+            # 새 루트 아래에 있던 감시는 중복이므로 해제
+            prefix = os.path.join(key, "")
+            nested = {root: w for root, w in self._watched_roots.items() if root.startswith(prefix)}
+            for nested_root, nested_watch in nested.items():
+                try:
+                    self._observer.unschedule(nested_watch)
+                except Exception as e:
+                    logger.debug("Cannot unschedule %s: %s", nested_root, e)
+            watched = {root: w for root, w in self._watched_roots.items() if root not in nested}
+            watched[key] = watch
+            with self._lock:
+                self._watched_roots = watched
+        # 감시 시작 전에 바뀐 파일은 이벤트가 없으므로 기존 항목은 다시 확인하도록 제거
+        self.invalidate_tree(key)
+        logger.info("Watching annotation root: %s", key)
+        return True
+
+    def _is_watched(self, key: str) -> bool:
+        return any(key.startswith(os.path.join(root, "")) for root in self._watched_roots)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "cached_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "watcher": "watchdog" if Observer is not None else None,
+                "watched_roots": sorted(self._watched_roots),
+            }
+
+    def close(self):
+        with self._watch_lock, self._lock:
+            observer, self._observer = self._observer, None
+            self._watched_roots = {}
+            self._entries.clear()
+            self._bytes = 0
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+
+_cache: Optional[AnnotationCache] = None
+_cache_lock = threading.Lock()
+
+def get_annotation_cache() -> AnnotationCache:
+    """프로세스 전역 어노테이션 캐시 (ANNOTATION_WATCH_ROOTS는 처음 생성 시 감시 시작)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnnotationCache(
+                ANNOTATION_CACHE_SIZE, ANNOTATION_CACHE_MAX_BYTES, ANNOTATION_CACHE_REVALIDATE_SECONDS
+            )
+            for root in ANNOTATION_WATCH_ROOTS:
+                _cache.watch_root(Path(root))
+        return _cache
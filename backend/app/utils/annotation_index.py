@@ -0,0 +1,798 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from config import ANNOTATION_INDEX_PATH, ANNOTATION_INDEX_RESCAN_INTERVAL, ANNOTATION_WATCH_ROOTS
+from .annotation_store import load_annotation, journal_path
+from .annotation_schema import validate_document
+
+logger = logging.getLogger(__name__)
+
+# 스키마가 바뀌면 올려서 기존 인덱스를 재생성합니다.
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    last_scan REAL
+);
+CREATE TABLE IF NOT EXISTS clips (
+    id INTEGER PRIMARY KEY,
+    json_path TEXT NOT NULL UNIQUE,
+    root TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    file_name TEXT,
+    environment INTEGER,
+    user_num INTEGER,
+    total_frames INTEGER,
+    frame_rate REAL,
+    interaction_type TEXT,
+    space_context TEXT,
+    segment_count INTEGER NOT NULL,
+    labelled_frames INTEGER NOT NULL,
+    valid INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clips_root ON clips(root);
+CREATE INDEX IF NOT EXISTS idx_clips_environment ON clips(environment);
+CREATE INDEX IF NOT EXISTS idx_clips_user_num ON clips(user_num);
+CREATE TABLE IF NOT EXISTS segments (
+    clip_id INTEGER NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
+    segment_id INTEGER,
+    action_type INTEGER,
+    start_frame INTEGER,
+    end_frame INTEGER,
+    duration INTEGER,
+    keyframe INTEGER,
+    environment INTEGER,
+    user_num INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_segments_clip ON segments(clip_id);
+CREATE INDEX IF NOT EXISTS idx_segments_action ON segments(action_type, environment, duration);
+CREATE INDEX IF NOT EXISTS idx_segments_environment ON segments(environment, action_type);
+CREATE INDEX IF NOT EXISTS idx_segments_user_num ON segments(user_num, action_type);
+CREATE TABLE IF NOT EXISTS target_objects (
+    clip_id INTEGER NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
+    object_id INTEGER,
+    age INTEGER,
+    gender INTEGER,
+    disability INTEGER,
+    environment INTEGER,
+    user_num INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_objects_clip ON target_objects(clip_id);
+CREATE INDEX IF NOT EXISTS idx_objects_environment ON target_objects(environment, age, gender);
+CREATE INDEX IF NOT EXISTS idx_objects_user_num ON target_objects(user_num);
+CREATE TABLE IF NOT EXISTS root_counters (
+    root TEXT PRIMARY KEY,
+    clips INTEGER NOT NULL,
+    valid_clips INTEGER NOT NULL,
+    segments INTEGER NOT NULL,
+    labelled_frames INTEGER NOT NULL,
+    total_frames INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS action_counters (
+    root TEXT NOT NULL,
+    action_type INTEGER NOT NULL,
+    segments INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    PRIMARY KEY (root, action_type)
+);
+CREATE TABLE IF NOT EXISTS save_counters (
+    hour INTEGER NOT NULL,
+    annotator TEXT NOT NULL,
+    root TEXT NOT NULL,
+    saves INTEGER NOT NULL,
+    PRIMARY KEY (hour, annotator, root)
+);
+"""
+
+ROOT_COUNTER_FIELDS = ("clips", "valid_clips", "segments", "labelled_frames", "total_frames")
+# action_type이 없거나 숫자가 아닌 세그먼트의 집계 키
+UNKNOWN_ACTION_TYPE = -1
+# 메모리에 유지할 시간별 저장 횟수 (시간)
+SAVE_HISTORY_HOURS = 7 * 24
+
+# 조회 대상별 (FROM 절, 컬럼 -> SQL 식). 요청의 컬럼 이름은 이 목록으로만 SQL에 들어갑니다.
+_CLIP_COLUMNS = {
+    "json_path": "c.json_path",
+    "file_name": "c.file_name",
+    "root": "c.root",
+}
+TARGETS = {
+    "segments": ("segments s JOIN clips c ON c.id = s.clip_id", {
+        **_CLIP_COLUMNS,
+        "segment_id": "s.segment_id",
+        "action_type": "s.action_type",
+        "start_frame": "s.start_frame",
+        "end_frame": "s.end_frame",
+        "duration": "s.duration",
+        "keyframe": "s.keyframe",
+        "environment": "s.environment",
+        "user_num": "s.user_num",
+    }),
+    "target_objects": ("target_objects o JOIN clips c ON c.id = o.clip_id", {
+        **_CLIP_COLUMNS,
+        "object_id": "o.object_id",
+        "age": "o.age",
+        "gender": "o.gender",
+        "disability": "o.disability",
+        "environment": "o.environment",
+        "user_num": "o.user_num",
+    }),
+    "clips": ("clips c", {
+        **_CLIP_COLUMNS,
+        "environment": "c.environment",
+        "user_num": "c.user_num",
+        "total_frames": "c.total_frames",
+        "frame_rate": "c.frame_rate",
+        "interaction_type": "c.interaction_type",
+        "space_context": "c.space_context",
+        "segment_count": "c.segment_count",
+        "labelled_frames": "c.labelled_frames",
+        "valid": "c.valid",
+    }),
+}
+AGGREGATE_FUNCTIONS = {"count", "sum", "avg", "min", "max"}
+MAX_QUERY_LIMIT = 10000
+
+_SKIP_SUFFIXES = ('.json.bak', '.json.journal', '.tmp', '.people.json')
+
+class InvalidQuery(ValueError):
+    """잘못된 조회 대상/컬럼/필터/집계 값"""
+    pass
+
+def _int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    return None
+
+def _file_signature(json_path: Path) -> Optional[str]:
+    """JSON과 저널의 (mtime, size). 둘 다 없으면 None."""
+    parts = []
+    for path in (json_path, journal_path(json_path)):
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append("-")
+    return None if parts == ["-", "-"] else "/".join(parts)
+
+def extract_records(data: Dict) -> Tuple[Dict, List[Tuple], List[Tuple]]:
+    """어노테이션 문서에서 (클립 값, 세그먼트 행, 대상 객체 행)을 추출합니다. (누락 필드는 NULL)"""
+    meta = data.get("meta_data") if isinstance(data.get("meta_data"), dict) else {}
+    info = data.get("additional_info") if isinstance(data.get("additional_info"), dict) else {}
+    annotations = data.get("annotations") if isinstance(data.get("annotations"), dict) else {}
+    environment = _int(meta.get("environment"))
+    user_num = _int(annotations.get("user_num"))
+
+    segments = []
+    labelled_frames = 0
+    segmentation = annotations.get("segmentation")
+    for seg in segmentation if isinstance(segmentation, list) else []:
+        if not isinstance(seg, dict):
+            continue
+        duration = _int(seg.get("duration"))
+        labelled_frames += duration or 0
+        segments.append((
+            _int(seg.get("segment_id")), _int(seg.get("action_type")), _int(seg.get("start_frame")),
+            _int(seg.get("end_frame")), duration, _int(seg.get("keyframe")), environment, user_num
+        ))
+
+    objects = []
+    target_objects = annotations.get("target_objects")
+    for obj in target_objects if isinstance(target_objects, list) else []:
+        if not isinstance(obj, dict):
+            continue
+        objects.append((
+            _int(obj.get("object_id")), _int(obj.get("age")), _int(obj.get("gender")),
+            _int(obj.get("disability")), environment, user_num
+        ))
+
+    frame_rate = meta.get("frame_rate")
+    clip = {
+        "file_name": meta.get("file_name"),
+        "environment": environment,
+        "user_num": user_num,
+        "total_frames": _int(meta.get("total_frames")),
+        "frame_rate": float(frame_rate) if isinstance(frame_rate, (int, float)) else None,
+        "interaction_type": info.get("InteractionType"),
+        "space_context": annotations.get("space_context"),
+        "segment_count": len(segments),
+        "labelled_frames": labelled_frames,
+        "valid": int(not validate_document(data)),
+    }
+    return clip, segments, objects
+
+class AnnotationIndex:
+    """데이터셋 전체의 세그먼트/대상 객체를 질의하기 위한 SQLite 인덱스
+
+    - 루트를 등록하면 백그라운드 스레드가 (mtime, size)가 바뀐 JSON만 다시 읽어 반영합니다.
+    - save/patch/delete 시에는 update_file/remove_file로 해당 파일만 즉시 갱신합니다.
+    - action_type, environment, user_num 인덱스로 필터/집계를 처리합니다.
+    - 루트별 클립/세그먼트/프레임 수와 작업자별 시간당 저장 횟수는 행을 바꿀 때마다 증감하는
+      카운터로 유지하므로 진행 현황 조회는 파일 수와 무관합니다.
+    """
+
+    def __init__(self, db_path: Path, rescan_interval: float):
+        self.db_path = db_path
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._init_schema()
+        self._load_counters()
+        with self._lock:
+            self._merge_nested_roots_locked()
+            self._conn.commit()
+        self._queue: "queue.Queue[Optional[Tuple[str, Optional[str]]]]" = queue.Queue()
+        self._pending = set()
+        self._scanning: Optional[str] = None
+        self._worker: Optional[threading.Thread] = None
+        # 등록된 루트 아래 하위 디렉토리의 마지막 스캔 시각 (하위 디렉토리는 루트로 등록하지 않음)
+        self._subtree_scans: Dict[str, float] = {}
+
+    def _init_schema(self):
+        conn = self._conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            conn.executescript(
+                "DROP TABLE IF EXISTS segments; DROP TABLE IF EXISTS target_objects; "
+                "DROP TABLE IF EXISTS clips; DROP TABLE IF EXISTS roots; "
+                "DROP TABLE IF EXISTS root_counters; DROP TABLE IF EXISTS action_counters; "
+                "DROP TABLE IF EXISTS save_counters;"
+            )
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.commit()
+
+    # 백그라운드 색인
+
+    def add_root(self, root: Path, force: bool = False) -> bool:
+        """루트를 등록하고 마지막 스캔이 오래되었으면 백그라운드 스캔을 예약합니다. 예약했으면 True.
+
+        이미 등록된 루트의 하위 디렉토리는 등록하지 않고 상위 루트 소속으로 그 부분만 스캔합니다.
+        새 루트 아래에 등록된 루트가 있으면 새 루트로 합칩니다. (같은 파일을 두 루트가 번갈아 가져가지 않도록)
+        """
+        key = os.path.normpath(os.path.abspath(str(root)))
+        with self._lock:
+            ancestor = self._registered_ancestor_locked(key)
+            if ancestor is not None:
+                subtree = key
+                last_scan = self._subtree_scans.get(key)
+            else:
+                ancestor, subtree = key, None
+                row = self._conn.execute("SELECT last_scan FROM roots WHERE path = ?", (key,)).fetchone()
+                if row is None:
+                    self._conn.execute("INSERT INTO roots (path, last_scan) VALUES (?, NULL)", (key,))
+                    self._merge_nested_roots_locked()
+                    self._conn.commit()
+                last_scan = row[0] if row else None
+            if key in self._pending:
+                return False
+            if not force and last_scan is not None and time.time() - last_scan < self.rescan_interval:
+                return False
+            self._pending.add(key)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="annotation-index", daemon=True)
+                self._worker.start()
+        self._queue.put((ancestor, subtree))
+        return True
+
+    def _registered_ancestor_locked(self, key: str) -> Optional[str]:
+        """key를 포함하는 (key 자신이 아닌) 등록된 루트 중 가장 바깥쪽 것"""
+        best = None
+        for (root,) in self._conn.execute("SELECT path FROM roots"):
+            if key.startswith(os.path.join(root, "")) and (best is None or len(root) < len(best)):
+                best = root
+        return best
+
+    def _merge_nested_roots_locked(self):
+        """등록된 루트 아래에 있는 다른 루트(이전에 등록된 하위 루트, 루트 없이 저장된 파일의 디렉토리)를
+        가장 바깥쪽 등록 루트로 합칩니다. 클립은 다시 읽지 않고 소속과 카운터만 옮깁니다."""
+        conn = self._conn
+        registered = [root for (root,) in conn.execute("SELECT path FROM roots")]
+        candidates = set(registered) | set(self._root_counters)
+        candidates.update(root for (root,) in conn.execute("SELECT DISTINCT root FROM clips"))
+        for child in candidates:
+            parent = None
+            for root in registered:
+                if child.startswith(os.path.join(root, "")) and (parent is None or len(root) < len(parent)):
+                    parent = root
+            if parent is not None:
+                self._merge_root_locked(child, parent)
+
+    def _merge_root_locked(self, child: str, parent: str):
+        conn = self._conn
+        conn.execute("UPDATE clips SET root = ? WHERE root = ?", (parent, child))
+        totals = self._root_counters.pop(child, None)
+        actions = self._action_counters.pop(child, {})
+        if totals is not None:
+            self._apply_counters_locked(parent, 1, totals, actions)
+        conn.execute("DELETE FROM root_counters WHERE root = ?", (child,))
+        conn.execute("DELETE FROM action_counters WHERE root = ?", (child,))
+
+        conn.execute(
+            "INSERT INTO save_counters (hour, annotator, root, saves) "
+            "SELECT hour, annotator, ?, saves FROM save_counters WHERE root = ? "
+            "ON CONFLICT(hour, annotator, root) DO UPDATE SET saves = saves + excluded.saves",
+            (parent, child)
+        )
+        conn.execute("DELETE FROM save_counters WHERE root = ?", (child,))
+        for hour, annotator, root in [k for k in self._save_counters if k[2] == child]:
+            saves = self._save_counters.pop((hour, annotator, root))
+            merged = (hour, annotator, parent)
+            self._save_counters[merged] = self._save_counters.get(merged, 0) + saves
+
+        conn.execute("DELETE FROM roots WHERE path = ?", (child,))
+        logger.info("Merged annotation index root %s into %s", child, parent)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            root, subtree = item
+            key = subtree or root
+            try:
+                self._scanning = key
+                self.scan_root(root, subtree)
+            except Exception as e:
+                logger.error("Annotation index scan of %s failed: %s", key, e)
+            finally:
+                self._scanning = None
+                with self._lock:
+                    self._pending.discard(key)
+
+    def scan_root(self, root: str, subtree: Optional[str] = None, batch_size: int = 500) -> Dict:
+        """루트 아래의 어노테이션을 증분 색인합니다. (변경된 파일만 읽고 사라진 파일은 삭제)
+
+        subtree가 있으면 그 하위 디렉토리만 스캔하고 클립은 root 소속으로 기록합니다.
+        읽거나 기록할 수 없는 파일은 오류로 세고 나머지 파일을 계속 색인합니다.
+        """
+        started = time.time()
+        base = subtree or root
+        prefix = os.path.join(base, "")
+        with self._lock:
+            known = {
+                json_path: signature for json_path, signature in self._conn.execute(
+                    "SELECT json_path, signature FROM clips WHERE root = ?", (root,)
+                ) if subtree is None or json_path.startswith(prefix)
+            }
+        seen = set()
+        changed = errors = 0
+        batch: List[Tuple[str, str, Dict]] = []
+
+        for dir_path, dir_names, file_names in os.walk(base):
+            dir_names[:] = sorted(d for d in dir_names if not d.startswith('.'))
+            for name in file_names:
+                if (not name.endswith('.json') or name.startswith('.') or name == 'index.json'
+                        or name.endswith(_SKIP_SUFFIXES)):
+                    continue
+                json_path = os.path.join(dir_path, name)
+                seen.add(json_path)
+                signature = _file_signature(Path(json_path))
+                if signature is None or known.get(json_path) == signature:
+                    continue
+                try:
+                    data = load_annotation(Path(json_path))
+                except (OSError, ValueError) as e:
+                    logger.warning("Cannot index annotation %s: %s", json_path, e)
+                    errors += 1
+                    continue
+                if not isinstance(data, dict):
+                    errors += 1
+                    continue
+                batch.append((json_path, signature, data))
+                if len(batch) >= batch_size:
+                    written = self._write_batch(root, batch)
+                    changed += written
+                    errors += len(batch) - written
+                    batch = []
+        if batch:
+            written = self._write_batch(root, batch)
+            changed += written
+            errors += len(batch) - written
+
+        removed = set(known) - seen
+        with self._lock:
+            for json_path in removed:
+                self._delete_clip_locked(json_path)
+            if subtree is None:
+                self._conn.execute("UPDATE roots SET last_scan = ? WHERE path = ?", (time.time(), root))
+            else:
+                self._subtree_scans[subtree] = time.time()
+            self._conn.commit()
+
+        stats = {"root": root, "subtree": subtree, "changed": changed, "removed": len(removed),
+                 "errors": errors, "elapsed": time.time() - started}
+        logger.info(
+            "Annotation index scan of %s: %d updated, %d removed, %d errors in %.1fs",
+            base, changed, len(removed), errors, stats["elapsed"]
+        )
+        return stats
+
+    def _write_batch(self, root: str, batch: List[Tuple[str, str, Dict]]) -> int:
+        """배치를 한 트랜잭션으로 기록하고 성공한 파일 수를 반환합니다."""
+        written = 0
+        with self._lock:
+            for json_path, signature, data in batch:
+                written += self._try_upsert_locked(root, json_path, signature, data)
+            self._conn.commit()
+        return written
+
+    def _try_upsert_locked(self, root: str, json_path: str, signature: str, data: Dict) -> bool:
+        """파일 하나를 SAVEPOINT 안에서 반영합니다. 실패하면 그 파일의 행과 카운터만 되돌리고 False."""
+        root_counters = {k: dict(v) for k, v in self._root_counters.items()}
+        action_counters = {k: {a: list(v) for a, v in actions.items()} for k, actions in self._action_counters.items()}
+        self._conn.execute("SAVEPOINT upsert_file")
+        try:
+            self._upsert_locked(root, json_path, signature, data)
+        except Exception as e:
+            self._conn.execute("ROLLBACK TO SAVEPOINT upsert_file")
+            self._conn.execute("RELEASE SAVEPOINT upsert_file")
+            self._root_counters, self._action_counters = root_counters, action_counters
+            logger.warning("Cannot index annotation %s: %s", json_path, e)
+            return False
+        self._conn.execute("RELEASE SAVEPOINT upsert_file")
+        return True
+
+    # 저장 시 증분 갱신
+
+    def update_file(self, json_path: Path, data: Optional[Dict] = None) -> bool:
+        """저장/패치된 어노테이션 하나를 즉시 반영합니다. data가 없으면 파일에서 읽습니다.
+
+        기록할 수 없는 문서면 이전 행을 그대로 두고 False를 반환합니다.
+        """
+        key = os.path.normpath(os.path.abspath(str(json_path)))
+        signature = _file_signature(Path(key))
+        if signature is None:
+            self.remove_file(json_path)
+            return True
+        if data is None:
+            data = load_annotation(Path(key))
+        with self._lock:
+            written = self._try_upsert_locked(self._root_for(key), key, signature, data)
+            self._conn.commit()
+        return written
+
+    def remove_file(self, json_path: Path):
+        key = os.path.normpath(os.path.abspath(str(json_path)))
+        with self._lock:
+            self._delete_clip_locked(key)
+            self._conn.commit()
+
+    def _root_for(self, key: str) -> str:
+        """등록된 루트 중 가장 가까운 것, 없으면 파일의 디렉토리 (잠금 상태에서 호출)"""
+        best = None
+        for (root,) in self._conn.execute("SELECT path FROM roots"):
+            if key.startswith(os.path.join(root, "")) and (best is None or len(root) > len(best)):
+                best = root
+        return best or os.path.dirname(key)
+
+    def _upsert_locked(self, root: str, json_path: str, signature: str, data: Dict):
+        clip, segments, objects = extract_records(data)
+        conn = self._conn
+        self._delete_clip_locked(json_path)
+        cur = conn.execute(
+            "INSERT INTO clips (json_path, root, signature, file_name, environment, user_num, total_frames, "
+            "frame_rate, interaction_type, space_context, segment_count, labelled_frames, valid, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (json_path, root, signature, clip["file_name"], clip["environment"], clip["user_num"],
+             clip["total_frames"], clip["frame_rate"], clip["interaction_type"], clip["space_context"],
+             clip["segment_count"], clip["labelled_frames"], clip["valid"], time.time())
+        )
+        clip_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO segments (clip_id, segment_id, action_type, start_frame, end_frame, duration, "
+            "keyframe, environment, user_num) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(clip_id,) + row for row in segments]
+        )
+        conn.executemany(
+            "INSERT INTO target_objects (clip_id, object_id, age, gender, disability, environment, user_num) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(clip_id,) + row for row in objects]
+        )
+
+        actions: Dict[int, List[int]] = {}
+        for row in segments:
+            action = actions.setdefault(_action_key(row[1]), [0, 0])
+            action[0] += 1
+            action[1] += row[4] or 0
+        self._apply_counters_locked(root, 1, {
+            "clips": 1,
+            "valid_clips": clip["valid"],
+            "segments": clip["segment_count"],
+            "labelled_frames": clip["labelled_frames"],
+            "total_frames": clip["total_frames"] or 0,
+        }, actions)
+
+    def _delete_clip_locked(self, json_path: str):
+        """클립과 하위 행을 삭제하고 카운터에서 기여분을 뺍니다."""
+        conn = self._conn
+        old = conn.execute(
+            "SELECT id, root, valid, segment_count, labelled_frames, total_frames FROM clips WHERE json_path = ?",
+            (json_path,)
+        ).fetchone()
+        if old is None:
+            return
+        clip_id, root, valid, segment_count, labelled_frames, total_frames = old
+        actions = {
+            _action_key(action_type): [count, frames]
+            for action_type, count, frames in conn.execute(
+                "SELECT action_type, COUNT(*), COALESCE(SUM(duration), 0) FROM segments "
+                "WHERE clip_id = ? GROUP BY action_type", (clip_id,)
+            )
+        }
+        conn.execute("DELETE FROM clips WHERE id = ?", (clip_id,))
+        self._apply_counters_locked(root, -1, {
+            "clips": 1,
+            "valid_clips": valid,
+            "segments": segment_count,
+            "labelled_frames": labelled_frames,
+            "total_frames": total_frames or 0,
+        }, actions)
+
+    # 진행 현황 카운터 (재스캔 없이 저장/삭제 시 증감)
+
+    def _load_counters(self):
+        conn = self._conn
+        self._root_counters: Dict[str, Dict[str, int]] = {
+            row[0]: dict(zip(ROOT_COUNTER_FIELDS, row[1:]))
+            for row in conn.execute(f"SELECT root, {', '.join(ROOT_COUNTER_FIELDS)} FROM root_counters")
+        }
+        self._action_counters: Dict[str, Dict[int, List[int]]] = {}
+        for root, action_type, segments, frames in conn.execute(
+            "SELECT root, action_type, segments, frames FROM action_counters"
+        ):
+            self._action_counters.setdefault(root, {})[action_type] = [segments, frames]
+        since = int(time.time() // 3600) - SAVE_HISTORY_HOURS
+        self._save_counters: Dict[Tuple[int, str, str], int] = {
+            (hour, annotator, root): saves
+            for hour, annotator, root, saves in conn.execute(
+                "SELECT hour, annotator, root, saves FROM save_counters WHERE hour > ?", (since,)
+            )
+        }
+
+    def _apply_counters_locked(self, root: str, sign: int, totals: Dict[str, int],
+                               actions: Dict[int, List[int]]):
+        """클립 하나의 기여분을 메모리와 DB 카운터에 더하거나(sign=1) 뺍니다(sign=-1)."""
+        counters = self._root_counters.setdefault(root, dict.fromkeys(ROOT_COUNTER_FIELDS, 0))
+        for field in ROOT_COUNTER_FIELDS:
+            counters[field] += sign * totals[field]
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO root_counters (root, {', '.join(ROOT_COUNTER_FIELDS)}) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (root,) + tuple(counters[field] for field in ROOT_COUNTER_FIELDS)
+        )
+        root_actions = self._action_counters.setdefault(root, {})
+        for action_type, (count, frames) in actions.items():
+            action = root_actions.setdefault(action_type, [0, 0])
+            action[0] += sign * count
+            action[1] += sign * frames
+            self._conn.execute(
+                "INSERT OR REPLACE INTO action_counters (root, action_type, segments, frames) VALUES (?, ?, ?, ?)",
+                (root, action_type, action[0], action[1])
+            )
+
+    def record_save(self, json_path: Path, annotator: str):
+        """저장 한 번을 (시간, 작업자, 루트) 카운터에 기록합니다."""
+        key = os.path.normpath(os.path.abspath(str(json_path)))
+        hour = int(time.time() // 3600)
+        with self._lock:
+            root = self._root_for(key)
+            counter_key = (hour, annotator, root)
+            self._save_counters[counter_key] = self._save_counters.get(counter_key, 0) + 1
+            self._conn.execute(
+                "INSERT INTO save_counters (hour, annotator, root, saves) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(hour, annotator, root) DO UPDATE SET saves = saves + 1",
+                counter_key
+            )
+            self._conn.commit()
+            if len(self._save_counters) > 1024:
+                since = hour - SAVE_HISTORY_HOURS
+                for old in [k for k in self._save_counters if k[0] <= since]:
+                    del self._save_counters[old]
+
+    def get_progress(self, root: Optional[str] = None, hours: int = 24) -> Dict:
+        """루트별 어노테이션 진행 현황과 작업자별 시간당 저장 횟수 (메모리 카운터만 읽음)"""
+        if root is not None:
+            root = os.path.normpath(os.path.abspath(root))
+        hours = max(1, min(int(hours), SAVE_HISTORY_HOURS))
+        now_hour = int(time.time() // 3600)
+        since = now_hour - hours
+
+        with self._lock:
+            roots = {}
+            for path, counters in self._root_counters.items():
+                if root is not None and path != root:
+                    continue
+                roots[path] = {
+                    **counters,
+                    "labelled_ratio": (counters["labelled_frames"] / counters["total_frames"]
+                                       if counters["total_frames"] else 0.0),
+                    "action_types": {
+                        str(action_type): {"segments": count, "frames": frames}
+                        for action_type, (count, frames) in sorted(self._action_counters.get(path, {}).items())
+                        if count
+                    },
+                }
+            annotators: Dict[str, Dict] = {}
+            for (hour, annotator, save_root), saves in self._save_counters.items():
+                if hour <= since or (root is not None and save_root != root):
+                    continue
+                entry = annotators.setdefault(annotator, {"total": 0, "last_hour": 0, "per_hour": {}})
+                entry["total"] += saves
+                if hour == now_hour:
+                    entry["last_hour"] += saves
+                entry["per_hour"][hour * 3600] = entry["per_hour"].get(hour * 3600, 0) + saves
+
+        for entry in annotators.values():
+            entry["saves_per_hour"] = entry["total"] / hours
+            entry["per_hour"] = [{"hour": h, "saves": n} for h, n in sorted(entry["per_hour"].items())]
+
+        totals = dict.fromkeys(ROOT_COUNTER_FIELDS, 0)
+        for counters in roots.values():
+            for field in ROOT_COUNTER_FIELDS:
+                totals[field] += counters[field]
+        totals["labelled_ratio"] = (totals["labelled_frames"] / totals["total_frames"]
+                                    if totals["total_frames"] else 0.0)
+        return {"roots": roots, "totals": totals, "window_hours": hours, "annotators": annotators}
+
+    # 조회
+
+    def query(self, target: str = "segments", filters: Optional[Dict[str, Any]] = None,
+              group_by: Optional[List[str]] = None, aggregates: Optional[List[str]] = None,
+              columns: Optional[List[str]] = None, sort: Optional[str] = None, order: str = "asc",
+              limit: int = 200, offset: int = 0) -> Dict:
+        """필터/집계/페이지 조회
+
+        - filters: {컬럼: 값 | [값, ...] | {"min": .., "max": ..}}, "root"는 경로 접두사로 비교
+        - group_by + aggregates(["count", "sum:duration", "avg:duration", ...]): 그룹별 집계
+        - 그 외에는 columns(기본 전체)의 행을 sort/order/limit/offset으로 반환
+        """
+        if target not in TARGETS:
+            raise InvalidQuery(f"Invalid target: {target}")
+        if order not in ("asc", "desc"):
+            raise InvalidQuery(f"Invalid sort order: {order}")
+        if not (0 < limit <= MAX_QUERY_LIMIT) or offset < 0:
+            raise InvalidQuery(f"limit must be 1-{MAX_QUERY_LIMIT} and offset non-negative")
+
+        source, column_map = TARGETS[target]
+        where, params = _build_where(filters or {}, column_map)
+        where_sql = " AND ".join(where) if where else "1"
+        direction = "ASC" if order == "asc" else "DESC"
+
+        if group_by or aggregates:
+            group_by = list(group_by or [])
+            select_names = group_by + list(aggregates or ["count"])
+            select_sql = [_column(name, column_map) for name in group_by]
+            select_sql += [_aggregate(spec, column_map) for spec in aggregates or ["count"]]
+            group_sql = f" GROUP BY {', '.join(_column(n, column_map) for n in group_by)}" if group_by else ""
+            order_name = sort or (group_by[0] if group_by else None)
+            if order_name is not None and order_name not in select_names:
+                raise InvalidQuery(f"Invalid sort key: {order_name}")
+            order_sql = (f" ORDER BY {select_sql[select_names.index(order_name)]} {direction}"
+                         if order_name else "")
+            sql = f"SELECT {', '.join(select_sql)} FROM {source} WHERE {where_sql}{group_sql}{order_sql}"
+            count_sql = f"SELECT COUNT(*) FROM ({sql})"
+        else:
+            select_names = list(columns or column_map)
+            select_sql = [_column(name, column_map) for name in select_names]
+            order_name = sort or "json_path"
+            order_sql = f" ORDER BY {_column(order_name, column_map)} {direction}, c.id {direction}"
+            sql = f"SELECT {', '.join(select_sql)} FROM {source} WHERE {where_sql}{order_sql}"
+            count_sql = f"SELECT COUNT(*) FROM {source} WHERE {where_sql}"
+
+        with self._lock:
+            total = self._conn.execute(count_sql, params).fetchone()[0]
+            rows = self._conn.execute(f"{sql} LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+
+        next_offset = offset + len(rows) if offset + len(rows) < total else None
+        return {
+            "target": target,
+            "columns": select_names,
+            "rows": [dict(zip(select_names, row)) for row in rows],
+            "total": total,
+            "next_offset": next_offset,
+        }
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            roots = [
+                {"path": path, "last_scan": last_scan}
+                for path, last_scan in self._conn.execute("SELECT path, last_scan FROM roots ORDER BY path")
+            ]
+            counts = {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("clips", "segments", "target_objects")
+            }
+            pending = sorted(self._pending)
+        return {"roots": roots, **counts, "pending": pending, "scanning": self._scanning}
+
+    def close(self):
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+        with self._lock:
+            self._conn.close()
+
+def _action_key(action_type: Optional[int]) -> int:
+    return action_type if action_type is not None else UNKNOWN_ACTION_TYPE
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float))
+
+def _column(name: Any, column_map: Dict[str, str]) -> str:
+    if not isinstance(name, str) or name not in column_map:
+        raise InvalidQuery(f"Invalid column: {name}")
+    return column_map[name]
+
+def _aggregate(spec: Any, column_map: Dict[str, str]) -> str:
+    """'count' 또는 '함수:컬럼' 형식의 집계를 SQL로 변환합니다."""
+    if spec == "count":
+        return "COUNT(*)"
+    func, _, name = str(spec).partition(":")
+    if func not in AGGREGATE_FUNCTIONS or not name:
+        raise InvalidQuery(f"Invalid aggregate: {spec}")
+    return f"{func.upper()}({_column(name, column_map)})"
+
+def _build_where(filters: Dict[str, Any], column_map: Dict[str, str]) -> Tuple[List[str], List[Any]]:
+    """필터 조건을 SQL WHERE 절로 변환합니다."""
+    if not isinstance(filters, dict):
+        raise InvalidQuery("filters must be an object")
+    where, params = [], []
+    for name, value in filters.items():
+        column = _column(name, column_map)
+        if name == "root":
+            prefix = os.path.join(os.path.normpath(str(value)), "")
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("c.json_path LIKE ? ESCAPE '\\'")
+            params.append(f"{escaped}%")
+        elif isinstance(value, list):
+            if not value or not all(_is_scalar(v) for v in value):
+                raise InvalidQuery(f"Invalid value list for filter: {name}")
+            where.append(f"{column} IN ({', '.join('?' for _ in value)})")
+            params.extend(value)
+        elif isinstance(value, dict):
+            unknown = set(value) - {"min", "max"}
+            if unknown or not value:
+                raise InvalidQuery(f"Range filter for {name} must use min/max")
+            if not all(v is None or _is_scalar(v) for v in value.values()):
+                raise InvalidQuery(f"Invalid range for filter: {name}")
+            if value.get("min") is not None:
+                where.append(f"{column} >= ?")
+                params.append(value["min"])
+            if value.get("max") is not None:
+                where.append(f"{column} <= ?")
+                params.append(value["max"])
+        elif value is None:
+            where.append(f"{column} IS NULL")
+        elif not _is_scalar(value):
+            raise InvalidQuery(f"Invalid value for filter: {name}")
+        else:
+            where.append(f"{column} = ?")
+            params.append(value)
+    return where, params
+
+_index: Optional[AnnotationIndex] = None
+_index_lock = threading.Lock()
+
+def get_annotation_index() -> AnnotationIndex:
+    """프로세스 전역 어노테이션 인덱스 (ANNOTATION_WATCH_ROOTS는 처음 생성 시 색인 예약)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AnnotationIndex(ANNOTATION_INDEX_PATH, ANNOTATION_INDEX_RESCAN_INTERVAL)
+            for root in ANNOTATION_WATCH_ROOTS:
+                _index.add_root(Path(root))
+        return _index
@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Optional
+
+# 필수 필드 (한 번만 생성하여 재사용)
+REQUIRED_SECTIONS = ('meta_data', 'additional_info', 'annotations')
+REQUIRED_META_FIELDS = (
+    'file_name', 'format', 'size', 'width_height', 'environment',
+    'frame_rate', 'total_frames', 'camera_height', 'camera_angle'
+)
+REQUIRED_ANNOTATION_FIELDS = ('space_context', 'user_num', 'target_objects', 'segmentation')
+REQUIRED_SEGMENT_FIELDS = (
+    'segment_id', 'action_type', 'start_frame',
+    'end_frame', 'duration', 'keyframe', 'keypoints'
+)
+NUMERIC_SEGMENT_FIELDS = ('action_type', 'start_frame', 'end_frame', 'keyframe')
+
+ACTION_TYPE_RANGE = (0, 3)
+USER_NUM_RANGE = (1, 10)
+
+Issue = Dict[str, str]
+
+class AnnotationValidationError(ValueError):
+    """검증 오류 목록을 담은 예외 (각 오류는 JSON pointer와 메시지)"""
+
+    def __init__(self, errors: List[Issue]):
+        self.errors = errors
+        first = errors[0]["message"] if errors else "Invalid annotation data"
+        more = f" (and {len(errors) - 1} more errors)" if len(errors) > 1 else ""
+        super().__init__(first + more)
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _issue(errors: List[Issue], pointer: str, message: str):
+    errors.append({"pointer": pointer, "message": message})
+
+def validate_segment_into(segment: Any, pointer: str, index: int, errors: List[Issue]):
+    """세그먼트 하나를 검증하여 오류를 errors에 추가합니다."""
+    if not isinstance(segment, dict):
+        _issue(errors, pointer, "Each segment must be a dictionary")
+        return
+
+    missing = [field for field in REQUIRED_SEGMENT_FIELDS if field not in segment]
+    for field in missing:
+        _issue(errors, f"{pointer}/{field}", f"Missing required field in segment: {field}")
+
+    valid_numbers = True
+    for field in NUMERIC_SEGMENT_FIELDS:
+        if field in segment and not _is_number(segment[field]):
+            _issue(errors, f"{pointer}/{field}", f"{field} must be a number in segment {index}")
+            valid_numbers = False
+    if missing or not valid_numbers:
+        return
+
+    action_type = segment['action_type']
+    start_frame = segment['start_frame']
+    end_frame = segment['end_frame']
+    keyframe = segment['keyframe']
+
+    if not (ACTION_TYPE_RANGE[0] <= action_type <= ACTION_TYPE_RANGE[1]):
+        _issue(errors, f"{pointer}/action_type",
+               f"Invalid action_type value in segment {index} (must be 0-3)")
+    if not (start_frame >= 0 and start_frame < end_frame):
+        _issue(errors, f"{pointer}/start_frame", f"Invalid frame values in segment {index}")
+    elif not (start_frame <= keyframe <= end_frame):
+        _issue(errors, f"{pointer}/keyframe", f"Invalid keyframe value in segment {index}")
+
+def validate_user_num_into(user_num: Any, pointer: str, errors: List[Issue]):
+    if (not isinstance(user_num, int) or isinstance(user_num, bool)
+            or not (USER_NUM_RANGE[0] <= user_num <= USER_NUM_RANGE[1])):
+        _issue(errors, pointer, "user_num must be an integer between 1 and 10")
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+# 섹션별 필드 값 규칙: (검사 함수, 오류 메시지에 쓸 설명)
+# 전체 저장(validate_document)과 PATCH의 set 연산이 같은 규칙을 사용합니다.
+FIELD_RULES = {
+    'meta_data': {
+        'file_name': (lambda v: isinstance(v, str), "a string"),
+        'format': (lambda v: isinstance(v, str), "a string"),
+        'size': (lambda v: _is_int(v) and v >= 0, "a non-negative integer"),
+        'width_height': (lambda v: isinstance(v, list) and len(v) == 2 and all(_is_number(x) for x in v),
+                         "a list of two numbers"),
+        'environment': (_is_int, "an integer"),
+        'frame_rate': (lambda v: _is_number(v) and v > 0, "a positive number"),
+        'total_frames': (lambda v: _is_int(v) and v >= 0, "a non-negative integer"),
+        'camera_height': (_is_number, "a number"),
+        'camera_angle': (_is_number, "a number"),
+    },
+    'additional_info': {
+        'InteractionType': (lambda v: isinstance(v, str), "a string"),
+    },
+    'annotations': {
+        'space_context': (lambda v: isinstance(v, str), "a string"),
+        'target_objects': (lambda v: isinstance(v, list) and all(isinstance(x, dict) for x in v),
+                           "a list of dictionaries"),
+    },
+}
+
+def validate_field_into(section: str, field: str, value: Any, pointer: str, errors: List[Issue]):
+    """섹션의 필드 하나를 검증합니다. (규칙이 없는 필드는 통과)"""
+    if section == 'annotations' and field == 'user_num':
+        validate_user_num_into(value, pointer, errors)
+        return
+    rule = FIELD_RULES.get(section, {}).get(field)
+    if rule is not None and not rule[0](value):
+        _issue(errors, pointer, f"{section}.{field} must be {rule[1]}")
+
+def validate_document(data: Any) -> List[Issue]:
+    """어노테이션 문서를 한 번 순회하며 모든 오류를 수집합니다. 오류가 없으면 빈 목록."""
+    errors: List[Issue] = []
+    if not isinstance(data, dict):
+        _issue(errors, "", "Data must be a dictionary")
+        return errors
+
+    for section in REQUIRED_SECTIONS:
+        if section not in data:
+            _issue(errors, f"/{section}", f"Missing required section: {section}")
+
+    meta_data = data.get('meta_data')
+    if isinstance(meta_data, dict):
+        for field in REQUIRED_META_FIELDS:
+            if field not in meta_data:
+                _issue(errors, f"/meta_data/{field}", f"Missing required field in meta_data: {field}")
+    elif meta_data is not None:
+        _issue(errors, "/meta_data", "meta_data must be a dictionary")
+
+    for section in ('meta_data', 'additional_info', 'annotations'):
+        values = data.get(section)
+        if not isinstance(values, dict):
+            continue
+        for field in FIELD_RULES[section]:
+            if field in values:
+                validate_field_into(section, field, values[field], f"/{section}/{field}", errors)
+
+    annotations = data.get('annotations')
+    if annotations is None:
+        return errors
+    if not isinstance(annotations, dict):
+        _issue(errors, "/annotations", "annotations must be a dictionary")
+        return errors
+
+    for field in REQUIRED_ANNOTATION_FIELDS:
+        if field not in annotations:
+            _issue(errors, f"/annotations/{field}", f"Missing required field in annotations: {field}")
+
+    if 'user_num' in annotations:
+        validate_user_num_into(annotations['user_num'], "/annotations/user_num", errors)
+
+    segmentation = annotations.get('segmentation')
+    if segmentation is None:
+        return errors
+    if not isinstance(segmentation, list):
+        _issue(errors, "/annotations/segmentation", "Segmentation must be a list")
+        return errors
+
+    for i, segment in enumerate(segmentation):
+        validate_segment_into(segment, f"/annotations/segmentation/{i}", i, errors)
+    return errors
+
+def validate_segment(segment: Any, index: int = 0, pointer: Optional[str] = None) -> List[Issue]:
+    """세그먼트 하나의 오류 목록을 반환합니다."""
+    errors: List[Issue] = []
+    validate_segment_into(segment, pointer if pointer is not None else f"/annotations/segmentation/{index}",
+                          index, errors)
+    return errors
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+
+from config import ALLOWED_VIDEO_EXTENSIONS
+from .annotation_cache import get_annotation_cache
+from .annotation_store import JOURNAL_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+# 요청할 수 있는 상태 필드 (SUMMARY_FIELDS는 어노테이션을 읽고 검증해야 하므로 요청한 경우에만 계산)
+SUMMARY_FIELDS = ("segments", "valid", "error_count")
+STATUS_FIELDS = ("exists", "mtime") + SUMMARY_FIELDS
+DEFAULT_FIELDS = ("exists", "mtime")
+
+def wants_summary(fields: Iterable[str]) -> bool:
+    return any(field in SUMMARY_FIELDS for field in fields)
+
+def _entry_stat(entry: Optional[os.DirEntry]) -> Optional[Tuple[int, int]]:
+    if entry is None:
+        return None
+    try:
+        st = entry.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _list_dir(dir_path: str) -> Tuple[Dict[str, os.DirEntry], List[os.DirEntry], List[str]]:
+    """디렉토리를 한 번 나열하여 (어노테이션/저널 항목, 비디오 항목, 하위 디렉토리)를 반환합니다."""
+    sidecars: Dict[str, os.DirEntry] = {}
+    videos: List[os.DirEntry] = []
+    subdirs: List[str] = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            name = entry.name
+            lower = name.lower()
+            if lower.endswith(".json") or lower.endswith(".json" + JOURNAL_SUFFIX):
+                sidecars[name] = entry
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif os.path.splitext(lower)[1] in ALLOWED_VIDEO_EXTENSIONS and entry.is_file():
+                    videos.append(entry)
+            except OSError as e:
+                logger.warning("Error processing file %s: %s", entry.path, e)
+    return sidecars, videos, subdirs
+
+def _status(video_path: str, dir_path: str, sidecars: Dict[str, os.DirEntry], summary: bool) -> Dict:
+    """목록에서 찾은 사이드카 파일로 비디오 하나의 어노테이션 상태를 만듭니다.
+
+    summary가 False이면 디렉토리 나열 결과만 사용하고 어노테이션 파일은 읽지 않습니다.
+    """
+    json_name = os.path.splitext(os.path.basename(video_path))[0] + ".json"
+    json_stat = _entry_stat(sidecars.get(json_name))
+    journal_stat = _entry_stat(sidecars.get(json_name + JOURNAL_SUFFIX))
+    result = {
+        "path": video_path,
+        "exists": json_stat is not None,
+        "mtime": None,
+    }
+    if summary:
+        result.update({"segments": None, "valid": None, "error_count": None})
+    if json_stat is None and journal_stat is None:
+        return result
+
+    result["mtime"] = max(s[0] for s in (json_stat, journal_stat) if s is not None) / 1e9
+    if not summary:
+        return result
+    try:
+        summary = get_annotation_cache().get_summary(
+            Path(dir_path) / json_name, (json_stat, journal_stat)
+        )
+        result.update(summary)
+    except (OSError, ValueError) as e:
+        # 깨진 JSON은 유효하지 않은 어노테이션으로 표시
+        logger.warning("Cannot read annotation %s in %s: %s", json_name, dir_path, e)
+        result.update({"valid": False, "error": str(e)})
+    return result
+
+def collect_annotation_status(paths: Iterable[str], fields: Iterable[str] = DEFAULT_FIELDS) -> List[Dict]:
+    """비디오 경로 목록의 어노테이션 상태를 부모 디렉토리당 한 번의 나열로 조회합니다. (입력 순서 유지)"""
+    summary = wants_summary(fields)
+    by_parent: Dict[str, List[int]] = defaultdict(list)
+    paths = list(paths)
+    for i, path in enumerate(paths):
+        by_parent[os.path.dirname(os.path.abspath(path))].append(i)
+
+    results: List[Optional[Dict]] = [None] * len(paths)
+    for dir_path, indexes in by_parent.items():
+        try:
+            sidecars, _, _ = _list_dir(dir_path)
+        except OSError as e:
+            logger.warning("Cannot list directory %s: %s", dir_path, e)
+            for i in indexes:
+                results[i] = {"path": paths[i], "exists": False, "error": f"Cannot list directory: {str(e)}"}
+            continue
+        for i in indexes:
+            results[i] = _status(paths[i], dir_path, sidecars, summary)
+    return results
+
+def collect_directory_status(directory: Path, recursive: bool = False,
+                             fields: Iterable[str] = DEFAULT_FIELDS) -> List[Dict]:
+    """디렉토리 안의 비디오 파일과 어노테이션 상태를 조회합니다. (디렉토리당 한 번 나열)"""
+    summary = wants_summary(fields)
+    results = []
+    stack = [str(directory)]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            sidecars, videos, subdirs = _list_dir(dir_path)
+        except OSError as e:
+            if dir_path == str(directory):
+                raise
+            logger.warning("Cannot list directory %s: %s", dir_path, e)
+            continue
+        for entry in sorted(videos, key=lambda e: e.name):
+            results.append(_status(entry.path.replace("\\", "/"), dir_path, sidecars, summary))
+        if recursive:
+            stack.extend(sorted(subdirs, reverse=True))
+    return results
@@ -0,0 +1,276 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+
+from config import ANNOTATION_JOURNAL_COMPACT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".journal"
+
+class PreconditionFailed(Exception):
+    """If-Match로 전달한 버전이 현재 문서와 다른 경우"""
+
+    def __init__(self, current_etag: Optional[str]):
+        if current_etag is None:
+            super().__init__("Annotation does not exist")
+        else:
+            super().__init__(f"Annotation has been modified (current version {current_etag})")
+        self.current_etag = current_etag
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+# 저널 경로 -> (마지막 추가 후 파일 크기, 항목 수). 크기가 다르면 다시 셉니다. (path_lock 안에서만 사용)
+_journal_counts: Dict[str, Tuple[int, int]] = {}
+
+def path_lock(json_path: Path) -> threading.Lock:
+    """같은 어노테이션 파일에 대한 동시 쓰기를 직렬화하는 잠금"""
+    key = str(json_path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.Lock()
+        return lock
+
+def journal_path(json_path: Path) -> Path:
+    return json_path.with_name(json_path.name + JOURNAL_SUFFIX)
+
+def _fsync_dir(directory: Path):
+    """rename 결과를 디스크에 반영하기 위해 디렉토리를 fsync합니다. (Windows 제외)"""
+    if os.name != "posix":
+        return
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write_json(json_path: Path, data: Dict):
+    """임시 파일에 쓰고 fsync한 뒤 rename하여 원자적으로 교체합니다.
+
+    저장 도중 중단되어도 기존 파일이나 새 파일 중 하나만 남습니다.
+    """
+    tmp_path = json_path.with_name(f".{json_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, json_path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(json_path.parent)
+
+def read_json(json_path: Path) -> Dict:
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def read_journal(json_path: Path) -> List[Dict]:
+    """저널 항목을 읽습니다. 마지막 줄이 잘린 경우(쓰기 중 중단) 무시합니다."""
+    path = journal_path(json_path)
+    if not path.exists():
+        return []
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            if i < len(lines) - 2:
+                raise
+            logger.warning("Ignoring truncated journal entry in %s", path)
+    return entries
+
+def apply_ops(data: Dict, ops: List[Dict]) -> Dict:
+    """세그먼트 단위 편집을 문서에 적용합니다.
+
+    - {"op": "upsert", "segment": {...}}: segment_id가 같은 세그먼트를 교체하거나 추가
+    - {"op": "delete", "segment_id": ...}: 세그먼트 삭제
+    - {"op": "set", "section": "meta_data" | "annotations" | "additional_info", "field": ..., "value": ...}
+    """
+    segments = data.setdefault("annotations", {}).setdefault("segmentation", [])
+    positions = {seg.get("segment_id"): i for i, seg in enumerate(segments)}
+
+    for op in ops:
+        kind = op.get("op")
+        if kind == "upsert":
+            segment = op["segment"]
+            seg_id = segment.get("segment_id")
+            if seg_id in positions:
+                segments[positions[seg_id]] = segment
+            else:
+                positions[seg_id] = len(segments)
+                segments.append(segment)
+        elif kind == "delete":
+            seg_id = op.get("segment_id")
+            if seg_id in positions:
+                del segments[positions[seg_id]]
+                positions = {seg.get("segment_id"): i for i, seg in enumerate(segments)}
+        elif kind == "set":
+            data.setdefault(op["section"], {})[op["field"]] = op["value"]
+        else:
+            raise ValueError(f"Unknown journal operation: {kind}")
+    return data
+
+def load_annotation(json_path: Path) -> Optional[Dict]:
+    """저장된 JSON에 저널을 재적용한 최신 문서를 반환합니다. 둘 다 없으면 None."""
+    base = read_json(json_path) if json_path.exists() else None
+    ops = read_journal(json_path)
+    if not ops:
+        return base
+    return apply_ops(copy.deepcopy(base) if base is not None else {}, ops)
+
+def document_etag(data: Optional[Dict]) -> str:
+    """문서 내용으로 버전(ETag)을 계산합니다. 저널 압축 전후에도 같은 값입니다."""
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return '"' + hashlib.sha1(raw.encode('utf-8')).hexdigest() + '"'
+
+def check_precondition(json_path: Path, if_match: Optional[str] = None, if_none_match: Optional[str] = None):
+    """If-Match(현재 버전과 같아야 함) / If-None-Match: *(문서가 없어야 함)를 확인합니다. (path_lock 안에서 호출)"""
+    if not if_match and not if_none_match:
+        return
+    exists = json_path.exists() or journal_path(json_path).exists()
+    current = document_etag(load_annotation(json_path)) if exists else None
+    if if_match and (current is None or if_match.strip() not in ("*", current)):
+        raise PreconditionFailed(current)
+    if if_none_match and exists and if_none_match.strip() in ("*", current):
+        raise PreconditionFailed(current)
+
+def save_annotation_document(json_path: Path, data: Dict, if_match: Optional[str] = None,
+                             if_none_match: Optional[str] = None) -> str:
+    """전체 문서를 원자적으로 저장하고 새 ETag를 반환합니다.
+
+    if_match/if_none_match가 있으면 저장 전에 버전을 확인합니다. (불일치 시 PreconditionFailed)
+    이전 저널은 문서에 포함된 것으로 보고 삭제합니다.
+    """
+    with path_lock(json_path):
+        check_precondition(json_path, if_match, if_none_match)
+        atomic_write_json(json_path, data)
+        _remove_journal(json_path)
+    return document_etag(data)
+
+def append_journal(json_path: Path, ops: List[Dict]) -> int:
+    """편집 내용을 저널에 추가(fsync)하고 누적 항목 수를 반환합니다.
+
+    누적 항목이 ANNOTATION_JOURNAL_COMPACT_THRESHOLD를 넘으면 JSON으로 압축합니다.
+    """
+    with path_lock(json_path):
+        return _append_journal_locked(json_path, ops)
+
+def patch_annotation(json_path: Path, ops: List[Dict], if_match: Optional[str] = None,
+                     validate_ops: Optional[Callable[[Dict, List[Dict]], None]] = None) -> Tuple[str, Dict]:
+    """버전을 확인한 뒤 세그먼트 단위 편집을 저널에 기록합니다. (새 ETag, 적용된 문서)
+
+    validate_ops(현재 문서, ops)는 변경된 부분만 검증하고 실패 시 ValueError를 발생시킵니다.
+    """
+    with path_lock(json_path):
+        data = load_annotation(json_path)
+        if data is None:
+            raise FileNotFoundError(f"Annotation not found: {json_path}")
+
+        current = document_etag(data)
+        if if_match and if_match.strip() not in ("*", current):
+            raise PreconditionFailed(current)
+
+        if validate_ops is not None:
+            validate_ops(data, ops)
+        data = apply_ops(data, ops)
+        _append_journal_locked(json_path, ops)
+        return document_etag(data), data
+
+def _last_line_end(f, size: int) -> int:
+    """마지막 줄바꿈 바로 뒤의 위치 (줄바꿈이 없으면 0)"""
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        f.seek(start)
+        pos = f.read(end - start).rfind(b"\n")
+        if pos >= 0:
+            return start + pos + 1
+        end = start
+    return 0
+
+def _count_lines(f) -> int:
+    f.seek(0)
+    return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1024 * 1024), b""))
+
+def _append_journal_locked(json_path: Path, ops: List[Dict]) -> int:
+    """저널에 추가합니다. 중단된 쓰기로 마지막 줄이 잘려 있으면 먼저 잘라내어
+    새 항목이 잘린 줄에 이어 붙지 않게 합니다."""
+    path = journal_path(json_path)
+    key = str(path)
+    payload = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode('utf-8')
+    with open(path, 'a+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        cached = _journal_counts.get(key)
+        count = cached[1] if cached is not None and cached[0] == size else None
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                end = _last_line_end(f, size)
+                logger.warning("Dropping truncated journal entry in %s (%d bytes)", path, size - end)
+                f.truncate(end)
+                count = None
+        if count is None:
+            count = _count_lines(f)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+        count += len(ops)
+        _journal_counts[key] = (f.tell(), count)
+
+    if count >= ANNOTATION_JOURNAL_COMPACT_THRESHOLD:
+        _compact_locked(json_path)
+        return 0
+    return count
+
+def compact_annotation(json_path: Path) -> bool:
+    """저널을 JSON에 반영하고 저널을 삭제합니다. 저널이 없으면 False."""
+    with path_lock(json_path):
+        return _compact_locked(json_path)
+
+def _compact_locked(json_path: Path) -> bool:
+    if not journal_path(json_path).exists():
+        return False
+    data = load_annotation(json_path)
+    atomic_write_json(json_path, data)
+    _remove_journal(json_path)
+    logger.info("Compacted annotation journal into %s", json_path)
+    return True
+
+def _remove_journal(json_path: Path):
+    _journal_counts.pop(str(journal_path(json_path)), None)
+    try:
+        journal_path(json_path).unlink()
+    except FileNotFoundError:
+        pass
+
+def delete_annotation_files(json_path: Path) -> bool:
+    """JSON과 저널을 삭제합니다. (삭제 전 .json.bak 백업) 삭제한 파일이 있으면 True."""
+    with path_lock(json_path):
+        existed = False
+        _journal_counts.pop(str(journal_path(json_path)), None)
+        if json_path.exists() or journal_path(json_path).exists():
+            data = load_annotation(json_path)
+            atomic_write_json(json_path.with_suffix('.json.bak'), data)
+            existed = True
+        for path in (json_path, journal_path(json_path)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        return existed
@@ -1,8 +1,17 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import os
+import logging
 import platform
+import time
 from config import ALLOWED_VIDEO_EXTENSIONS
+from .file_index import VideoFileIndex, get_file_index
+from .annotation_cache import get_annotation_cache
+from .annotation_index import get_annotation_index
+from .io_executor import run_io, run_stream
+from .metrics import FS_SCAN_SECONDS, FS_SCAN_FILES
+
+logger = logging.getLogger(__name__)
 
 def normalize_path(path: Path) -> Path:
     """경로를 정규화하고 OS에 맞게 변환합니다."""
@@ -25,6 +34,11 @@ def check_file_access(path: Path) -> bool:
 
 # file_handler.py의 get_video_files 함수 부분
 async def get_video_files(path: Path) -> List[Dict]:
+    """비디오 파일 목록을 I/O 스레드 풀에서 조회합니다."""
+    return await run_io(_get_video_files_sync, path)
+
+def _get_video_files_sync(path: Path) -> List[Dict]:
+    started = time.perf_counter()
     try:
         normalized_path = normalize_path(path)
         if not check_file_access(normalized_path):
@@ -34,7 +48,7 @@ async def get_video_files(path: Path) -> List[Dict]:
         
         # 경로가 파일인 경우
         if normalized_path.is_file():
-            if await validate_video_file(normalized_path):
+            if _validate_video_file_sync(normalized_path):
                 abs_path = str(normalized_path.absolute())  # 절대 경로 사용
                 video_files.append({
                     "name": normalized_path.name,
@@ -50,7 +64,7 @@ async def get_video_files(path: Path) -> List[Dict]:
         elif normalized_path.is_dir():
             for file_path in normalized_path.rglob("*"):
                 try:
-                    if await validate_video_file(file_path):
+                    if _validate_video_file_sync(file_path):
                         video_files.append({
                             "name": file_path.name,
                             "path": str(file_path).replace("\\", "/"),
@@ -62,15 +76,20 @@ async def get_video_files(path: Path) -> List[Dict]:
                             "accessible": True
                         })
                 except Exception as e:
-                    print(f"Error processing file {file_path}: {str(e)}")
+                    logger.warning("Error processing file %s: %s", file_path, e)
                     continue
         
+        FS_SCAN_SECONDS.observe(time.perf_counter() - started, kind="walk")
+        FS_SCAN_FILES.observe(len(video_files), kind="walk")
         return video_files
     except Exception as e:
         raise ValueError(f"Error processing path: {str(e)}")
 
-async def validate_video_file(path: Path) -> bool:
-    """비디오 파일의 유효성을 검사합니다."""
+async def validate_video_file(path: Path, stream: bool = False) -> bool:
+    """비디오 파일의 유효성을 검사합니다. (stream=True면 스트리밍 전용 풀에서 실행)"""
+    return await (run_stream if stream else run_io)(_validate_video_file_sync, path)
+
+def _validate_video_file_sync(path: Path) -> bool:
     try:
         if not check_file_access(path):
             return False
@@ -102,15 +121,42 @@ async def validate_video_file(path: Path) -> bool:
     except Exception:
         return False
 
+async def get_indexed_video_files(path: Path, refresh: bool = False) -> Tuple[List[Dict], Dict]:
+    """디렉토리는 영구 인덱스에서, 단일 파일은 직접 조회하여 (파일 목록, 인덱스 정보)를 반환합니다."""
+    index = await get_directory_index(path)
+    if index is not None:
+        return await run_io(index.lookup, refresh=refresh)
+
+    files = await get_video_files(path)
+    return files, {"age": None, "changed": 0, "scanned_dirs": 0, "rescanned": False}
+
+async def get_directory_index(path: Path) -> Optional[VideoFileIndex]:
+    """디렉토리 경로이면 해당 인덱스를, 단일 파일이면 None을 반환합니다."""
+    return await run_io(_get_directory_index_sync, path)
+
+def _get_directory_index_sync(path: Path) -> Optional[VideoFileIndex]:
+    normalized_path = normalize_path(path)
+    if not check_file_access(normalized_path):
+        raise ValueError(f"Path is not accessible: {path}")
+    if not normalized_path.is_dir():
+        return None
+    # 데이터셋 루트의 어노테이션 변경을 감시하여 캐시를 무효화하고 질의 인덱스에 등록
+    get_annotation_cache().watch_root(normalized_path)
+    get_annotation_index().add_root(normalized_path)
+    return get_file_index(normalized_path)
+
 async def check_file_status(path: Path) -> Dict:
     """파일의 상태 정보를 반환합니다."""
+    return await run_io(_check_file_status_sync, path)
+
+def _check_file_status_sync(path: Path) -> Dict:
     try:
         normalized_path = normalize_path(path)
         return {
             "exists": normalized_path.exists(),
             "accessible": check_file_access(normalized_path),
             "is_file": normalized_path.is_file() if normalized_path.exists() else False,
-            "is_video": await validate_video_file(normalized_path) if normalized_path.exists() else False,
+            "is_video": _validate_video_file_sync(normalized_path) if normalized_path.exists() else False,
             "drive": normalized_path.drive if platform.system() == 'Windows' else None,
             "error": None
         }
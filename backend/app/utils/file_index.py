@@ -0,0 +1,453 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config import ALLOWED_VIDEO_EXTENSIONS, FILE_INDEX_DIR, FILE_INDEX_MAX_AGE
+from .metrics import FS_SCAN_SECONDS, FS_SCAN_FILES, FS_SCAN_DIRS
+
+logger = logging.getLogger(__name__)
+
+# 스키마가 바뀌면 올려서 기존 인덱스를 재생성합니다.
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    annotated INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS idx_files_name ON files(name, path);
+CREATE INDEX IF NOT EXISTS idx_files_size ON files(size, path);
+CREATE INDEX IF NOT EXISTS idx_files_mtime ON files(mtime_ns, path);
+CREATE INDEX IF NOT EXISTS idx_files_annotated ON files(annotated, path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# 정렬 키 -> 컬럼
+SORT_COLUMNS = {
+    "name": "name",
+    "size": "size",
+    "mtime": "mtime_ns",
+    "annotated": "annotated",
+    "path": "path",
+}
+
+class InvalidQuery(ValueError):
+    """잘못된 정렬/필터/커서 값"""
+    pass
+
+class VideoFileIndex:
+    """루트 디렉토리별 비디오 파일 인덱스 (SQLite)
+
+    디렉토리의 mtime이 바뀐 경우에만 해당 디렉토리를 다시 나열하고,
+    변경되지 않은 디렉토리는 인덱스에 저장된 항목을 그대로 사용합니다.
+    파일 내용만 바뀌고 디렉토리 mtime이 그대로인 경우는 refresh로 갱신되지 않으므로
+    필요하면 인덱스 파일을 삭제하여 전체 재스캔합니다.
+    """
+
+    def __init__(self, root: Path, db_path: Path):
+        self.root = root
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self):
+        conn = self._conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS meta;")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.commit()
+
+    @property
+    def last_scan(self) -> Optional[float]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'last_scan'").fetchone()
+        return float(row[0]) if row else None
+
+    def age(self) -> Optional[float]:
+        """마지막 스캔 이후 경과 시간(초)"""
+        last_scan = self.last_scan
+        return None if last_scan is None else max(time.time() - last_scan, 0.0)
+
+    def is_stale(self) -> bool:
+        age = self.age()
+        return age is None or age > FILE_INDEX_MAX_AGE
+
+    def refresh(self, force: bool = False) -> Dict:
+        """필요한 경우 증분 스캔하고 인덱스 정보를 반환합니다."""
+        with self._lock:
+            age = self.age()
+            stats = {"age": age, "changed": 0, "scanned_dirs": 0, "rescanned": False}
+            if force or self.is_stale():
+                changed, scanned_dirs = self._rescan()
+                stats.update({"changed": changed, "scanned_dirs": scanned_dirs, "rescanned": True})
+            return stats
+
+    def lookup(self, refresh: bool = False) -> Tuple[List[Dict], Dict]:
+        """인덱스에서 전체 파일 목록을 조회합니다. 오래되었거나 refresh가 요청되면 증분 스캔합니다."""
+        stats = self.refresh(force=refresh)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {_ENTRY_COLUMNS} FROM files ORDER BY path").fetchall()
+        FS_SCAN_FILES.observe(len(rows), kind="index")
+        return [self._to_entry(row) for row in rows], stats
+
+    def query(self, filters: Optional[Dict[str, Any]] = None, sort: str = "name", order: str = "asc",
+              limit: int = 200, cursor: Optional[str] = None) -> Dict:
+        """필터/정렬을 적용하여 커서 기반으로 한 페이지를 조회합니다."""
+        if sort not in SORT_COLUMNS:
+            raise InvalidQuery(f"Invalid sort key: {sort}")
+        if order not in ("asc", "desc"):
+            raise InvalidQuery(f"Invalid sort order: {order}")
+        if limit <= 0:
+            raise InvalidQuery("limit must be positive")
+
+        column = SORT_COLUMNS[sort]
+        where, params = _build_filters(filters or {})
+        filter_sql = " AND ".join(where) if where else "1"
+
+        page_where = list(where)
+        page_params = list(params)
+        if cursor:
+            last_value, last_path = _decode_cursor(cursor)
+            op = ">" if order == "asc" else "<"
+            page_where.append(f"({column} {op} ? OR ({column} = ? AND path {op} ?))")
+            page_params.extend([last_value, last_value, last_path])
+        page_sql = " AND ".join(page_where) if page_where else "1"
+
+        direction = "ASC" if order == "asc" else "DESC"
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM files WHERE {filter_sql}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {_ENTRY_COLUMNS}, {column} FROM files WHERE {page_sql} "
+                f"ORDER BY {column} {direction}, path {direction} LIMIT ?",
+                page_params + [limit + 1]
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last[-1], last[0])
+
+        return {
+            "files": [self._to_entry(row[:-1]) for row in rows],
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+
+    def iter_scan(self, force: bool = False, filters: Optional[Dict[str, Any]] = None,
+                  batch_size: int = 500) -> Iterator[Dict]:
+        """디렉토리를 순회하면서 찾은 파일을 즉시 반환합니다. 마지막 항목은 인덱스 정보입니다.
+
+        인덱스가 최신이면 스캔 없이 인덱스의 항목을 반환합니다.
+        잠금은 batch_size개씩 행을 가져오는 동안에만 잡고 yield 전에 놓으므로,
+        느린 클라이언트나 끊긴 연결이 같은 루트의 다른 요청을 막지 않습니다.
+        """
+        filters = normalize_filters(filters or {})
+        with self._lock:
+            stats = {"age": self.age(), "changed": 0, "scanned_dirs": 0, "rescanned": False}
+            fresh = not (force or self.is_stale())
+
+        if fresh:
+            where, params = _build_filters(filters)
+            last_path = ""
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(
+                        f"SELECT {_ENTRY_COLUMNS} FROM files WHERE {' AND '.join(where + ['path > ?'])} "
+                        "ORDER BY path LIMIT ?", params + [last_path, batch_size]
+                    ).fetchall()
+                for row in rows:
+                    yield {"event": "file", "file": self._to_entry(row)}
+                if len(rows) < batch_size:
+                    break
+                last_path = rows[-1][0]
+            yield {"event": "done", "index": stats}
+            return
+
+        match = _compile_filters(filters)
+        totals = {"changed": 0, "scanned_dirs": 0}
+        walker = self._walk(totals)
+        while True:
+            # 순회는 디렉토리 단위로 커밋하므로 배치 사이에 잠금을 놓아도 인덱스는 일관됩니다.
+            with self._lock:
+                rows = [row for row in itertools.islice(walker, batch_size) if match(row)]
+                done = walker.gi_frame is None
+            for row in rows:
+                yield {"event": "file", "file": self._to_entry(row)}
+            if done:
+                break
+        stats.update(totals, rescanned=True)
+        yield {"event": "done", "index": stats}
+
+    def _rescan(self) -> Tuple[int, int]:
+        """변경된 디렉토리만 다시 나열합니다. (변경 항목 수, 나열한 디렉토리 수)를 반환합니다."""
+        totals = {"changed": 0, "scanned_dirs": 0}
+        for _ in self._walk(totals):
+            pass
+        return totals["changed"], totals["scanned_dirs"]
+
+    def _walk(self, totals: Dict[str, int]) -> Iterator[Tuple]:
+        """루트부터 디렉토리를 순회하며 인덱스를 갱신하고 파일 행을 디렉토리 단위로 반환합니다."""
+        conn = self._conn
+        root = str(self.root)
+        started = time.perf_counter()
+        known_dirs = {
+            path: mtime_ns for path, mtime_ns in conn.execute("SELECT path, mtime_ns FROM dirs")
+        }
+        seen_dirs = set()
+        stack = [(root, None)]
+
+        while stack:
+            dir_path, parent = stack.pop()
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError as e:
+                logger.warning("Cannot stat directory %s: %s", dir_path, e)
+                continue
+            seen_dirs.add(dir_path)
+
+            if known_dirs.get(dir_path) == mtime_ns:
+                # 변경 없음: 저장된 항목을 사용하고 하위 디렉토리만 이어서 확인
+                for (child,) in conn.execute("SELECT path FROM dirs WHERE parent = ?", (dir_path,)):
+                    stack.append((child, dir_path))
+                rows = conn.execute(
+                    f"SELECT {_ENTRY_COLUMNS} FROM files WHERE dir = ?", (dir_path,)
+                ).fetchall()
+            else:
+                totals["scanned_dirs"] += 1
+                changed, rows = self._scan_dir(dir_path, stack)
+                totals["changed"] += changed
+                conn.execute(
+                    "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                    (dir_path, parent, mtime_ns)
+                )
+                conn.commit()
+
+            for row in rows:
+                yield row
+
+        # 사라진 디렉토리 정리
+        for dir_path in set(known_dirs) - seen_dirs:
+            totals["changed"] += conn.execute("DELETE FROM files WHERE dir = ?", (dir_path,)).rowcount
+            conn.execute("DELETE FROM dirs WHERE path = ?", (dir_path,))
+
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_scan', ?)", (str(time.time()),)
+        )
+        conn.commit()
+        FS_SCAN_SECONDS.observe(time.perf_counter() - started, kind="index_rescan")
+        FS_SCAN_DIRS.inc(totals["scanned_dirs"])
+        logger.info(
+            f"Index rescan of {root}: {totals['scanned_dirs']} dirs listed, "
+            f"{totals['changed']} entries changed"
+        )
+
+    def _scan_dir(self, dir_path: str, stack: List) -> Tuple[int, List[Tuple]]:
+        """디렉토리 하나를 나열하여 파일 항목을 갱신하고 하위 디렉토리를 stack에 추가합니다."""
+        conn = self._conn
+        old = {
+            path: (size, mtime_ns, annotated)
+            for path, size, mtime_ns, annotated in conn.execute(
+                "SELECT path, size, mtime_ns, annotated FROM files WHERE dir = ?", (dir_path,)
+            )
+        }
+        videos = {}
+        json_stems = set()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, dir_path))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        stem, ext = os.path.splitext(entry.name)
+                        ext = ext.lower()
+                        if ext == '.json':
+                            json_stems.add(stem)
+                            continue
+                        if ext not in ALLOWED_VIDEO_EXTENSIONS:
+                            continue
+                        st = entry.stat()
+                        if st.st_size == 0:
+                            continue
+                        videos[entry.path] = (entry.name, stem, st.st_size, st.st_mtime_ns)
+                    except OSError as e:
+                        logger.warning("Error processing file %s: %s", entry.path, e)
+        except OSError as e:
+            logger.warning("Cannot list directory %s: %s", dir_path, e)
+            return 0, []
+
+        changed = 0
+        rows = []
+        for path in set(old) - set(videos):
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            changed += 1
+        for path, (name, stem, size, mtime_ns) in videos.items():
+            annotated = int(stem in json_stems)
+            rows.append((path, name, size, mtime_ns, annotated))
+            if old.get(path) == (size, mtime_ns, annotated):
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, dir, name, size, mtime_ns, annotated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, dir_path, name, size, mtime_ns, annotated)
+            )
+            changed += 1
+        return changed, rows
+
+    def _to_entry(self, row: Tuple) -> Dict:
+        """/load-path 응답 형식의 파일 항목"""
+        path, name, size, mtime_ns, annotated = row
+        norm_path = path.replace("\\", "/")
+        return {
+            "name": name,
+            "path": norm_path,
+            "size": size,
+            "mtime": mtime_ns / 1e9,
+            "annotated": bool(annotated),
+            "type": "local",
+            "originalPath": norm_path,
+            "drive": self.root.drive,
+            "accessible": True
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_ENTRY_COLUMNS = "path, name, size, mtime_ns, annotated"
+
+# 필터 -> (형식, 허용 범위) (SQLite 정수 범위를 넘지 않도록 제한)
+_FILTER_TYPES = {
+    "min_size": (int, 2 ** 62),
+    "max_size": (int, 2 ** 62),
+    "modified_after": (float, 1e11),
+    "modified_before": (float, 1e11),
+}
+
+def normalize_filters(filters: Any) -> Dict[str, Any]:
+    """필터 값의 형식을 확인하고 변환합니다. (잘못된 값은 InvalidQuery)"""
+    if not isinstance(filters, dict):
+        raise InvalidQuery("filters must be an object")
+    result = dict(filters)
+    for key, (convert, bound) in _FILTER_TYPES.items():
+        value = result.get(key)
+        if value is None:
+            continue
+        try:
+            if isinstance(value, bool):
+                raise ValueError(value)
+            converted = convert(value)
+        except (TypeError, ValueError, OverflowError):
+            raise InvalidQuery(f"Invalid value for filter {key}: {value!r}")
+        if not -bound <= converted <= bound:
+            raise InvalidQuery(f"Value out of range for filter {key}: {value!r}")
+        result[key] = converted
+    return result
+
+def _build_filters(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """필터 조건을 SQL WHERE 절로 변환합니다."""
+    filters = normalize_filters(filters)
+    where, params = [], []
+    name = filters.get("name")
+    if name:
+        escaped = str(name).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if filters.get("annotated") is not None:
+        where.append("annotated = ?")
+        params.append(int(bool(filters["annotated"])))
+    if filters.get("min_size") is not None:
+        where.append("size >= ?")
+        params.append(int(filters["min_size"]))
+    if filters.get("max_size") is not None:
+        where.append("size <= ?")
+        params.append(int(filters["max_size"]))
+    if filters.get("modified_after") is not None:
+        where.append("mtime_ns >= ?")
+        params.append(int(float(filters["modified_after"]) * 1e9))
+    if filters.get("modified_before") is not None:
+        where.append("mtime_ns <= ?")
+        params.append(int(float(filters["modified_before"]) * 1e9))
+    return where, params
+
+def _compile_filters(filters: Dict[str, Any]):
+    """스트리밍 스캔에서 사용할 필터 함수 (_build_filters와 같은 조건)"""
+    name = str(filters["name"]).lower() if filters.get("name") else None
+    annotated = filters.get("annotated")
+    min_size = filters.get("min_size")
+    max_size = filters.get("max_size")
+    after = filters.get("modified_after")
+    before = filters.get("modified_before")
+
+    def match(row: Tuple) -> bool:
+        _, row_name, size, mtime_ns, row_annotated = row
+        if name and name not in row_name.lower():
+            return False
+        if annotated is not None and bool(row_annotated) != bool(annotated):
+            return False
+        if min_size is not None and size < int(min_size):
+            return False
+        if max_size is not None and size > int(max_size):
+            return False
+        if after is not None and mtime_ns < float(after) * 1e9:
+            return False
+        if before is not None and mtime_ns > float(before) * 1e9:
+            return False
+        return True
+
+    return match
+
+def _encode_cursor(value: Any, path: str) -> str:
+    raw = json.dumps([value, path], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def _decode_cursor(cursor: str) -> Tuple[Any, str]:
+    try:
+        value, path = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return value, path
+    except Exception:
+        raise InvalidQuery(f"Invalid cursor: {cursor}")
+
+_indexes: Dict[str, VideoFileIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_file_index(root: Path) -> VideoFileIndex:
+    """루트 경로에 해당하는 인덱스를 반환합니다. (프로세스 내에서 재사용)"""
+    key = str(root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+            index = VideoFileIndex(root, FILE_INDEX_DIR / f"{digest}.sqlite")
+            _indexes[key] = index
+        return index
@@ -0,0 +1,230 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import threading
+
+import cv2
+
+from config import (
+    FRAME_CAPTURE_CACHE_SIZE, FRAME_CACHE_MAX_BYTES, FRAME_BACKWARD_WINDOW,
+    FRAME_FORWARD_SKIP_LIMIT, FRAME_SEEK_PREROLL, FRAME_JPEG_QUALITY
+)
+from .video_probe import VideoProbeError
+
+logger = logging.getLogger(__name__)
+
+class FrameOutOfRange(ValueError):
+    """요청한 프레임 번호가 비디오 범위를 벗어난 경우"""
+    pass
+
+class _CaptureHandle:
+    """열린 VideoCapture와 다음에 읽을 프레임 위치"""
+
+    def __init__(self, path: str):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise VideoProbeError(f"Cannot open video: {path}")
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self.next_frame = 0
+        self.released = False
+        self.lock = threading.Lock()
+
+    def release(self):
+        self.released = True
+        self.cap.release()
+
+class FrameDecoder:
+    """프레임 단위 정확한 디코딩과 LRU 캐시
+
+    - 비디오별 VideoCapture 핸들을 LRU로 유지하여 순차 이동 시 재탐색 없이 앞으로 디코딩합니다.
+    - 뒤로 이동하거나 멀리 이동하면 FRAME_BACKWARD_WINDOW 만큼 앞에서부터 디코딩하고,
+      그 구간의 프레임을 JPEG로 캐시하여 이어지는 뒤로 이동 요청을 캐시에서 처리합니다.
+    - 프레임 번호 탐색(CAP_PROP_POS_FRAMES)은 컨테이너에 따라 부정확하므로 FRAME_SEEK_PREROLL 만큼
+      앞의 지점으로 탐색한 뒤 POS_FRAMES/POS_MSEC로 위치를 확인하고, 맞지 않으면 처음부터 디코딩합니다.
+    - 캐시된 프레임의 총 바이트 수는 FRAME_CACHE_MAX_BYTES로 제한됩니다.
+    """
+
+    def __init__(self, max_handles: int, max_bytes: int):
+        self.max_handles = max_handles
+        self.max_bytes = max_bytes
+        self._handles: "OrderedDict[Tuple, _CaptureHandle]" = OrderedDict()
+        self._frames: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._frame_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "frame_hits": 0,
+            "frame_misses": 0,
+            "handle_hits": 0,
+            "handle_misses": 0,
+            "seeks": 0,
+            "seek_fallbacks": 0,
+            "decoded_frames": 0,
+        }
+
+    def get_frame_jpeg(self, path: Path, n: int) -> Tuple[bytes, bool]:
+        """n번째 프레임을 JPEG로 반환합니다. (jpeg, 캐시 적중 여부)"""
+        if n < 0:
+            raise FrameOutOfRange(f"Frame index must be non-negative: {n}")
+
+        st = os.stat(path)
+        video_key = (str(path), st.st_size, st.st_mtime_ns)
+        frame_key = video_key + (n,)
+
+        with self._lock:
+            cached = self._frames.get(frame_key)
+            if cached is not None:
+                self._frames.move_to_end(frame_key)
+                self.stats["frame_hits"] += 1
+                return cached, True
+            self.stats["frame_misses"] += 1
+
+        while True:
+            handle = self._get_handle(video_key)
+            with handle.lock:
+                # 잠금을 기다리는 동안 LRU에서 밀려나 해제된 핸들이면 다시 연다
+                if handle.released:
+                    continue
+                if handle.frame_count and n >= handle.frame_count:
+                    raise FrameOutOfRange(f"Frame {n} out of range (total {handle.frame_count})")
+                return self._decode(handle, video_key, n), False
+
+    def _get_handle(self, video_key: Tuple) -> _CaptureHandle:
+        with self._lock:
+            handle = self._handles.get(video_key)
+            if handle is not None:
+                self._handles.move_to_end(video_key)
+                self.stats["handle_hits"] += 1
+                return handle
+            self.stats["handle_misses"] += 1
+
+        handle = _CaptureHandle(video_key[0])
+        evicted = []
+        with self._lock:
+            existing = self._handles.get(video_key)
+            if existing is not None:
+                handle.release()
+                return existing
+            self._handles[video_key] = handle
+            while len(self._handles) > self.max_handles:
+                evicted.append(self._handles.popitem(last=False)[1])
+
+        # 사용 중인 핸들은 사용이 끝난 뒤 해제
+        for old in evicted:
+            with old.lock:
+                old.release()
+        return handle
+
+    def _decode(self, handle: _CaptureHandle, video_key: Tuple, n: int) -> bytes:
+        """핸들 잠금 상태에서 n번째 프레임까지 디코딩합니다."""
+        cap = handle.cap
+        window_start = n + 1  # 캐시할 창(window)의 시작 (창이 없으면 n 이후)
+
+        if n < handle.next_frame or n - handle.next_frame > FRAME_FORWARD_SKIP_LIMIT:
+            # 뒤로 이동 또는 먼 이동: 창의 시작점보다 앞으로 탐색
+            window_start = max(0, n - FRAME_BACKWARD_WINDOW)
+            self._seek(handle, window_start)
+
+        # 창 밖의 건너뛰는 프레임은 grab만 수행
+        while handle.next_frame < n:
+            if handle.next_frame >= window_start:
+                ok, frame = cap.read()
+                if ok:
+                    self._store(video_key + (handle.next_frame,), self._encode(frame))
+            else:
+                ok = cap.grab()
+            if not ok:
+                raise FrameOutOfRange(f"Frame {n} out of range (ended at {handle.next_frame})")
+            handle.next_frame += 1
+
+        ok, frame = cap.read()
+        if not ok:
+            raise FrameOutOfRange(f"Frame {n} out of range")
+        handle.next_frame = n + 1
+
+        jpeg = self._encode(frame)
+        self._store(video_key + (n,), jpeg)
+        return jpeg
+
+    def _seek(self, handle: _CaptureHandle, target: int):
+        """target 이전의 지점으로 이동합니다. (핸들 잠금 상태, 이후 target까지 앞으로 디코딩)
+
+        FRAME_SEEK_PREROLL 만큼 앞으로 탐색하여 디코더가 그 이전 키프레임부터 복원하게 한 뒤,
+        첫 프레임의 POS_FRAMES/POS_MSEC가 요청한 위치와 일치하는지 확인합니다.
+        일치하지 않으면(인덱스가 없거나 가변 프레임레이트 등) 처음으로 돌아가 순서대로 디코딩합니다.
+        """
+        cap = handle.cap
+        seek_to = max(0, target - max(1, FRAME_SEEK_PREROLL))
+        self._count("seeks")
+        if seek_to > 0:
+            if cap.set(cv2.CAP_PROP_POS_FRAMES, seek_to) and cap.grab() and self._at_frame(handle, seek_to):
+                handle.next_frame = seek_to + 1
+                return
+            logger.debug("Inaccurate seek to frame %d; decoding from start", seek_to)
+            self._count("seek_fallbacks")
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        handle.next_frame = 0
+
+    def _at_frame(self, handle: _CaptureHandle, index: int) -> bool:
+        """방금 grab한 프레임이 index번째 프레임인지 확인합니다."""
+        cap = handle.cap
+        if int(round(cap.get(cv2.CAP_PROP_POS_FRAMES))) != index + 1:
+            return False
+        if handle.fps > 0:
+            # 프레임 번호는 맞지만 타임스탬프가 반 프레임 이상 어긋나면 부정확한 탐색으로 간주
+            expected_msec = index * 1000.0 / handle.fps
+            if abs(cap.get(cv2.CAP_PROP_POS_MSEC) - expected_msec) > 500.0 / handle.fps:
+                return False
+        return True
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _encode(self, frame) -> bytes:
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, FRAME_JPEG_QUALITY])
+        if not ok:
+            raise VideoProbeError("Failed to encode frame")
+        return buf.tobytes()
+
+    def _store(self, frame_key: Tuple, jpeg: bytes):
+        with self._lock:
+            old = self._frames.pop(frame_key, None)
+            if old is not None:
+                self._frame_bytes -= len(old)
+            self._frames[frame_key] = jpeg
+            self._frame_bytes += len(jpeg)
+            self.stats["decoded_frames"] += 1
+            while self._frame_bytes > self.max_bytes and self._frames:
+                _, evicted = self._frames.popitem(last=False)
+                self._frame_bytes -= len(evicted)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["frame_hits"] + self.stats["frame_misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["frame_hits"] / lookups if lookups else 0.0,
+                "open_handles": len(self._handles),
+                "cached_frames": len(self._frames),
+                "cached_bytes": self._frame_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            for handle in self._handles.values():
+                handle.release()
+            self._handles.clear()
+            self._frames.clear()
+            self._frame_bytes = 0
+
+_decoder: Optional[FrameDecoder] = None
+
+def get_frame_decoder() -> FrameDecoder:
+    global _decoder
+    if _decoder is None:
+        _decoder = FrameDecoder(FRAME_CAPTURE_CACHE_SIZE, FRAME_CACHE_MAX_BYTES)
+    return _decoder
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Iterator, TypeVar
+import asyncio
+import threading
+
+from config import IO_THREAD_POOL_SIZE, STREAM_THREAD_POOL_SIZE, FRAME_DECODE_WORKERS
+
+T = TypeVar("T")
+
+# 풀 이름 -> (스레드 수, 스레드 이름 접두사)
+# - io: 디렉토리 순회, 인덱스 잠금 대기, JSON 읽기/쓰기
+# - stream: /video Range 읽기 (긴 순회나 잠금 대기가 재생을 막지 않도록 분리)
+# - decode: 프레임 디코딩/JPEG 인코딩 (CPU 사용)
+POOLS = {
+    "io": (IO_THREAD_POOL_SIZE, "fs-io"),
+    "stream": (STREAM_THREAD_POOL_SIZE, "stream-io"),
+    "decode": (FRAME_DECODE_WORKERS, "frame-decode"),
+}
+THREAD_PREFIXES = tuple(prefix for _, prefix in POOLS.values())
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """이름별 스레드 풀을 반환합니다. (처음 사용할 때 생성)"""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            workers, prefix = POOLS[name]
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=prefix)
+        return executor
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """파일시스템/JSON I/O 전용 스레드 풀을 반환합니다. (크기는 IO_THREAD_POOL_SIZE)"""
+    return get_executor("io")
+
+def get_stream_executor() -> ThreadPoolExecutor:
+    """비디오 스트리밍 전용 스레드 풀을 반환합니다. (크기는 STREAM_THREAD_POOL_SIZE)"""
+    return get_executor("stream")
+
+async def _run_in(name: str, func: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(name), partial(func, *args, **kwargs))
+
+async def run_io(func: Callable[..., T], *args, **kwargs) -> T:
+    """블로킹 I/O 함수를 이벤트 루프 밖의 스레드 풀에서 실행합니다."""
+    return await _run_in("io", func, *args, **kwargs)
+
+async def run_stream(func: Callable[..., T], *args, **kwargs) -> T:
+    """비디오 스트리밍 요청의 블로킹 호출을 스트리밍 전용 풀에서 실행합니다."""
+    return await _run_in("stream", func, *args, **kwargs)
+
+async def run_decode(func: Callable[..., T], *args, **kwargs) -> T:
+    """프레임 디코딩/인코딩을 디코딩 전용 풀에서 실행합니다."""
+    return await _run_in("decode", func, *args, **kwargs)
+
+async def iterate_io(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """블로킹 이터레이터를 스레드 풀에서 한 항목씩 진행시킵니다."""
+    sentinel = object()
+    while True:
+        item = await run_io(next, iterator, sentinel)
+        if item is sentinel:
+            break
+        yield item
+
+def shutdown_io_executor():
+    """서버 종료 시 스레드 풀을 정리합니다."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False)
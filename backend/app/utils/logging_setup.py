@@ -0,0 +1,102 @@
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Optional
+import copy
+import datetime
+import json
+import logging
+import queue
+
+from config import LOG_DIR, LOG_LEVEL, LOG_LEVELS, LOG_FILE_NAME, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord 기본 속성 (extra로 전달된 필드만 JSON에 추가하기 위해 제외)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_exception_formatter = logging.Formatter()
+
+class _QueueHandler(QueueHandler):
+    """메시지만 포매팅하여 큐에 넣습니다. (예외는 exc_text로 따로 보관하여 JSON의 exc 필드로 기록)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 기록합니다. (extra로 전달한 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def configure_logging(log_dir: Optional[Path] = LOG_DIR, level: str = LOG_LEVEL,
+                      levels: Optional[Dict[str, str]] = None, console: bool = True) -> QueueListener:
+    """루트 로거를 QueueHandler로 연결하고 백그라운드 스레드에서 콘솔/파일에 기록합니다.
+
+    요청 처리 스레드는 레코드를 큐에 넣기만 하고, 파일 쓰기와 JSON 직렬화는 리스너 스레드가 담당합니다.
+    파일은 log_dir에 JSON Lines로 기록되며 LOG_FILE_MAX_BYTES마다 로테이션됩니다.
+    levels는 모듈별 레벨입니다. (예: {"app.routers.annotations": "DEBUG"})
+    """
+    global _listener
+    stop_logging()
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(stream)
+    if log_dir is not None:
+        try:
+            Path(log_dir).mkdir(parents=True, exist_ok=True)
+            file_handler = RotatingFileHandler(
+                Path(log_dir) / LOG_FILE_NAME, maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT, encoding="utf-8", delay=True
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        except OSError as e:
+            logging.getLogger(__name__).warning("Cannot open log directory %s: %s", log_dir, e)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    for name, module_level in (LOG_LEVELS if levels is None else levels).items():
+        logging.getLogger(name).setLevel(module_level.upper())
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """큐에 남은 레코드를 모두 기록하고 리스너 스레드를 종료합니다."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
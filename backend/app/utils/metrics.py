@@ -0,0 +1,248 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# Prometheus 기본 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    """레이블별 값을 가진 메트릭의 공통 부분"""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}" for k, v in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 -> [버킷별 개수..., +Inf 개수, 합계]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def time(self, **labels) -> "_Timer":
+        """with 블록의 실행 시간을 기록합니다."""
+        return _Timer(self, labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+class Registry:
+    """메트릭 목록과 조회 시점에 값을 읽어오는 수집 함수"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, float]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, float]]]]):
+        """collector()는 (이름, 종류, 설명, {레이블 문자열: 값})을 반환합니다. (/metrics 조회 시 호출)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                continue
+            for name, kind, help_text, values in samples:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{labels} {_format_value(value)}" for labels, value in values.items())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("route", "method", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("route", "method")))
+HTTP_BYTES = REGISTRY.register(Counter(
+    "http_response_bytes_total", "Response body bytes sent by route template", ("route",)))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "Requests currently being served"))
+FS_SCAN_SECONDS = REGISTRY.register(Histogram(
+    "fs_scan_duration_seconds", "Video file scan duration", ("kind",), (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)))
+FS_SCAN_FILES = REGISTRY.register(Histogram(
+    "fs_scan_files", "Video files returned per scan", ("kind",), (10, 100, 500, 1000, 5000, 10000, 50000, 100000)))
+FS_SCAN_DIRS = REGISTRY.register(Counter(
+    "fs_scan_listed_dirs_total", "Directories listed by index rescans"))
+VALIDATION_SECONDS = REGISTRY.register(Histogram(
+    "annotation_validation_duration_seconds", "validate_data_structure duration",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)))
+ANNOTATION_SAVE_BYTES = REGISTRY.register(Histogram(
+    "annotation_save_bytes", "Size of uploaded annotation documents", buckets=SIZE_BUCKETS))
+
+def stats_collector(name: str, help_text: str, get_stats: Callable[[], Dict],
+                    fields: Sequence[str]) -> Callable:
+    """get_stats() 딕셔너리의 숫자 필드를 name{field="..."} 게이지로 노출하는 수집 함수"""
+    def collect():
+        stats = get_stats()
+        values = {f'{{field="{field}"}}': stats[field] for field in fields if field in stats}
+        return [(name, "gauge", help_text, values)]
+    return collect
+
+class MetricsMiddleware:
+    """요청 수, 경로 템플릿별 지연 시간, 응답 바이트, 처리 중 요청 수를 기록하는 ASGI 미들웨어
+
+    응답 본문을 감싸지 않고 send 메시지만 세므로 스트리밍/Range 응답에도 부담이 작습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Optional[Dict] = None
+        self._mounts: List[str] = []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = self._route_template(scope)
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(time.perf_counter() - start, route=route, method=method)
+            HTTP_REQUESTS.inc(route=route, method=method, status=str(state["status"]))
+            if state["bytes"]:
+                HTTP_BYTES.inc(state["bytes"], route=route)
+
+    def _route_template(self, scope) -> str:
+        """라우팅 후 scope의 endpoint로 경로 템플릿(/api/annotations/{video_path:path})을 찾습니다.
+
+        실제 경로를 레이블로 쓰지 않아 레이블 수가 라우트 수로 제한됩니다.
+        """
+        app = scope.get("app")
+        if self._templates is None and app is not None:
+            self._templates = {}
+            for route in getattr(app, "routes", []):
+                endpoint = getattr(route, "endpoint", None)
+                if endpoint is not None:
+                    self._templates.setdefault(endpoint, route.path)
+                elif hasattr(route, "path"):
+                    self._mounts.append(route.path)
+        endpoint = scope.get("endpoint")
+        if endpoint is not None and self._templates and endpoint in self._templates:
+            return self._templates[endpoint]
+        path = scope.get("path", "")
+        for mount in self._mounts:
+            if path.startswith(mount + "/"):
+                return mount
+        return "unmatched"
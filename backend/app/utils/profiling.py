@@ -0,0 +1,186 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from config import (
+    PROFILE_DIR, PROFILE_MODE, PROFILE_SAMPLE_RATE, PROFILE_PATHS,
+    PROFILE_INTERVAL, PROFILE_MAX_FILES
+)
+from .io_executor import run_io, THREAD_PREFIXES
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_SUFFIXES = (".folded", ".prof")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """요청 처리 중 이벤트 루프 스레드와 I/O/스트리밍/디코딩 스레드의 스택을 주기적으로 샘플링합니다.
+
+    결과는 flamegraph.pl/speedscope에서 읽을 수 있는 collapsed stack 형식
+    ("스레드;프레임;프레임 횟수")입니다. 동시에 처리 중인 다른 요청의 I/O 작업도 함께 샘플링됩니다.
+    """
+
+    def __init__(self, loop_thread_id: int, interval: float):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._names: Dict[int, str] = {}
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _thread_name(self, ident: int) -> Optional[str]:
+        name = self._names.get(ident)
+        if name is None:
+            self._names = {t.ident: t.name for t in threading.enumerate()}
+            name = self._names.get(ident, "")
+        if ident == self.loop_thread_id:
+            return "event-loop"
+        return name if name.startswith(THREAD_PREFIXES) else None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                name = self._thread_name(ident)
+                if name is None:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(name)
+                key = ";".join(reversed(labels))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+class ProfilingMiddleware:
+    """선택한 경로의 요청을 프로파일링하여 PROFILE_DIR에 요청별 파일로 저장하는 ASGI 미들웨어
+
+    X-Profile 헤더가 있거나 PROFILE_SAMPLE_RATE 확률에 해당하는 요청만 프로파일링하며,
+    한 번에 하나의 요청만 프로파일링합니다. 응답에는 X-Profile-Id 헤더가 추가됩니다.
+    - sample 모드: 이벤트 루프와 I/O 스레드 스택 샘플링 (.folded)
+    - cprofile 모드: 이벤트 루프 스레드의 cProfile 결과 (.prof, snakeviz/pstats)
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = threading.Lock()
+
+    def _should_profile(self, scope) -> bool:
+        path = scope.get("path", "")
+        if not any(path.startswith(prefix) for prefix in PROFILE_PATHS):
+            return False
+        if any(name == PROFILE_HEADER for name, _ in scope.get("headers", [])):
+            return True
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode("ascii"))
+                ]}
+            await send(message)
+
+        sampler = profiler = None
+        started = time.perf_counter()
+        try:
+            if PROFILE_MODE == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL)
+                sampler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                if sampler is not None:
+                    await run_io(sampler.stop)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            name = f"{profile_id}_{scope.get('method', '')}_{_slug(scope.get('path', ''))}_{elapsed_ms:.0f}ms"
+            await run_io(_write_profile, name, sampler, profiler)
+        finally:
+            self._busy.release()
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+
+def _write_profile(name: str, sampler: Optional[StackSampler], profiler: Optional[cProfile.Profile]):
+    """프로파일을 저장하고 PROFILE_MAX_FILES를 넘는 오래된 파일을 삭제합니다."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    if profiler is not None:
+        profiler.dump_stats(str(PROFILE_DIR / f"{name}.prof"))
+    else:
+        (PROFILE_DIR / f"{name}.folded").write_text(sampler.folded(), encoding="utf-8")
+
+    files = sorted(
+        (p for p in PROFILE_DIR.iterdir() if p.suffix in PROFILE_SUFFIXES),
+        key=lambda p: p.name, reverse=True
+    )
+    for old in files[PROFILE_MAX_FILES:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+def list_profiles() -> List[Dict]:
+    """저장된 프로파일 목록 (최신순)"""
+    if not PROFILE_DIR.exists():
+        return []
+    profiles = []
+    for path in sorted(PROFILE_DIR.iterdir(), key=lambda p: p.name, reverse=True):
+        if path.suffix not in PROFILE_SUFFIXES:
+            continue
+        profile_id, _, rest = path.stem.partition("_")
+        method, _, rest = rest.partition("_")
+        route, _, elapsed = rest.rpartition("_")
+        st = path.stat()
+        profiles.append({
+            "name": path.name,
+            "id": profile_id,
+            "method": method,
+            "route": route,
+            "elapsed_ms": int(elapsed[:-2]) if elapsed.endswith("ms") and elapsed[:-2].isdigit() else None,
+            "format": "folded" if path.suffix == ".folded" else "pstats",
+            "size": st.st_size,
+            "created": st.st_mtime,
+        })
+    return profiles
+
+def find_profile(name: str) -> Optional[Path]:
+    """목록에 있는 프로파일 파일 (경로 이동 방지)"""
+    if not name or os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIXES):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
@@ -0,0 +1,214 @@
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+from email.utils import formatdate, parsedate_to_datetime
+import mimetypes
+import os
+import re
+import secrets
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from .io_executor import get_stream_executor
+
+# 스트리밍 청크 크기 (1MB)
+CHUNK_SIZE = 1024 * 1024
+
+# 확장자별 MIME 타입 (mimetypes 모듈에 없는 경우 대비)
+VIDEO_MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.avi': 'video/x-msvideo',
+    '.mov': 'video/quicktime',
+    '.mkv': 'video/x-matroska',
+}
+
+_BYTE_POS = re.compile(r'[0-9]+')
+
+class RangeNotSatisfiable(Exception):
+    """요청한 바이트 범위를 처리할 수 없는 경우 (416)"""
+    pass
+
+class InvalidRange(Exception):
+    """Range 헤더의 문법이 잘못되었거나 단위를 지원하지 않는 경우 (헤더를 무시하고 전체 전송)"""
+    pass
+
+def guess_media_type(path: Path) -> str:
+    """확장자로부터 MIME 타입을 결정합니다."""
+    ext = path.suffix.lower()
+    if ext in VIDEO_MIME_TYPES:
+        return VIDEO_MIME_TYPES[ext]
+    media_type, _ = mimetypes.guess_type(str(path))
+    return media_type or 'application/octet-stream'
+
+def make_etag(stat: os.stat_result) -> str:
+    """파일 크기와 수정 시각으로 약하지 않은(strong) ETag를 생성합니다."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def parse_range_header(header: str, file_size: int) -> List[Tuple[int, int]]:
+    """Range 헤더를 (start, end) 목록으로 변환합니다. end는 포함(inclusive)입니다.
+
+    문법 오류나 지원하지 않는 단위는 InvalidRange (RFC 9110: 헤더를 무시하고 200),
+    문법은 맞지만 파일 범위 안의 구간이 하나도 없으면 RangeNotSatisfiable (416)을 냅니다.
+    """
+    unit, _, ranges_spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not ranges_spec.strip():
+        raise InvalidRange(f"Unsupported range unit: {header}")
+
+    parsed = []
+    for spec in ranges_spec.split(','):
+        spec = spec.strip()
+        if not spec:
+            continue
+        start_str, sep, end_str = spec.partition('-')
+        valid = sep and (start_str or end_str) and all(
+            pos == '' or _BYTE_POS.fullmatch(pos) for pos in (start_str, end_str)
+        )
+        if not valid or (start_str and end_str and int(end_str) < int(start_str)):
+            raise InvalidRange(f"Malformed range: {spec}")
+        parsed.append((start_str, end_str))
+    if not parsed:
+        raise InvalidRange(f"Malformed range: {header}")
+
+    ranges = []
+    for start_str, end_str in parsed:
+        if start_str == '':
+            # suffix range: 마지막 N 바이트
+            length = int(end_str)
+            if length <= 0:
+                continue
+            start = max(file_size - length, 0)
+            end = file_size - 1
+        else:
+            start = int(start_str)
+            end = min(int(end_str), file_size - 1) if end_str else file_size - 1
+
+        if start > end or start >= file_size:
+            continue
+        ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable(f"No satisfiable range in: {header}")
+
+    return _merge_ranges(ranges)
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """겹치거나 인접한 범위를 병합합니다."""
+    ranges = sorted(ranges)
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _if_range_matches(if_range: Optional[str], etag: str, mtime: float) -> bool:
+    """If-Range 조건이 현재 파일과 일치하는지 확인합니다."""
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    # 날짜는 Last-Modified와 정확히 같을 때만 일치 (RFC 9110 13.1.5)
+    try:
+        return int(parsedate_to_datetime(if_range).timestamp()) == int(mtime)
+    except (TypeError, ValueError):
+        return False
+
+async def _read_range(path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+    """파일의 [start, end] 구간을 고정 크기 청크로 읽습니다."""
+    async with aiofiles.open(path, 'rb', executor=get_stream_executor()) as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+async def _read_multipart(path: Path, ranges: List[Tuple[int, int]], boundary: str,
+                          media_type: str, file_size: int) -> AsyncIterator[bytes]:
+    """multipart/byteranges 본문을 생성합니다."""
+    for start, end in ranges:
+        yield _part_header(boundary, media_type, start, end, file_size)
+        async for chunk in _read_range(path, start, end):
+            yield chunk
+        yield b'\r\n'
+    yield f'--{boundary}--\r\n'.encode('latin-1')
+
+def _part_header(boundary: str, media_type: str, start: int, end: int, file_size: int) -> bytes:
+    return (
+        f'--{boundary}\r\n'
+        f'Content-Type: {media_type}\r\n'
+        f'Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n'
+    ).encode('latin-1')
+
+def build_range_response(request: Request, path: Path) -> Response:
+    """Range/If-Range 요청을 처리하는 비디오 스트리밍 응답을 생성합니다."""
+    stat = path.stat()
+    file_size = stat.st_size
+    media_type = guess_media_type(path)
+    etag = make_etag(stat)
+
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+        'Cache-Control': 'no-cache',
+    }
+
+    # 조건부 요청: 변경되지 않았으면 304
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get('range')
+    ranges = None
+    if range_header and _if_range_matches(request.headers.get('if-range'), etag, stat.st_mtime):
+        try:
+            ranges = parse_range_header(range_header, file_size)
+        except InvalidRange:
+            # 잘못된 Range 헤더는 무시하고 전체 전송
+            ranges = None
+        except RangeNotSatisfiable:
+            headers['Content-Range'] = f'bytes */{file_size}'
+            return Response(status_code=416, headers=headers)
+
+    if ranges is None:
+        # 전체 파일 전송
+        headers['Content-Length'] = str(file_size)
+        return StreamingResponse(
+            _read_range(path, 0, file_size - 1),
+            status_code=200,
+            media_type=media_type,
+            headers=headers
+        )
+
+    # 단일 구간
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+        headers['Content-Length'] = str(end - start + 1)
+        return StreamingResponse(
+            _read_range(path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=headers
+        )
+
+    # 다중 구간 (multipart/byteranges)
+    boundary = secrets.token_hex(16)
+    content_length = sum(
+        len(_part_header(boundary, media_type, start, end, file_size)) + (end - start + 1) + 2
+        for start, end in ranges
+    ) + len(f'--{boundary}--\r\n')
+    headers['Content-Length'] = str(content_length)
+    return StreamingResponse(
+        _read_multipart(path, ranges, boundary, media_type, file_size),
+        status_code=206,
+        media_type=f'multipart/byteranges; boundary={boundary}',
+        headers=headers
+    )
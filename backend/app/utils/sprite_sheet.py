@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from config import (
+    SPRITE_CACHE_DIR, SPRITE_NEXT_TO_VIDEO, SPRITE_STRIDE, SPRITE_TILE_WIDTH,
+    SPRITE_COLUMNS, SPRITE_ROWS, SPRITE_FORMAT, SPRITE_QUALITY, SPRITE_WORKERS
+)
+from .io_executor import run_io
+from .video_probe import VideoProbeError
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+MAX_FAILED_JOBS = 256  # 실패 사유를 보관할 최대 작업 수
+
+def sprite_key(path: Path, st: os.stat_result, stride: int) -> str:
+    """비디오 경로/크기/mtime/간격으로 캐시 키를 생성합니다."""
+    raw = f"{path}|{st.st_size}|{st.st_mtime_ns}|{stride}|{SPRITE_TILE_WIDTH}|{SPRITE_FORMAT}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+def sprite_dir(path: Path, key: str) -> Path:
+    """스프라이트 시트 저장 위치 (비디오 옆 또는 캐시 디렉토리)"""
+    if SPRITE_NEXT_TO_VIDEO:
+        return path.parent / f".{path.stem}.sprites" / key
+    return SPRITE_CACHE_DIR / key
+
+def generate_sprite_sheet(video_path: str, out_dir: str, stride: int, tile_width: int,
+                          columns: int, rows: int, fmt: str, quality: int) -> Dict:
+    """비디오를 한 번 순차 디코딩하여 stride 간격의 썸네일을 스프라이트 시트로 저장합니다.
+
+    건너뛰는 프레임은 grab()만 하고, 샘플링할 프레임만 retrieve()로 디코딩합니다.
+    (프로세스 풀에서 실행)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise VideoProbeError(f"Cannot open video: {video_path}")
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    ext = ".webp" if fmt == "webp" else ".jpg"
+    params = [cv2.IMWRITE_WEBP_QUALITY, quality] if fmt == "webp" else [cv2.IMWRITE_JPEG_QUALITY, quality]
+
+    try:
+        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        if width <= 0 or height <= 0:
+            raise VideoProbeError(f"Invalid frame size for video: {video_path}")
+
+        tile_height = max(1, round(tile_width * height / width))
+        per_sheet = columns * rows
+        sheets = []
+        tiles = []
+        sheet = None
+        frame_index = 0
+
+        def flush(sheet_img, count):
+            # 마지막 시트는 사용한 행만 저장
+            used_rows = (count + columns - 1) // columns
+            name = f"sheet_{len(sheets):04d}{ext}"
+            ok, buf = cv2.imencode(ext, sheet_img[:used_rows * tile_height], params)
+            if not ok:
+                raise VideoProbeError(f"Failed to encode sprite sheet: {name}")
+            (out / name).write_bytes(buf.tobytes())
+            sheets.append({"file": name, "tiles": count})
+
+        count = 0
+        while cap.grab():
+            if frame_index % stride == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    if sheet is None:
+                        sheet = np.zeros((rows * tile_height, columns * tile_width, 3), dtype=np.uint8)
+                        count = 0
+                    row, col = divmod(count, columns)
+                    thumb = cv2.resize(frame, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+                    y, x = row * tile_height, col * tile_width
+                    sheet[y:y + tile_height, x:x + tile_width] = thumb
+                    tiles.append({
+                        "start_frame": frame_index,
+                        "end_frame": frame_index + stride - 1,
+                        "sheet": len(sheets),
+                        "x": x,
+                        "y": y,
+                    })
+                    count += 1
+                    if count == per_sheet:
+                        flush(sheet, count)
+                        sheet = None
+            frame_index += 1
+
+        if sheet is not None and count:
+            flush(sheet, count)
+
+        # 마지막 타일의 끝 프레임을 실제 프레임 수에 맞춤
+        if tiles:
+            tiles[-1]["end_frame"] = frame_index - 1
+
+        index = {
+            "fps": fps,
+            "frame_count": frame_index,
+            "stride": stride,
+            "tile_width": tile_width,
+            "tile_height": tile_height,
+            "columns": columns,
+            "rows": rows,
+            "format": fmt,
+            "sheets": sheets,
+            "tiles": tiles,
+        }
+        # 인덱스는 임시 파일로 쓴 뒤 교체하여 완성된 결과만 노출
+        tmp = out / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(index), encoding='utf-8')
+        os.replace(tmp, out / INDEX_FILE)
+        return index
+    finally:
+        cap.release()
+
+class SpriteJobManager:
+    """스프라이트 시트 생성 작업을 전용 프로세스 풀에서 관리합니다.
+
+    긴 순차 디코딩이 /api/video-meta 조회(video_probe의 프로세스 풀)를 막지 않도록
+    SPRITE_WORKERS 크기의 별도 풀을 사용합니다. 끝난 작업의 Future는 보관하지 않고,
+    실패한 작업은 사유만 최근 MAX_FAILED_JOBS개까지 보관합니다.
+    """
+
+    def __init__(self, max_workers: int = SPRITE_WORKERS):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Future] = {}
+        self._failed: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, video_path: Path, out_dir: Path, stride: int) -> Future:
+        """같은 키의 작업이 진행 중이면 그 작업을 반환합니다."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            self._failed.pop(key, None)
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info("Scheduling sprite sheet generation: %s (stride=%d)", video_path, stride)
+            job = self._pool.submit(
+                generate_sprite_sheet, str(video_path), str(out_dir), stride,
+                SPRITE_TILE_WIDTH, SPRITE_COLUMNS, SPRITE_ROWS, SPRITE_FORMAT, SPRITE_QUALITY
+            )
+            self._jobs[key] = job
+        job.add_done_callback(lambda f, k=key: self._on_done(k, f))
+        return job
+
+    def _on_done(self, key: str, job: Future):
+        # 성공한 작업은 디스크의 index.json으로, 실패한 작업은 실패 사유로 대체
+        error = None if job.cancelled() else job.exception()
+        with self._lock:
+            if self._jobs.get(key) is job:
+                del self._jobs[key]
+            if error is not None:
+                self._failed[key] = str(error)
+                while len(self._failed) > MAX_FAILED_JOBS:
+                    self._failed.popitem(last=False)
+        if error is not None:
+            logger.error("Sprite sheet generation failed (%s): %s", key, error)
+
+    def get(self, key: str) -> Optional[Future]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def get_error(self, key: str) -> Optional[str]:
+        """실패한 작업의 사유를 반환합니다."""
+        with self._lock:
+            return self._failed.get(key)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._jobs.clear()
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+sprite_jobs = SpriteJobManager()
+
+def _load_index(out_dir: Path) -> Optional[Dict]:
+    index_path = out_dir / INDEX_FILE
+    if not index_path.exists():
+        return None
+    return json.loads(index_path.read_text(encoding='utf-8'))
+
+async def get_or_schedule_sprites(video_path: Path, stride: Optional[int] = None) -> Tuple[str, str, Optional[Dict]]:
+    """(상태, 키, 인덱스)를 반환합니다. 상태는 ready / pending / failed 중 하나입니다.
+
+    캐시에 없으면 생성 작업을 예약하고 즉시 pending을 반환합니다.
+    """
+    stride = stride or SPRITE_STRIDE
+    st = await run_io(os.stat, video_path)
+    key = sprite_key(video_path, st, stride)
+    out_dir = sprite_dir(video_path, key)
+
+    index = await run_io(_load_index, out_dir)
+    if index is not None:
+        return "ready", key, index
+
+    error = sprite_jobs.get_error(key)
+    if error is not None:
+        return "failed", key, {"error": error}
+
+    sprite_jobs.submit(key, video_path, out_dir, stride)
+    return "pending", key, None
+
+def find_sprite_file(key: str, filename: str, video_path: Optional[Path] = None) -> Optional[Path]:
+    """키에 해당하는 시트 이미지 경로를 반환합니다. (경로 조작 방지)"""
+    if not key.isalnum() or Path(filename).name != filename:
+        return None
+    base = sprite_dir(video_path, key) if (SPRITE_NEXT_TO_VIDEO and video_path) else SPRITE_CACHE_DIR / key
+    file_path = base / filename
+    return file_path if file_path.is_file() else None
@@ -0,0 +1,250 @@
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+import weakref
+
+import aiofiles
+
+from config import (
+    ALLOWED_VIDEO_EXTENSIONS, MAX_UPLOAD_SIZE, UPLOAD_DIR, UPLOAD_CHUNK_SIZE, UPLOAD_PARTIAL_TTL_SECONDS
+)
+from .io_executor import get_io_executor, run_io
+
+logger = logging.getLogger(__name__)
+
+# 이어받기(resumable) 업로드의 임시 파일 위치
+PARTIAL_DIR = UPLOAD_DIR / ".partial"
+
+# multipart 본문 중 파일 외의 부분(경계 문자열, 파트 헤더)에 허용하는 크기
+MULTIPART_OVERHEAD = 64 * 1024
+
+# 업로드별 잠금 (오프셋 확인부터 기록/완료까지 같은 업로드의 PATCH/DELETE가 겹치지 않도록)
+_upload_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+class UploadError(Exception):
+    """업로드 요청 오류 (status_code와 함께 HTTPException으로 변환)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def safe_upload_name(filename: str) -> str:
+    """경로 구성요소를 제거하고 확장자를 검사합니다."""
+    name = Path(filename or "").name
+    if not name or name in (".", ".."):
+        raise UploadError(400, "Invalid file name")
+    if Path(name).suffix.lower() not in ALLOWED_VIDEO_EXTENSIONS:
+        raise UploadError(400, "Invalid file format. Only video files are allowed.")
+    return name
+
+def check_multipart_length(content_length: Optional[str]):
+    """multipart 업로드의 Content-Length를 본문을 받기 전에 확인합니다.
+
+    multipart 본문은 핸들러가 실행되기 전에 모두 임시 파일로 받아지므로, 받는 도중에는
+    MAX_UPLOAD_SIZE를 적용할 수 없습니다. 길이를 알 수 없는(chunked) 요청은 거부합니다.
+    """
+    try:
+        length = int(content_length)
+    except (TypeError, ValueError):
+        raise UploadError(411, "Content-Length header is required")
+    if length > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+        raise UploadError(413, f"Upload exceeds maximum size of {MAX_UPLOAD_SIZE} bytes")
+
+def _claim_upload_path(src: Path, name: str) -> Path:
+    """src를 UPLOAD_DIR/name으로 옮깁니다. 같은 이름의 파일이 있으면 "이름 (1).mp4" 형식으로 저장합니다."""
+    stem, suffix = Path(name).stem, Path(name).suffix
+    for i in itertools.count():
+        candidate = UPLOAD_DIR / (name if i == 0 else f"{stem} ({i}){suffix}")
+        # 이름을 배타적으로 선점한 뒤 교체 (다른 업로드나 기존 비디오를 덮어쓰지 않도록)
+        try:
+            os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue
+        try:
+            os.replace(src, candidate)
+        except BaseException:
+            _unlink_quietly(candidate)
+            raise
+        return candidate
+
+async def write_stream(chunks: AsyncIterator[bytes], target: Path, mode: str = "wb",
+                       offset: int = 0, limit: int = MAX_UPLOAD_SIZE) -> int:
+    """청크 스트림을 파일에 기록하고 전체 크기를 반환합니다. limit을 넘으면 즉시 중단합니다."""
+    written = offset
+    async with aiofiles.open(target, mode, executor=get_io_executor()) as f:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            written += len(chunk)
+            if written > limit:
+                raise UploadError(413, f"Upload exceeds maximum size of {limit} bytes")
+            await f.write(chunk)
+    return written
+
+async def iter_upload_file(file) -> AsyncIterator[bytes]:
+    """UploadFile을 UPLOAD_CHUNK_SIZE 단위로 읽습니다."""
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+async def save_upload_file(file) -> Dict:
+    """multipart 업로드를 UPLOAD_DIR에 청크 단위로 저장합니다.
+
+    MAX_UPLOAD_SIZE는 파일을 옮겨 쓰는 동안 적용되며, 본문을 받기 전의 크기 제한은
+    check_multipart_length로 확인합니다. 받는 도중 제한은 이어받기 업로드에만 적용됩니다.
+    """
+    name = safe_upload_name(file.filename)
+    tmp_path = UPLOAD_DIR / f".{name}.{uuid.uuid4().hex}.tmp"
+
+    try:
+        size = await write_stream(iter_upload_file(file), tmp_path)
+        save_path = await run_io(_claim_upload_path, tmp_path, name)
+    except BaseException:
+        await run_io(_unlink_quietly, tmp_path)
+        raise
+
+    logger.info("File saved successfully: %s", save_path)
+    return {"filename": save_path.name, "path": str(save_path), "size": size, "type": "local"}
+
+# --- 이어받기 업로드 (tus 방식: 생성 -> 오프셋 조회 -> 오프셋부터 이어서 전송) ---
+
+def _meta_path(upload_id: str) -> Path:
+    return PARTIAL_DIR / f"{upload_id}.json"
+
+def _part_path(upload_id: str) -> Path:
+    return PARTIAL_DIR / f"{upload_id}.part"
+
+def _unlink_quietly(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+def _create_upload_sync(name: str, size: int) -> Dict:
+    PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+    upload_id = uuid.uuid4().hex
+    _part_path(upload_id).touch()
+    meta = {"upload_id": upload_id, "filename": name, "size": size}
+    _meta_path(upload_id).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return {**meta, "offset": 0}
+
+def _load_upload_sync(upload_id: str) -> Optional[Dict]:
+    if not upload_id.isalnum():
+        return None
+    try:
+        meta = json.loads(_meta_path(upload_id).read_text(encoding="utf-8"))
+        offset = _part_path(upload_id).stat().st_size
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return {**meta, "offset": offset}
+
+def _finish_upload_sync(upload_id: str, name: str) -> Path:
+    save_path = _claim_upload_path(_part_path(upload_id), name)
+    _unlink_quietly(_meta_path(upload_id))
+    return save_path
+
+def _abort_upload_sync(upload_id: str):
+    _unlink_quietly(_part_path(upload_id))
+    _unlink_quietly(_meta_path(upload_id))
+
+def cleanup_stale_uploads(max_age: float = UPLOAD_PARTIAL_TTL_SECONDS) -> int:
+    """max_age초 동안 이어지지 않은(마지막 기록 이후) 이어받기 업로드를 삭제하고 개수를 반환합니다.
+
+    진행 중인 요청이 잠금을 가진 업로드는 건너뜁니다. (이벤트 루프 밖의 스레드에서 호출)
+    """
+    cutoff = time.time() - max_age
+    latest: Dict[str, float] = {}
+    try:
+        with os.scandir(PARTIAL_DIR) as it:
+            for entry in it:
+                upload_id, ext = os.path.splitext(entry.name)
+                if ext not in (".json", ".part"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                latest[upload_id] = max(latest.get(upload_id, 0.0), mtime)
+    except FileNotFoundError:
+        return 0
+
+    removed = 0
+    for upload_id, mtime in latest.items():
+        lock = _upload_locks.get(upload_id)
+        if mtime >= cutoff or (lock is not None and lock.locked()):
+            continue
+        try:
+            _abort_upload_sync(upload_id)
+        except OSError as e:
+            logger.warning("Cannot remove stale upload %s: %s", upload_id, e)
+            continue
+        removed += 1
+    if removed:
+        logger.info("Removed %s stale resumable uploads", removed)
+    return removed
+
+def _upload_lock(upload_id: str) -> asyncio.Lock:
+    """업로드의 잠금을 반환합니다. 다른 요청이 사용 중이면 423으로 거부합니다."""
+    lock = _upload_locks.get(upload_id)
+    if lock is None:
+        lock = _upload_locks[upload_id] = asyncio.Lock()
+    if lock.locked():
+        raise UploadError(423, "Upload is being modified by another request")
+    return lock
+
+async def create_upload(filename: str, size: int) -> Dict:
+    """이어받기 업로드를 생성합니다."""
+    name = safe_upload_name(filename)
+    if size <= 0:
+        raise UploadError(400, "Upload size must be positive")
+    if size > MAX_UPLOAD_SIZE:
+        raise UploadError(413, f"Upload exceeds maximum size of {MAX_UPLOAD_SIZE} bytes")
+    # 클라이언트가 포기한 업로드의 임시 파일이 쌓이지 않도록 새 업로드를 만들 때 정리
+    await run_io(cleanup_stale_uploads)
+    upload = await run_io(_create_upload_sync, name, size)
+    logger.info("Created resumable upload %s for %s (%s bytes)", upload['upload_id'], name, size)
+    return upload
+
+async def get_upload(upload_id: str) -> Dict:
+    """업로드 상태(현재 오프셋)를 조회합니다."""
+    upload = await run_io(_load_upload_sync, upload_id)
+    if upload is None:
+        raise UploadError(404, "Upload not found")
+    return upload
+
+async def append_upload(upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Dict:
+    """클라이언트가 보낸 오프셋부터 이어서 기록합니다. 모두 받으면 최종 위치로 옮깁니다.
+
+    오프셋 확인부터 완료 처리까지 업로드 잠금을 유지하여 같은 오프셋의 요청이 겹쳐 기록되지 않게 합니다.
+    """
+    async with _upload_lock(upload_id):
+        upload = await get_upload(upload_id)
+        if offset != upload["offset"]:
+            raise UploadError(409, f"Offset mismatch: expected {upload['offset']}, got {offset}")
+
+        new_offset = await write_stream(
+            chunks, _part_path(upload_id), mode="ab", offset=offset, limit=upload["size"]
+        )
+        result = {**upload, "offset": new_offset, "complete": new_offset == upload["size"]}
+
+        if result["complete"]:
+            save_path = await run_io(_finish_upload_sync, upload_id, upload["filename"])
+            logger.info("Resumable upload %s completed: %s", upload_id, save_path)
+            result.update({"filename": save_path.name, "path": str(save_path), "type": "local"})
+    return result
+
+async def abort_upload(upload_id: str):
+    """이어받기 업로드를 취소하고 임시 파일을 삭제합니다."""
+    async with _upload_lock(upload_id):
+        await get_upload(upload_id)
+        await run_io(_abort_upload_sync, upload_id)
+    logger.info("Resumable upload %s aborted", upload_id)
@@ -0,0 +1,146 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import cv2
+
+from config import VIDEO_META_CACHE_PATH, VIDEO_PROBE_WORKERS
+from .io_executor import run_io
+
+logger = logging.getLogger(__name__)
+
+class VideoProbeError(Exception):
+    """OpenCV로 비디오를 열 수 없는 경우"""
+    pass
+
+def probe_video(path: str) -> Dict:
+    """OpenCV로 비디오의 fps, 프레임 수, 해상도, 코덱, 길이를 조회합니다. (프로세스 풀에서 실행)"""
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise VideoProbeError(f"Cannot open video: {path}")
+
+        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC) or 0)
+        codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ") or None
+
+        # 컨테이너에 프레임 수가 없으면 직접 센다 (디코딩 없이 grab만 수행)
+        if frame_count <= 0:
+            frame_count = 0
+            while cap.grab():
+                frame_count += 1
+
+        duration = frame_count / fps if fps > 0 else 0.0
+        return {
+            "fps": fps,
+            "frame_count": frame_count,
+            "width": width,
+            "height": height,
+            "codec": codec,
+            "duration": duration,
+        }
+    finally:
+        cap.release()
+
+class VideoMetaCache:
+    """(경로, 크기, mtime) 기준으로 프로브 결과를 저장하는 영구 캐시 (SQLite)"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS video_meta (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                meta TEXT NOT NULL,
+                probed_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT meta FROM video_meta WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, path: str, size: int, mtime_ns: int, meta: Dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO video_meta (path, size, mtime_ns, meta, probed_at) VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, json.dumps(meta), time.time())
+            )
+            self._conn.commit()
+
+_cache: Optional[VideoMetaCache] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_meta_cache() -> VideoMetaCache:
+    global _cache
+    if _cache is None:
+        _cache = VideoMetaCache(VIDEO_META_CACHE_PATH)
+    return _cache
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """비디오 디코딩 작업용 프로세스 풀 (크기는 VIDEO_PROBE_WORKERS)"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=VIDEO_PROBE_WORKERS)
+    return _process_pool
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+        _process_pool = None
+
+def get_cached_video_meta(path: Path) -> Optional[Dict]:
+    """캐시에 있는 프로브 결과만 조회합니다. (프로브하지 않음)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return get_meta_cache().get(str(path), st.st_size, st.st_mtime_ns)
+
+async def get_video_meta(path: Path) -> Dict:
+    """비디오 메타데이터를 반환합니다. 캐시에 없으면 프로세스 풀에서 프로브합니다."""
+    st = await run_io(os.stat, path)
+    key = str(path)
+    cache = get_meta_cache()
+
+    meta = await run_io(cache.get, key, st.st_size, st.st_mtime_ns)
+    if meta is not None:
+        return {**meta, "cached": True}
+
+    logger.info("Probing video metadata: %s", path)
+    loop = asyncio.get_running_loop()
+    meta = await loop.run_in_executor(get_process_pool(), probe_video, key)
+    await run_io(cache.put, key, st.st_size, st.st_mtime_ns, meta)
+    return {**meta, "cached": False}
+
+async def get_video_meta_batch(paths: List[Path]) -> Dict[str, Dict]:
+    """여러 비디오를 병렬로 프로브합니다. 실패한 항목은 error 필드를 포함합니다."""
+    async def probe_one(path: Path) -> Dict:
+        try:
+            return await get_video_meta(path)
+        except Exception as e:
+            logger.error("Error probing %s: %s", path, e)
+            return {"error": str(e)}
+
+    results = await asyncio.gather(*[probe_one(path) for path in paths])
+    return {str(path): result for path, result in zip(paths, results)}
@@ -0,0 +1,86 @@
+"""통계 집계 벤치마크 (합성 데이터)
+
+노트북의 iterrows 루프(성별 한 가지 속성)와 app.pipelines.analysis의 벡터화 집계
+(melt 한 번 + 전체 교차표/비율/동작 시간)를 비교합니다.
+iterrows는 너무 느리므로 --legacy-rows 행으로 측정한 뒤 전체 행 수로 환산합니다.
+
+사용 예:
+    python benchmarks/bench_analysis.py --rows 1000000 --max-users 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.pipelines.analysis import ACTION_COLUMNS, melt_users, summarize
+
+def make_dataset(rows: int, max_users: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    user_num = rng.integers(1, max_users + 1, rows)
+    data = {
+        'file_name': np.arange(rows).astype(str),
+        'environment': rng.integers(1, 11, rows),
+        'user_num': user_num,
+    }
+    for column in ACTION_COLUMNS:
+        data[column] = rng.integers(0, 3000, rows)
+    for i in range(max_users):
+        present = user_num > i
+        for field, high in (('age', 4), ('gender', 3), ('disability', 3)):
+            values = rng.integers(1, high, rows).astype(float)
+            values[~present] = np.nan
+            data[f'user_{i}_{field}'] = values
+    return pd.DataFrame(data)
+
+def legacy_gender_distribution(data: pd.DataFrame) -> pd.DataFrame:
+    """노트북의 성별 분포 셀 (행 x 사용자 컬럼 이중 루프)"""
+    gender_columns = [col for col in data.columns if 'user_' in col and 'gender' in col]
+    all_genders = []
+    all_environments = []
+    for idx, row in data.iterrows():
+        environment = row['environment']
+        for gender_col in gender_columns:
+            if pd.notna(row[gender_col]):
+                all_genders.append(row[gender_col])
+                all_environments.append(environment)
+    combined_df = pd.DataFrame({'environment': all_environments, 'gender': all_genders})
+    return pd.crosstab(combined_df['environment'], combined_df['gender'])
+
+def main():
+    parser = argparse.ArgumentParser(description="analysis vectorization benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-users", type=int, default=5)
+    parser.add_argument("--legacy-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    data = make_dataset(args.rows, args.max_users)
+    print(f"rows={args.rows} max_users={args.max_users}")
+
+    sample = data.head(args.legacy_rows)
+    started = time.perf_counter()
+    legacy = legacy_gender_distribution(sample)
+    legacy_sec = (time.perf_counter() - started) * args.rows / len(sample)
+
+    started = time.perf_counter()
+    users = melt_users(data)
+    melt_sec = time.perf_counter() - started
+    started = time.perf_counter()
+    result = summarize(data, users)
+    summary_sec = time.perf_counter() - started
+
+    # 같은 표본에서 결과가 같은지 확인
+    check = summarize(sample, melt_users(sample))['gender_by_environment']
+    assert (check.to_numpy() == legacy.to_numpy()).all()
+
+    print(f"before (iterrows, gender table only, extrapolated): {legacy_sec:.1f} s")
+    print(f"after melt_users: {melt_sec:.2f} s ({len(users)} users)")
+    print(f"after summarize ({len(result)} tables): {summary_sec:.2f} s")
+    print(f"speedup (gender table vs full summary): {legacy_sec / (melt_sec + summary_sec):.0f}x")
+
+if __name__ == "__main__":
+    main()
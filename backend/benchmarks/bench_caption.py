@@ -0,0 +1,92 @@
+"""캡션 user_num 추정 벤치마크
+
+노트북의 extract_user_num_from_caption(re.findall + 목록별 any 검사)과
+app.pipelines.caption_user_num의 사전 컴파일 정규식을 무작위 캡션으로 비교하고,
+두 구현의 결과가 모두 같은지 확인합니다.
+
+사용 예:
+    python benchmarks/bench_caption.py --captions 100000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.pipelines.caption_user_num import PATTERN_GROUPS, classify_captions
+
+def legacy_extract_user_num_from_caption(caption):
+    """이전 구현 (NIA_json_changer.ipynb)"""
+    try:
+        numbers = re.findall(r'\d+', caption)
+        if numbers:
+            valid_numbers = [int(n) for n in numbers if int(n) < 10]
+            if valid_numbers:
+                return max(valid_numbers)
+
+        caption_normalized = caption.replace(" ", "").lower()
+
+        single_patterns = ['혼자', '개인', '단독', '일인', '1인']
+        if any(pattern in caption_normalized for pattern in single_patterns):
+            return 1
+        double_patterns = ['둘이', '두명', '두인', '이인', '커플', '부부', '모자', '부자', '남매', '자매', '형제']
+        if any(pattern in caption_normalized for pattern in double_patterns):
+            return 2
+        triple_patterns = ['셋이', '세명', '삼인', '3인']
+        if any(pattern in caption_normalized for pattern in triple_patterns):
+            return 3
+        four_patterns = ['넷이', '네명', '사인', '4인']
+        if any(pattern in caption_normalized for pattern in four_patterns):
+            return 4
+        multi_patterns = ['가족', '단체', '그룹', '다수', '여러명', '여럿이', '많은', '복수']
+        if any(pattern in caption_normalized for pattern in multi_patterns):
+            return 5
+        return 1
+    except Exception:
+        return 1
+
+FILLER = ['키오스크', '에서', '주문', '하는', '모습', '사람', '메뉴를', '고르는', '결제', '화면', '앞에서',
+          '천천히', '카드로', '포인트', ' ', ' ', '12', '0', '이', '인', '사', '명', '두', '여러']
+
+def make_captions(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    expressions = [p for _, patterns in PATTERN_GROUPS for p in patterns]
+    captions = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(3, 12))
+        for _ in range(rng.randint(0, 2)):
+            expression = rng.choice(expressions)
+            if rng.random() < 0.3 and len(expression) > 1:
+                expression = expression[0] + " " + expression[1:]
+            words.insert(rng.randint(0, len(words)), expression)
+        captions.append(" ".join(words))
+    return captions
+
+def main():
+    parser = argparse.ArgumentParser(description="caption user_num benchmark")
+    parser.add_argument("--captions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    captions = make_captions(args.captions)
+
+    started = time.perf_counter()
+    before = [legacy_extract_user_num_from_caption(c) for c in captions]
+    before_sec = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after = classify_captions(captions)
+    after_sec = time.perf_counter() - started
+
+    mismatches = [(c, b, a) for c, b, a in zip(captions, before, after) if a != b]
+    print(f"captions={args.captions} mismatches={len(mismatches)}")
+    for caption, b, a in mismatches[:5]:
+        print(f"  legacy={b} compiled={a} {caption!r}")
+    print(f"before: {before_sec / args.captions * 1e6:.2f} us / caption")
+    print(f"after:  {after_sec / args.captions * 1e6:.2f} us / caption")
+    print(f"speedup: {before_sec / after_sec:.1f}x")
+
+if __name__ == "__main__":
+    main()
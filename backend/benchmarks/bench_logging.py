@@ -0,0 +1,97 @@
+"""어노테이션 저장 요청의 로깅 비용 벤치마크
+
+500 세그먼트 문서 저장 시 요청 처리 스레드에서 소요되는 시간(JSON 파싱 + 검증 + 로그)을 비교합니다.
+- before: DEBUG 강제, f-string 로그, 세그먼트마다 debug 로그, 동기 파일 핸들러
+- after (sync): INFO 레벨, 지연 포매팅(%s), 동기 파일 핸들러
+- after (queue): INFO 레벨, 지연 포매팅, QueueHandler + 백그라운드 JSON Lines 기록 (서버 구성)
+
+사용 예:
+    python benchmarks/bench_logging.py --segments 500 --repeat 200
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.annotation_schema import validate_document
+from app.utils.logging_setup import CONSOLE_FORMAT, configure_logging, stop_logging
+from bench_validation import make_document
+
+logger = logging.getLogger("app.routers.annotations")
+
+def legacy_save(path: str, content: bytes):
+    """이전 save_annotation의 로그 호출 (세그먼트마다 debug 로그)"""
+    logger.info(f"Saving annotation for original path: {path}")
+    logger.info(f"Decoded video path: {path}")
+    json_path = Path(path).with_suffix('.json')
+    logger.info(f"Target JSON path: {json_path}")
+    data = json.loads(content.decode('utf-8'))
+    logger.info(f"Parsed JSON data with keys: {list(data.keys())}")
+    for i, segment in enumerate(data['annotations']['segmentation']):
+        logger.debug(f"Validating segment {i}")
+        logger.debug(f"Segment data: {segment}")
+    validate_document(data)
+    logger.info("Data structure validation passed")
+    logger.info(f"Successfully saved to: {json_path}")
+
+def current_save(path: str, content: bytes):
+    """현재 save_annotation의 로그 호출"""
+    logger.debug("Saving annotation for original path: %s", path)
+    logger.debug("Decoded video path: %s", path)
+    json_path = Path(path).with_suffix('.json')
+    logger.debug("Target JSON path: %s", json_path)
+    data = json.loads(content.decode('utf-8'))
+    logger.debug("Parsed JSON data with keys: %s", data.keys())
+    validate_document(data)
+    logger.debug("Data structure validation passed")
+    logger.info("Successfully saved to: %s", json_path, extra={"bytes": len(content)})
+
+def use_sync_file(log_path: Path, level: int):
+    """동기 파일 핸들러 (이전 basicConfig 구성과 같이 호출 스레드에서 기록)"""
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(log_path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    logger.setLevel(level)
+
+def measure(func, path: str, content: bytes, repeat: int) -> float:
+    return min(timeit.repeat(lambda: func(path, content), number=1, repeat=repeat))
+
+def main():
+    parser = argparse.ArgumentParser(description="save_annotation logging overhead benchmark")
+    parser.add_argument("--segments", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    content = json.dumps(make_document(args.segments)).encode("utf-8")
+    path = "/data/videos/sample.mp4"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_sync_file(Path(tmp) / "before.log", logging.DEBUG)
+        before = measure(legacy_save, path, content, args.repeat)
+
+        use_sync_file(Path(tmp) / "sync.log", logging.NOTSET)
+        after_sync = measure(current_save, path, content, args.repeat)
+
+        configure_logging(log_dir=Path(tmp), levels={}, console=False)
+        after_queue = measure(current_save, path, content, args.repeat)
+        stop_logging()
+
+    print(f"segments={args.segments} repeat={args.repeat} ({len(content) / 1024:.0f} KiB)")
+    print(f"before:        {before * 1000:.3f} ms / save")
+    print(f"after (sync):  {after_sync * 1000:.3f} ms / save")
+    print(f"after (queue): {after_queue * 1000:.3f} ms / save")
+    print(f"speedup: {before / after_queue:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""어노테이션 검증 마이크로 벤치마크
+
+이전 validate_data_structure(섹션마다 전체 문서 재검증, 세그먼트마다 debug 로그)와
+단일 패스 검증기(app.utils.annotation_schema)의 1,000 세그먼트당 검증 시간을 비교합니다.
+
+사용 예:
+    python benchmarks/bench_validation.py --segments 1000 --repeat 200
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.annotation_schema import validate_document
+
+# 서버와 같은 로깅 구성 (annotations 로거는 DEBUG, 출력은 버림)
+logger = logging.getLogger("bench.annotations")
+logger.setLevel(logging.DEBUG)
+logger.propagate = False
+logger.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+
+def legacy_validate_data_structure(data):
+    """이전 구현 (섹션 루프 안에서 문서 전체를 반복 검증)"""
+    logger.info("Starting data structure validation")
+
+    if not isinstance(data, dict):
+        logger.error("Data is not a dictionary")
+        raise ValueError("Data must be a dictionary")
+
+    # 최상위 필수 섹션 검증    
+    required_sections = ['meta_data', 'additional_info', 'annotations']
+    for section in required_sections:
+        if section not in data:
+            logger.error(f"Missing required section: {section}")
+            raise ValueError(f"Missing required section: {section}")
+            
+        # meta_data 섹션 검증
+        required_meta_fields = [
+            'file_name', 'format', 'size', 'width_height', 'environment',
+            'frame_rate', 'total_frames', 'camera_height', 'camera_angle'
+        ]
+        for field in required_meta_fields:
+            if field not in data['meta_data']:
+                logger.error(f"Missing required field in meta_data: {field}")
+                raise ValueError(f"Missing required field in meta_data: {field}")
+            
+        # annotations 섹션 검증
+        required_annotation_fields = ['space_context', 'user_num', 'target_objects', 'segmentation']
+        for field in required_annotation_fields:
+            if field not in data['annotations']:
+                logger.error(f"Missing required field in annotations: {field}")
+                raise ValueError(f"Missing required field in annotations: {field}")
+
+        # user_num 값 범위 검증
+        user_num = data['annotations'].get('user_num')
+        if not isinstance(user_num, int) or user_num < 1 or user_num > 10:
+            logger.error(f"Invalid user_num value: {user_num}")
+            raise ValueError("user_num must be an integer between 1 and 10")
+
+        # segmentation 배열 검증
+        if not isinstance(data['annotations']['segmentation'], list):
+            logger.error("Segmentation is not a list")
+            raise ValueError("Segmentation must be a list")
+            
+        for i, segment in enumerate(data['annotations']['segmentation']):
+            logger.debug(f"Validating segment {i}")
+            if not isinstance(segment, dict):
+                logger.error(f"Segment {i} is not a dictionary")
+                raise ValueError("Each segment must be a dictionary")
+                
+            required_segment_fields = [
+                'segment_id', 'action_type', 'start_frame', 
+                'end_frame', 'duration', 'keyframe', 'keypoints'
+            ]
+            
+            for field in required_segment_fields:
+                if field not in segment:
+                    logger.error(f"Missing required field '{field}' in segment {i}")
+                    raise ValueError(f"Missing required field in segment: {field}")
+
+            # action_type 값 범위 검증 (0-3)
+            if not (0 <= segment['action_type'] <= 3):
+                logger.error(f"Invalid action_type value in segment {i}: {segment['action_type']}")
+                raise ValueError(f"Invalid action_type value in segment {i} (must be 0-3)")
+
+            # 프레임 값 검증
+            if not (segment['start_frame'] >= 0 and segment['start_frame'] < segment['end_frame']):
+                logger.error(f"Invalid frame values in segment {i}")
+                raise ValueError(f"Invalid frame values in segment {i}")
+
+            # keyframe 값 검증
+            if not (segment['start_frame'] <= segment['keyframe'] <= segment['end_frame']):
+                logger.error(f"Invalid keyframe value in segment {i}")
+                raise ValueError(f"Invalid keyframe value in segment {i}")
+                
+        logger.info("Data structure validation completed successfully")
+
+
+def make_document(num_segments: int):
+    segments = []
+    for i in range(num_segments):
+        start = i * 20
+        segments.append({
+            "segment_id": i,
+            "action_type": i % 4,
+            "start_frame": start,
+            "end_frame": start + 15,
+            "duration": 15,
+            "keyframe": start + 7,
+            "keypoints": [{"object_id": 0, "keypoints": []}],
+        })
+    return {
+        "meta_data": {
+            "file_name": "sample.mp4", "format": "mp4", "size": 1024, "width_height": [2304, 1296],
+            "environment": 0, "frame_rate": 15, "total_frames": num_segments * 20,
+            "camera_height": 170, "camera_angle": 15,
+        },
+        "additional_info": {"InteractionType": "Touchscreen"},
+        "annotations": {
+            "space_context": "",
+            "user_num": 1,
+            "target_objects": [{"object_id": 0, "age": 1, "gender": 1, "disability": 2}],
+            "segmentation": segments,
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="validate_data_structure micro-benchmark")
+    parser.add_argument("--segments", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    data = make_document(args.segments)
+    assert validate_document(data) == []
+
+    per_1k = 1000 / args.segments
+    before = min(timeit.repeat(lambda: legacy_validate_data_structure(data), number=1, repeat=args.repeat))
+    after = min(timeit.repeat(lambda: validate_document(data), number=1, repeat=args.repeat))
+
+    print(f"segments={args.segments} repeat={args.repeat}")
+    print(f"before: {before * per_1k * 1000:.3f} ms / 1,000 segments")
+    print(f"after:  {after * per_1k * 1000:.3f} ms / 1,000 segments")
+    print(f"speedup: {before / after:.1f}x")
+
+if __name__ == "__main__":
+    main()
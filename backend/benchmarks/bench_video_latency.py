@@ -0,0 +1,96 @@
+"""/video 응답 지연 벤치마크
+
+실행 중인 서버에 대해 /load-path 전체 재스캔을 동시에 반복하면서
+/video Range 요청의 p50/p95/p99 지연 시간을 측정합니다.
+
+사용 예:
+    python benchmarks/bench_video_latency.py \
+        --base-url http://localhost:8000 \
+        --video /data/clips/sample.mp4 \
+        --scan-path /mnt/nas/captures \
+        --requests 500 --concurrency 12 --scanners 2
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import quote
+
+import aiohttp
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, int(round(pct / 100 * (len(values) - 1)))))
+    return values[k]
+
+async def video_worker(session, url, queue, latencies, range_size):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start_byte = (i * range_size) % (64 * range_size)
+        headers = {"Range": f"bytes={start_byte}-{start_byte + range_size - 1}"}
+        t0 = time.perf_counter()
+        async with session.get(url, headers=headers) as resp:
+            await resp.read()
+            if resp.status not in (200, 206):
+                raise RuntimeError(f"/video returned {resp.status}")
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+async def scan_worker(session, base_url, scan_path, stop, scans):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        async with session.post(f"{base_url}/load-path", json={"path": scan_path, "refresh": True}) as resp:
+            await resp.read()
+        scans.append((time.perf_counter() - t0) * 1000)
+
+async def run(args):
+    video_url = f"{args.base_url}/video/{quote(args.video)}"
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        results = {}
+        for label, scanners in (("idle", 0), ("under scan", args.scanners)):
+            if scanners and not args.scan_path:
+                continue
+            queue = asyncio.Queue()
+            for i in range(args.requests):
+                queue.put_nowait(i)
+            latencies, scans = [], []
+            stop = asyncio.Event()
+            scan_tasks = [
+                asyncio.create_task(scan_worker(session, args.base_url, args.scan_path, stop, scans))
+                for _ in range(scanners)
+            ]
+            await asyncio.gather(*[
+                video_worker(session, video_url, queue, latencies, args.range_size)
+                for _ in range(args.concurrency)
+            ])
+            stop.set()
+            await asyncio.gather(*scan_tasks)
+            results[label] = (latencies, scans)
+
+    for label, (latencies, scans) in results.items():
+        print(f"[{label}] /video requests={len(latencies)} "
+              f"p50={percentile(latencies, 50):.1f}ms "
+              f"p95={percentile(latencies, 95):.1f}ms "
+              f"p99={percentile(latencies, 99):.1f}ms "
+              f"mean={statistics.mean(latencies):.1f}ms")
+        if scans:
+            print(f"[{label}] /load-path scans={len(scans)} mean={statistics.mean(scans):.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="/video latency under concurrent /load-path scans")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--video", required=True, help="스트리밍할 비디오 파일 경로")
+    parser.add_argument("--scan-path", help="동시에 재스캔할 디렉토리 경로")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--scanners", type=int, default=2)
+    parser.add_argument("--range-size", type=int, default=256 * 1024)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -22,4 +22,81 @@ CORS_ALLOW_HEADERS = ["*"]
 
 # 업로드 설정
 UPLOAD_DIR = BASE_DIR / "uploads"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# 파일 인덱스 설정 (/load-path 디렉토리 인덱스)
+FILE_INDEX_DIR = BASE_DIR / "cache" / "file_index"
+FILE_INDEX_MAX_AGE = int(os.environ.get("FILE_INDEX_MAX_AGE", 30))  # 초, 이보다 오래되면 증분 재스캔
+
+# I/O 스레드 풀 설정 (파일시스템 및 JSON 읽기/쓰기)
+IO_THREAD_POOL_SIZE = int(os.environ.get("IO_THREAD_POOL_SIZE", 8))
+
+# 비디오 메타데이터 프로브 설정 (OpenCV)
+VIDEO_META_CACHE_PATH = BASE_DIR / "cache" / "video_meta.sqlite"
+VIDEO_PROBE_WORKERS = int(os.environ.get("VIDEO_PROBE_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+
+# 타임라인 썸네일 스프라이트 시트 설정
+SPRITE_CACHE_DIR = BASE_DIR / "cache" / "sprites"
+SPRITE_NEXT_TO_VIDEO = os.environ.get("SPRITE_NEXT_TO_VIDEO", "0") == "1"  # 1이면 비디오 옆에 저장
+SPRITE_STRIDE = int(os.environ.get("SPRITE_STRIDE", 15))  # 썸네일 간격 (프레임)
+SPRITE_TILE_WIDTH = 160
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+SPRITE_FORMAT = os.environ.get("SPRITE_FORMAT", "jpg")  # jpg 또는 webp
+SPRITE_QUALITY = 70
+SPRITE_WORKERS = int(os.environ.get("SPRITE_WORKERS", 1))  # 스프라이트 생성 프로세스 수 (video-meta 조회 풀과 별도)
+
+# 프레임 추출 설정 (/api/frame)
+FRAME_CAPTURE_CACHE_SIZE = int(os.environ.get("FRAME_CAPTURE_CACHE_SIZE", 8))  # 열어둘 VideoCapture 수
+FRAME_CACHE_MAX_BYTES = int(os.environ.get("FRAME_CACHE_MAX_BYTES", 256 * 1024 * 1024))  # 캐시할 JPEG 총 크기
+FRAME_BACKWARD_WINDOW = 30  # 뒤로 이동 시 미리 디코딩하여 캐시할 프레임 수
+FRAME_FORWARD_SKIP_LIMIT = 120  # 이보다 멀리 앞으로 이동하면 탐색(seek)
+FRAME_SEEK_PREROLL = 60  # 탐색 시 이만큼 앞의 지점으로 이동한 뒤 앞으로 디코딩 (위치가 부정확하면 처음부터)
+FRAME_JPEG_QUALITY = 90
+
+# 업로드 청크 크기 (스트리밍 저장)
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+UPLOAD_PARTIAL_TTL_SECONDS = int(os.environ.get("UPLOAD_PARTIAL_TTL_SECONDS", 24 * 3600))  # 이 시간 동안 이어지지 않은 이어받기 업로드는 삭제
+
+# 어노테이션 저널 설정 (세그먼트 단위 편집 기록)
+ANNOTATION_JOURNAL_COMPACT_THRESHOLD = int(os.environ.get("ANNOTATION_JOURNAL_COMPACT_THRESHOLD", 200))
+
+# 어노테이션 캐시 설정 (get_annotations / check_annotation)
+ANNOTATION_CACHE_SIZE = int(os.environ.get("ANNOTATION_CACHE_SIZE", 4096))  # 캐시할 어노테이션 파일 수
+ANNOTATION_CACHE_MAX_BYTES = int(os.environ.get("ANNOTATION_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+ANNOTATION_CACHE_REVALIDATE_SECONDS = float(os.environ.get("ANNOTATION_CACHE_REVALIDATE_SECONDS", 30))  # 감시 중이어도 이 시간이 지나면 stat으로 재확인
+# 시작 시 감시할 데이터셋 루트 (os.pathsep로 구분, /load-path로 연 디렉토리는 자동으로 추가)
+ANNOTATION_WATCH_ROOTS = [p for p in os.environ.get("ANNOTATION_WATCH_ROOTS", "").split(os.pathsep) if p]
+
+# 어노테이션 질의 인덱스 설정 (/api/query)
+ANNOTATION_INDEX_PATH = BASE_DIR / "cache" / "annotation_index.sqlite"
+ANNOTATION_INDEX_RESCAN_INTERVAL = int(os.environ.get("ANNOTATION_INDEX_RESCAN_INTERVAL", 300))  # 초, 루트를 다시 열 때 이보다 오래되었으면 증분 재색인
+
+# 메트릭 설정 (/metrics, 요청 지연 시간/응답 바이트 기록)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+
+# 프로파일링 설정 (요청별 프로파일을 PROFILE_DIR에 저장, /api/debug/profiles)
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample")  # sample(.folded, 플레임 그래프) 또는 cprofile(.prof)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))  # X-Profile 헤더 없이 프로파일링할 요청 비율
+PROFILE_PATHS = tuple(os.environ.get("PROFILE_PATHS", "/load-path,/api/save-annotation,/api/annotations").split(","))
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.001))  # 샘플링 간격 (초)
+PROFILE_DIR = BASE_DIR / "cache" / "profiles"
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 200))
+
+# 로깅 설정 (logs/ 디렉토리에 JSON Lines로 기록, 크기 기준 로테이션)
+LOG_DIR = BASE_DIR / "logs"
+LOG_FILE_NAME = "server.log"
+LOG_FILE_MAX_BYTES = int(os.environ.get("LOG_FILE_MAX_BYTES", 10 * 1024 * 1024))
+LOG_FILE_BACKUP_COUNT = int(os.environ.get("LOG_FILE_BACKUP_COUNT", 5))
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+# 모듈별 로그 레벨 (예: "app.routers.annotations=DEBUG,app.utils.file_handler=WARNING")
+LOG_LEVELS = dict(
+    (name.strip(), level.strip()) for name, _, level in
+    (item.partition("=") for item in os.environ.get("LOG_LEVELS", "").split(",")) if name.strip() and level.strip()
+)
+
+# 비디오 스트리밍 전용 스레드 풀 (/video Range 읽기, 디렉토리 순회/인덱스 대기와 분리)
+STREAM_THREAD_POOL_SIZE = int(os.environ.get("STREAM_THREAD_POOL_SIZE", 8))
+# 프레임 디코딩/JPEG 인코딩 스레드 풀 (/api/frame, CPU 사용)
+FRAME_DECODE_WORKERS = int(os.environ.get("FRAME_DECODE_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
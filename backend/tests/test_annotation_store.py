@@ -0,0 +1,61 @@
+"""어노테이션 저널 회귀 테스트 (python -m pytest tests)"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils import annotation_store
+from app.utils.annotation_store import (
+    append_journal, journal_path, load_annotation, patch_annotation, save_annotation_document
+)
+
+def segment(seg_id):
+    return {"segment_id": seg_id, "start_frame": seg_id * 10, "end_frame": seg_id * 10 + 5}
+
+def make_document(tmp_path):
+    json_path = tmp_path / "clip.json"
+    save_annotation_document(json_path, {"annotations": {"segmentation": [segment(0)]}})
+    return json_path
+
+def segment_ids(json_path):
+    return [s["segment_id"] for s in load_annotation(json_path)["annotations"]["segmentation"]]
+
+def test_append_after_truncated_line_keeps_new_entry(tmp_path):
+    json_path = make_document(tmp_path)
+    append_journal(json_path, [{"op": "upsert", "segment": segment(1)}])
+
+    # 쓰기 도중 중단되어 마지막 줄이 잘린 상태
+    with open(journal_path(json_path), "ab") as f:
+        f.write(b'{"op": "upsert", "segment": {"segm')
+
+    _, data = patch_annotation(json_path, [{"op": "upsert", "segment": segment(2)}])
+    assert [s["segment_id"] for s in data["annotations"]["segmentation"]] == [0, 1, 2]
+    assert segment_ids(json_path) == [0, 1, 2]
+
+    # 이후 추가도 정상적으로 읽혀야 함
+    append_journal(json_path, [{"op": "upsert", "segment": segment(3)}])
+    assert segment_ids(json_path) == [0, 1, 2, 3]
+
+def test_truncated_journal_without_newline(tmp_path):
+    json_path = make_document(tmp_path)
+    journal_path(json_path).write_bytes(b'{"op": "ups')
+
+    assert append_journal(json_path, [{"op": "upsert", "segment": segment(1)}]) == 1
+    assert segment_ids(json_path) == [0, 1]
+
+def test_entry_count_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(annotation_store, "ANNOTATION_JOURNAL_COMPACT_THRESHOLD", 5)
+    json_path = make_document(tmp_path)
+
+    assert append_journal(json_path, [{"op": "upsert", "segment": segment(1)}]) == 1
+    assert append_journal(json_path, [{"op": "upsert", "segment": segment(2)},
+                                      {"op": "upsert", "segment": segment(3)}]) == 3
+
+    # 외부에서 저널이 바뀌면 항목 수를 다시 셈
+    journal_path(json_path).unlink()
+    assert append_journal(json_path, [{"op": "upsert", "segment": segment(4)}]) == 1
+
+    for i in range(5, 9):
+        append_journal(json_path, [{"op": "upsert", "segment": segment(i)}])
+    assert not journal_path(json_path).exists()
+    assert segment_ids(json_path) == [0, 4, 5, 6, 7, 8]
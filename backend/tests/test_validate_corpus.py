@@ -0,0 +1,30 @@
+"""데이터셋 검증 교차 검사 회귀 테스트 (python -m pytest tests)"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.pipelines.validate_corpus import cross_check
+
+def make_document(frames):
+    segments = [
+        {"segment_id": i, "start_frame": start, "end_frame": end}
+        for i, (start, end) in enumerate(frames)
+    ]
+    return {
+        "meta_data": {"total_frames": 100},
+        "annotations": {"user_num": 1, "target_objects": [{}], "segmentation": segments},
+    }
+
+def overlaps(frames):
+    return [e["pointer"] for e in cross_check(make_document(frames)) if e["code"] == "segment_overlap"]
+
+def test_overlap_with_earlier_long_segment_is_reported():
+    # (20, 30)은 바로 앞의 (5, 10)과는 겹치지 않지만 (0, 50)과 겹침
+    assert overlaps([(0, 50), (5, 10), (20, 30)]) == [
+        "/annotations/segmentation/1",
+        "/annotations/segmentation/2",
+    ]
+
+def test_adjacent_segments_do_not_overlap():
+    assert overlaps([(0, 10), (10, 20), (20, 30)]) == []
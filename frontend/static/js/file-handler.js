@@ -2,6 +2,10 @@ class FileHandler {
     constructor() {
         this.currentFiles = [];
         this.currentFileIndex = -1;
+        this.PAGE_SIZE = 200;  // /api/load-path 한 페이지 크기
+        this.currentPath = null;
+        this.nextCursor = null;
+        this.savedState = null;  // 마지막으로 저장/로드한 어노테이션 (변경분 저장용)
         this.hasModifiedContent = false;
         this.initializeElements();
         this.initializeEventListeners();
@@ -52,7 +56,7 @@ class FileHandler {
                         'Content-Type': 'application/json',
                         'Accept': 'application/json'
                     },
-                    body: JSON.stringify({ path }),
+                    body: JSON.stringify({ path, limit: this.PAGE_SIZE, sort: 'name' }),
                     signal: controller.signal
                 });
     
@@ -87,7 +91,9 @@ class FileHandler {
                 throw new Error('사용 가능한 비디오 파일이 없습니다.');
             }
 
-            console.log(`Found ${validFiles.length} valid video files`);
+            console.log(`Found ${validFiles.length} of ${data.total ?? validFiles.length} video files`);
+            this.currentPath = path;
+            this.nextCursor = data.next_cursor || null;
             this.currentFiles = this.removeDuplicates(validFiles);
             await this.displayFileList();
 
@@ -106,6 +112,40 @@ class FileHandler {
     }
 }
 
+    async loadMoreFiles() {
+        if (!this.currentPath || !this.nextCursor) return;
+
+        try {
+            this.showProgress();
+            const response = await fetch('/api/load-path', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                },
+                body: JSON.stringify({
+                    path: this.currentPath,
+                    limit: this.PAGE_SIZE,
+                    sort: 'name',
+                    cursor: this.nextCursor
+                })
+            });
+            if (!response.ok) {
+                throw new Error('서버 응답 오류: ' + response.statusText);
+            }
+
+            const data = await response.json();
+            this.nextCursor = data.next_cursor || null;
+            this.currentFiles = this.removeDuplicates([...this.currentFiles, ...(data.files || [])]);
+            await this.displayFileList();
+        } catch (error) {
+            console.error('Error loading more files:', error);
+            alert(error.message || '파일 로드 중 오류가 발생했습니다.');
+        } finally {
+            this.hideProgress();
+        }
+    }
+
     async handleDirectorySelect(event) {
         const files = Array.from(event.target.files)
             .filter(file => file.type.startsWith('video/'));
@@ -187,9 +227,17 @@ class FileHandler {
                 }
                 
                 timelineController.renderSegments();
+                const etag = response.headers.get('ETag');
+                if (etag) {
+                    this.rememberSavedState(file.originalPath, etag, data);
+                } else {
+                    // 아직 문서가 없음: 첫 저장은 If-None-Match로 다른 작업자의 저장을 덮어쓰지 않음
+                    this.savedState = { path: file.originalPath, etag: null, data: null };
+                }
                 return data;
             } else {
                 console.log("No existing annotations found");
+                this.savedState = null;
                 timelineController.segments = [];
                 timelineController.renderSegments();
                 return null;
@@ -242,9 +290,11 @@ class FileHandler {
             timelineController.resetState();  // 새로운 메서드 호출
     
             try {
+                videoController.setVideoMeta(null);
                 await videoController.loadVideo(file.path);
                 videoController.currentVideoPath = file.originalPath;
                 console.log("Video loaded successfully");
+                videoController.setVideoMeta(await this.loadVideoMeta(file.originalPath));
             } catch (videoError) {
                 console.error("Error loading video:", videoError);
                 throw new Error('비디오 로드 실패: 파일이 손상되었거나 접근할 수 없습니다.');
@@ -294,6 +344,60 @@ class FileHandler {
                 throw new Error('유효하지 않은 파일 경로입니다.');
             }
     
+            // 이전 저장 이후 변경된 세그먼트만 PATCH로 전송 (불가능하면 버전을 확인하는 전체 저장)
+            let saveResult;
+            try {
+                saveResult = await this.patchAnnotations(originalPath, annotations)
+                    || await this.saveFullAnnotations(originalPath, annotations, this.savePreconditions(originalPath));
+            } catch (error) {
+                if (error.status !== 412) throw error;
+                saveResult = await this.resolveConflict(currentFile, originalPath, annotations, error.etag);
+                if (!saveResult) return null;
+            }
+
+            if (isComplete) {
+                alert('작성이 완료되었습니다.');
+            }
+    
+            this.hasModifiedContent = false;
+            await this.displayFileList();
+            return saveResult;
+    
+        } catch (error) {
+            console.error('Save error:', error);
+            console.error("Complete error details:", {
+                name: error.name,
+                message: error.message,
+                stack: error.stack,
+                data: annotations
+            });
+            throw error;
+        }
+    }
+
+    savePreconditions(path) {
+        // 마지막으로 불러온/저장한 버전이 그대로일 때만 덮어쓰기 (새 문서는 아직 없을 때만 생성)
+        const saved = this.savedState;
+        if (!saved || saved.path !== path) return {};
+        return saved.etag ? { 'If-Match': saved.etag } : { 'If-None-Match': '*' };
+    }
+
+    async resolveConflict(file, path, annotations, etag) {
+        // 다른 작업자가 먼저 저장한 경우: 최신 내용을 다시 불러오거나, 확인 후 현재 내용으로 덮어씀
+        const reload = confirm(
+            '다른 곳에서 이 어노테이션이 수정되었습니다.\n' +
+            '확인: 서버의 최신 내용을 다시 불러옵니다. (현재 변경 내용은 저장되지 않습니다)\n' +
+            '취소: 현재 내용으로 덮어씁니다.'
+        );
+        if (reload) {
+            await this.loadAnnotations(file);
+            return null;
+        }
+        return this.saveFullAnnotations(path, annotations, etag ? { 'If-Match': etag } : {});
+    }
+
+    async saveFullAnnotations(originalPath, annotations, headers = {}) {
+        try {
             const formData = new FormData();
             const jsonBlob = new Blob([JSON.stringify(annotations, null, 2)], {
                 type: 'application/json'
@@ -305,12 +409,19 @@ class FileHandler {
             
             formData.append('file', jsonBlob, 'annotations.json');
             formData.append('path', originalPath);
+            // 작업자별 저장 통계 (/api/stats)
+            const annotator = localStorage.getItem('annotator');
+            if (annotator) formData.append('annotator', annotator);
     
             const saveResponse = await fetch('/api/save-annotation', {
                 method: 'POST',
+                headers,
                 body: formData
             });
     
+            if (saveResponse.status === 412) {
+                throw await this.conflictError(saveResponse);
+            }
             if (!saveResponse.ok) {
                 const errorText = await saveResponse.text();
                 console.error('Server response:', errorText);
@@ -318,31 +429,36 @@ class FileHandler {
             }
     
             const saveResult = await saveResponse.json();
-            if (isComplete) {
-                alert('작성이 완료되었습니다.');
-            }
-    
-            this.hasModifiedContent = false;
-            await this.displayFileList();
+            this.rememberSavedState(originalPath, saveResult.etag, annotations);
             return saveResult;
-    
         } catch (error) {
-            console.error('Save error:', error);
-            console.error("Complete error details:", {
-                name: error.name,
-                message: error.message,
-                stack: error.stack,
-                data: annotations
-            });
+            console.error('Full save error:', error);
             throw error;
         }
     }
 
+    async conflictError(response) {
+        // 버전 충돌(412): 서버의 현재 버전(ETag)을 담은 오류
+        const body = await response.json().catch(() => ({}));
+        const error = new Error(body.detail || 'Annotation has been modified');
+        error.status = 412;
+        error.etag = response.headers.get('ETag') || body.etag || null;
+        return error;
+    }
+
     async displayFileList() {
+        // 서버 인덱스에서 받은 어노테이션 상태가 없는 파일은 한 번의 요청으로 조회
+        const unknown = this.currentFiles
+            .filter(file => typeof file.annotated !== 'boolean' || file === this.getCurrentFile())
+            .map(file => file.originalPath || file.path)
+            .filter(path => path && !path.startsWith('blob:'));
+        const statuses = await this.fetchAnnotationStatus(unknown);
+
         this.fileList.innerHTML = '';
         
         for (const file of this.currentFiles) {
-            const hasAnnotation = await this.checkAnnotationExists(file.originalPath || file.path);
+            const status = statuses.get(file.originalPath || file.path);
+            const hasAnnotation = status ? status.exists : file.annotated === true;
             
             const tr = document.createElement('tr');
             const isActive = file === this.getCurrentFile();
@@ -377,6 +493,108 @@ class FileHandler {
 
             this.fileList.appendChild(tr);
         }
+
+        // 다음 페이지가 남아 있으면 더 보기 버튼 표시
+        if (this.nextCursor) {
+            const tr = document.createElement('tr');
+            tr.innerHTML = `
+                <td colspan="3" class="action-cell">
+                    <button class="btn small-btn">더 보기</button>
+                </td>
+            `;
+            tr.querySelector('button').addEventListener('click', () => this.loadMoreFiles());
+            this.fileList.appendChild(tr);
+        }
+    }
+
+    rememberSavedState(path, etag, data) {
+        if (!etag || !data || !data.annotations || !Array.isArray(data.annotations.segmentation)) {
+            this.savedState = null;
+            return;
+        }
+        this.savedState = {
+            path,
+            etag,
+            data: JSON.parse(JSON.stringify(data))
+        };
+    }
+
+    buildPatchOps(path, annotations) {
+        // 저장된 상태가 없으면 전체 저장이 필요
+        const saved = this.savedState;
+        if (!saved || saved.path !== path || !saved.etag) return null;
+
+        const ops = [];
+        const oldSegments = new Map(
+            saved.data.annotations.segmentation.map(seg => [seg.segment_id, JSON.stringify(seg)])
+        );
+        const newSegments = annotations.annotations.segmentation;
+
+        for (const seg of newSegments) {
+            if (oldSegments.get(seg.segment_id) !== JSON.stringify(seg)) {
+                ops.push({ op: 'upsert', segment: seg });
+            }
+            oldSegments.delete(seg.segment_id);
+        }
+        for (const segmentId of oldSegments.keys()) {
+            ops.push({ op: 'delete', segment_id: segmentId });
+        }
+
+        for (const section of ['meta_data', 'additional_info', 'annotations']) {
+            const oldSection = saved.data[section] || {};
+            for (const [field, value] of Object.entries(annotations[section] || {})) {
+                if (section === 'annotations' && field === 'segmentation') continue;
+                if (JSON.stringify(oldSection[field]) !== JSON.stringify(value)) {
+                    ops.push({ op: 'set', section, field, value });
+                }
+            }
+        }
+        return ops;
+    }
+
+    async patchAnnotations(path, annotations) {
+        const ops = this.buildPatchOps(path, annotations);
+        if (ops === null) return null;
+        if (ops.length === 0) {
+            return { status: 'success', etag: this.savedState.etag };
+        }
+
+        let response;
+        try {
+            response = await fetch(`/api/annotations/${encodeURIComponent(path)}`, {
+                method: 'PATCH',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'If-Match': this.savedState.etag,
+                    ...(localStorage.getItem('annotator')
+                        ? { 'X-Annotator': encodeURIComponent(localStorage.getItem('annotator')) }
+                        : {})
+                },
+                body: JSON.stringify({ ops })
+            });
+        } catch (error) {
+            // 네트워크 오류는 전체 저장으로 대체
+            console.error('Patch save error:', error);
+            return null;
+        }
+
+        if (response.status === 412) {
+            // 버전 충돌은 덮어쓰지 않고 호출한 쪽에서 처리
+            throw await this.conflictError(response);
+        }
+        if (response.status === 404) {
+            // 서버에 문서가 없으면 전체 저장으로 대체
+            console.warn('Patch target not found, falling back to full save');
+            return null;
+        }
+        if (!response.ok) {
+            const errorText = await response.text();
+            console.error('Server response:', errorText);
+            throw new Error('저장 실패: ' + errorText);
+        }
+        const result = await response.json();
+        this.rememberSavedState(path, result.etag, annotations);
+        return result;
     }
 
     removeDuplicates(files) {
@@ -395,6 +613,37 @@ class FileHandler {
         return this.currentFileIndex >= 0 ? this.currentFiles[this.currentFileIndex] : null;
     }
 
+    async loadVideoMeta(path) {
+        // 서버에서 OpenCV로 조회한 실제 fps/프레임 수/해상도
+        if (!path || path.startsWith('blob:')) return null;
+        try {
+            const response = await fetch(`/api/video-meta?path=${encodeURIComponent(path)}`);
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            console.error('Error loading video metadata:', error);
+            return null;
+        }
+    }
+
+    async fetchAnnotationStatus(paths) {
+        // 경로 -> {exists, mtime} (목록 표시에는 세그먼트 수/유효성이 필요 없으므로 요청하지 않음)
+        const statuses = new Map();
+        if (!paths.length) return statuses;
+        try {
+            const response = await fetch('/api/annotation-status', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ paths, fields: ['exists', 'mtime'] })
+            });
+            if (!response.ok) return statuses;
+            const data = await response.json();
+            data.results.forEach((status, i) => statuses.set(paths[i], status));
+        } catch (error) {
+            console.error('Error fetching annotation status:', error);
+        }
+        return statuses;
+    }
+
     async checkAnnotationExists(path) {
         if (!path) return false;
         try {
@@ -38,7 +38,7 @@ class TimelineController {
     this.dragType = null;
 
     // 프레임 관련 상수
-    this.FPS = 15;
+    this.FPS = 15;  // 비디오 메타데이터를 불러오면 실제 fps로 변경 (setFrameRate)
     this.FRAME_TIME = 1 / this.FPS;
     this.MINIMUM_SEGMENT_FRAMES = 1;
 
@@ -63,6 +63,12 @@ class TimelineController {
     this.initializeEventListeners();
   }
 
+  setFrameRate(fps) {
+    // 구간의 start_frame/end_frame/keyframe을 저장될 frame_rate와 같은 기준으로 계산
+    this.FPS = fps;
+    this.FRAME_TIME = 1 / fps;
+  }
+
   initializeEventListeners() {
     // 액션 타입 버튼 이벤트
     this.actionButtons.forEach((button) => {
@@ -505,6 +511,9 @@ class TimelineController {
 
       console.log("Generated target objects:", targetObjects);
 
+      // 서버에서 조회한 메타데이터가 있으면 우선 사용
+      const videoMeta = videoController.videoMeta;
+
       const annotationsData = {
         meta_data: {
           file_name: videoController.currentVideoPath.split("/").pop(),
@@ -513,10 +522,14 @@ class TimelineController {
             .pop()
             .toLowerCase(),
           size: currentFile.size || 0,
-          width_height: [video.videoWidth || 0, video.videoHeight || 0],
+          width_height: videoMeta
+            ? [videoMeta.width, videoMeta.height]
+            : [video.videoWidth || 0, video.videoHeight || 0],
           environment: 0,
-          frame_rate: this.FPS,
-          total_frames: Math.round(video.duration * this.FPS),
+          frame_rate: videoMeta && videoMeta.fps ? Math.round(videoMeta.fps) : this.FPS,
+          total_frames: videoMeta && videoMeta.frame_count
+            ? videoMeta.frame_count
+            : Math.round(video.duration * this.FPS),
           camera_height: 170,
           camera_angle: 15,
         },
@@ -6,15 +6,24 @@ class VideoController {
       this.timeCount = document.getElementById('timeCount');
       this.timelineMarker = document.getElementById('timelineMarker');
       
-      this.FPS = 15;
+      this.DEFAULT_FPS = 15;  // 메타데이터를 조회하지 못한 경우
+      this.FPS = this.DEFAULT_FPS;
       this.isPlaying = false;
       this.controlsEnabled = true;
       this.currentVideoPath = null;
+      this.videoMeta = null;  // /api/video-meta 결과
 
       this.initializeControls();
       this.initializeEventListeners();
   }
 
+  setVideoMeta(meta) {
+      // 프레임 번호 계산을 실제 fps 기준으로 (타임라인과 같은 값 사용)
+      this.videoMeta = meta;
+      this.FPS = meta && meta.fps > 0 ? meta.fps : this.DEFAULT_FPS;
+      timelineController.setFrameRate(this.FPS);
+  }
+
   initializeControls() {
       console.log("Initializing video controls");
       this.playPauseBtn = document.getElementById('playPause');